@@ -2,39 +2,77 @@
 Run the solver against an automated game locally.
 """
 import logging
+import random
 import time
 from collections import Counter
 
-from sweepersolver import GameBoard, TileBank, make_move, LocalGame
+from sweepersolver import GameBoard, TileBank, Solver, LocalGame
+from sweepersolver.inference import BankCountInference, FrontierInference
+from sweepersolver.localgame import GameOverError
+from sweepersolver.recording import Recording, write_recording
 
 log = logging.getLogger(__name__)
 
 
-def run_automated(difficulty, pause=0):
+# Seeds picked for games that aren't given one are below this.
+MAX_RANDOM_SEED = 2 ** 32
+
+
+def run_automated(difficulty, pause=0, seed=None, difficulty_name="",
+                  record_path=None, lookahead_depth=0):
+    """ Play a game, logging every move.
+
+    :param seed: Seed for the layout of the game and any random moves. One is
+                 picked and logged if not given, so any game can be re-run.
+    :param record_path: If given, write a recording of the game to this path
+                        once it's over.
+    :param lookahead_depth: Lookahead depth for the solver, as for Solver.
+    """
     log.debug("Running automated with difficulty: %r", difficulty)
+    if seed is None:
+        seed = random.randrange(MAX_RANDOM_SEED)
+    log.info("Playing game with seed: %d", seed)
+
     enemies = Counter(difficulty["enemies"])
-    local_game = LocalGame(difficulty)
+    local_game = LocalGame(difficulty, random.Random(seed))
 
     tile_bank = TileBank(enemies)
     game_board = GameBoard(difficulty["width"],
                            difficulty["height"],
                            tile_bank)
+    solver = Solver(game_board,
+                    [BankCountInference(), FrontierInference()],
+                    random.Random(seed),
+                    lookahead_depth)
+    recording = Recording(seed, difficulty_name, difficulty, local_game.layout)
 
-    while not local_game.is_complete:
-        log.info("Player knowledge:\n%s", game_board.condensed_repr)
-        log.info("Game state:\n%s\n%s",
-                 local_game.player,
-                 local_game.enemy_counter)
-        next_location = make_move(local_game.player, game_board)
-
-        log.info("Playing location: %s", next_location)
+    try:
+        while not local_game.is_complete:
+            log.info("Player knowledge:\n%s", game_board.condensed_repr)
+            log.info("Game state:\n%s\n%s",
+                     local_game.player,
+                     local_game.enemy_counter)
+            start_time = time.perf_counter()
+            next_location = solver.make_move(local_game.player)
+            recording.add_move(next_location.x,
+                               next_location.y,
+                               time.perf_counter() - start_time)
 
-        local_revealed_tile = local_game.reveal(next_location)
-        log.info("Location contained: %s", local_revealed_tile)
-        bank_tile = tile_bank.take(local_revealed_tile.enemy_lvl.exact,
-                                   local_revealed_tile.neighbour_lvls_sum)
-        game_board.set_revealed_tile(next_location, bank_tile)
+            log.info("Playing location: %s", next_location)
 
-        time.sleep(pause)
+            local_revealed_tile = local_game.reveal(next_location)
+            log.info("Location contained: %s", local_revealed_tile)
+            bank_tile = tile_bank.take(local_revealed_tile.enemy_lvl.exact,
+                                       local_revealed_tile.neighbour_lvls_sum)
+            game_board.set_revealed_tile(next_location, bank_tile)
 
-    log.info("Game won!")
+            time.sleep(pause)
+    except GameOverError as error:
+        recording.killed_by = error.enemy_level
+        raise
+    else:
+        recording.won = True
+        log.info("Game won!")
+    finally:
+        if record_path is not None:
+            write_recording(recording, record_path)
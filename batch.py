@@ -0,0 +1,234 @@
+"""
+Run the solver against many automated games locally, and summarise how it
+did.
+"""
+import bisect
+import json
+import logging
+import math
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from sweepersolver import GameBoard, TileBank, Solver, LocalGame
+from sweepersolver.inference import BankCountInference, FrontierInference
+from sweepersolver.localgame import GameOverError
+
+log = logging.getLogger(__name__)
+
+
+# Histogram buckets cover latencies from 1us up to 100s, with this many
+# buckets per factor of 10.
+HISTOGRAM_BUCKETS_PER_DECADE = 20
+HISTOGRAM_MIN_EXPONENT = -6
+HISTOGRAM_MAX_EXPONENT = 2
+
+# Percentiles to report for per-move latencies.
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+
+
+class LatencyHistogram:
+    """ A histogram of latencies in logarithmically sized buckets, so that
+        percentiles can be estimated from any number of samples in fixed
+        space, and histograms from separate games merged.
+    """
+
+    _bounds = [10 ** (HISTOGRAM_MIN_EXPONENT +
+                      bucket / HISTOGRAM_BUCKETS_PER_DECADE)
+               for bucket in range((HISTOGRAM_MAX_EXPONENT -
+                                    HISTOGRAM_MIN_EXPONENT) *
+                                   HISTOGRAM_BUCKETS_PER_DECADE + 1)]
+
+    def __init__(self):
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    @property
+    def count(self):
+        """ The number of latencies recorded. """
+        return self._count
+
+    @property
+    def total(self):
+        """ The sum of all latencies recorded. """
+        return self._total
+
+    @property
+    def max(self):
+        """ The largest latency recorded. """
+        return self._max
+
+    def add(self, latency):
+        """ Record a latency, in seconds. """
+        self._counts[bisect.bisect_left(self._bounds, latency)] += 1
+        self._count += 1
+        self._total += latency
+        self._max = max(self._max, latency)
+
+    def merge(self, other):
+        """ Add the latencies recorded in another histogram to this one. """
+        for bucket, count in enumerate(other._counts):
+            self._counts[bucket] += count
+        self._count += other._count
+        self._total += other._total
+        self._max = max(self._max, other._max)
+
+    def percentile(self, percent):
+        """ Estimate the given percentile of the recorded latencies, as the
+            upper bound of the bucket it falls in.
+        """
+        if self._count == 0:
+            return None
+        rank = max(1, math.ceil(self._count * percent / 100))
+        seen = 0
+        for bucket, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                if bucket < len(self._bounds):
+                    return min(self._bounds[bucket], self._max)
+                return self._max
+
+    def summary(self):
+        """ A dictionary summarising the latencies, in milliseconds. """
+        summary = {"p%d" % percent: _to_ms(self.percentile(percent))
+                   for percent in LATENCY_PERCENTILES}
+        summary["max"] = _to_ms(self._max if self._count else None)
+        summary["mean"] = _to_ms(self._total / self._count
+                                 if self._count else None)
+        return summary
+
+
+def _to_ms(seconds):
+    return None if seconds is None else seconds * 1000
+
+
+def play_game(difficulty, seed, lookahead_depth=0, metrics=None,
+              board_latencies=None):
+    """ Play a single game with the given difficulty, with all randomness
+        seeded from the given seed.
+
+    :param lookahead_depth: Lookahead depth for the solver, as for Solver.
+    :param metrics: Metrics for the board and solver to report to.
+    :param board_latencies: LatencyHistogram to add the time taken updating
+                            the board with the result of each move to.
+
+    :return: A dictionary of the results of the game.
+    """
+    tile_bank = TileBank(Counter(difficulty["enemies"]))
+    local_game = LocalGame(difficulty, random.Random(seed))
+    game_board = GameBoard(difficulty["width"],
+                           difficulty["height"],
+                           tile_bank,
+                           metrics)
+    solver = Solver(game_board,
+                    [BankCountInference(), FrontierInference()],
+                    random.Random(seed),
+                    lookahead_depth,
+                    metrics)
+
+    latencies = LatencyHistogram()
+    result = {"seed": seed, "won": False, "killed_by": None}
+
+    try:
+        while not local_game.is_complete:
+            start_time = time.perf_counter()
+            next_location = solver.make_move(local_game.player)
+            latencies.add(time.perf_counter() - start_time)
+
+            local_revealed_tile = local_game.reveal(next_location)
+
+            start_time = time.perf_counter()
+            bank_tile = tile_bank.take(local_revealed_tile.enemy_lvl.exact,
+                                       local_revealed_tile.neighbour_lvls_sum)
+            game_board.set_revealed_tile(next_location, bank_tile)
+            if board_latencies is not None:
+                board_latencies.add(time.perf_counter() - start_time)
+    except GameOverError as error:
+        log.debug("Game with seed %r lost: %s", seed, error)
+        result["killed_by"] = error.enemy_level
+    else:
+        log.debug("Game with seed %r won", seed)
+        result["won"] = True
+
+    result["moves"] = latencies.count
+    result["latencies"] = latencies
+    return result
+
+
+def _play_game_args(args):
+    """ Play a game given a tuple of arguments, for mapping over a pool. """
+    return play_game(*args)
+
+
+def summarise(difficulty_name, seed, results, elapsed):
+    """ Aggregate the results of a set of games into a dictionary suitable
+        for writing out as JSON.
+    """
+    latencies = LatencyHistogram()
+    moves = []
+    deaths = Counter()
+    for result in results:
+        latencies.merge(result["latencies"])
+        moves.append(result["moves"])
+        if not result["won"]:
+            deaths[result["killed_by"]] += 1
+
+    games = len(results)
+    wins = games - sum(deaths.values())
+    moves.sort()
+    return {"difficulty": difficulty_name,
+            "seed": seed,
+            "games": games,
+            "wins": wins,
+            "win_rate": wins / games if games else None,
+            "moves_per_game": {
+                "mean": sum(moves) / games if games else None,
+                "min": moves[0] if moves else None,
+                "median": moves[len(moves) // 2] if moves else None,
+                "max": moves[-1] if moves else None},
+            "deaths_by_enemy_level": {str(level): count
+                                      for level, count
+                                      in sorted(deaths.items())},
+            "move_latency_ms": latencies.summary(),
+            "moves_per_second": (latencies.count / latencies.total
+                                 if latencies.total else None),
+            "elapsed_seconds": elapsed}
+
+
+def run_batch(difficulty_name, difficulty, games, workers=1, seed=0,
+              output_path=None, lookahead_depth=0):
+    """ Play a number of games, spread across a pool of worker processes,
+        and write a JSON summary of the results to the given path.
+
+    Game i is seeded with seed + i, so any single game can be re-run.
+
+    :return: The summary of the results.
+    """
+    log.info("Running %d games with difficulty %s across %d workers",
+             games, difficulty_name, workers)
+    game_args = [(difficulty, seed + game, lookahead_depth)
+                 for game in range(games)]
+
+    start_time = time.perf_counter()
+    if workers > 1:
+        chunksize = max(1, games // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_play_game_args,
+                                        game_args,
+                                        chunksize=chunksize))
+    else:
+        results = [_play_game_args(args) for args in game_args]
+    elapsed = time.perf_counter() - start_time
+
+    summary = summarise(difficulty_name, seed, results, elapsed)
+    log.info("Won %d of %d games", summary["wins"], summary["games"])
+
+    if output_path is not None:
+        with open(output_path, 'w') as output_file:
+            json.dump(summary, output_file, indent=2, sort_keys=True)
+        log.info("Written summary to: %s", output_path)
+
+    return summary
@@ -0,0 +1,5 @@
+"""
+Benchmarks for the sweeper solver.
+
+Run `python -m benchmarks --help` from the root of the repository for usage.
+"""
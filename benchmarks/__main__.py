@@ -0,0 +1,96 @@
+"""
+Run the benchmarks from the command line.
+"""
+import argparse
+import json
+import logging
+
+from sweepersolver import DIFFICULTY_EASY, DIFFICULTY_HUGE_EX
+
+from .hotpaths import run_hotpaths, format_hotpaths
+from .scaling import DEFAULT_SIZES, run_scaling, format_scaling
+
+
+DIFFICULTY_MAP = {"easy": DIFFICULTY_EASY,
+                  "huge-extreme": DIFFICULTY_HUGE_EX}
+
+
+def _set_up_arg_parser():
+    """ Create a parser for the allowed command line arguments. """
+    parser = argparse.ArgumentParser("python -m benchmarks",
+                                     description="Benchmark the sweeper "
+                                                 "solver.")
+    parser.add_argument('--seed',
+                        type=int,
+                        default=0,
+                        help="Seed for the random board layouts")
+    parser.add_argument('--output',
+                        type=str,
+                        help="File to write the results to as JSON")
+    subparsers = parser.add_subparsers(dest="benchmark")
+    subparsers.required = True
+
+    hotpaths = subparsers.add_parser('hotpaths',
+                                     help="Time the hot paths in isolation")
+    hotpaths.add_argument('-d',
+                          dest="difficulty",
+                          type=str,
+                          choices=DIFFICULTY_MAP.keys(),
+                          default="huge-extreme",
+                          help="Select difficulty")
+    hotpaths.add_argument('--repeat',
+                          type=int,
+                          default=5,
+                          help="Times to repeat each benchmark")
+
+    scaling = subparsers.add_parser('scaling',
+                                    help="Measure scaling with board size")
+    scaling.add_argument('--sizes',
+                         type=int,
+                         nargs='+',
+                         default=DEFAULT_SIZES,
+                         help="Widths of the square boards to run")
+    scaling.add_argument('--max-size',
+                         type=int,
+                         help="Skip any sizes larger than this")
+    scaling.add_argument('--density',
+                         type=float,
+                         default=0.15,
+                         help="Fraction of spaces with a non-zero enemy")
+    scaling.add_argument('--moves',
+                         type=int,
+                         default=100,
+                         help="Maximum moves to play on each board")
+    scaling.add_argument('--no-memory',
+                         dest="measure_memory",
+                         action="store_false",
+                         help="Skip measuring peak memory")
+    return parser
+
+
+if __name__ == "__main__":
+    parser = _set_up_arg_parser()
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING,
+                        format='%(asctime)-15s %(message)s')
+    logging.getLogger("benchmarks").setLevel(logging.INFO)
+
+    if args.benchmark == 'hotpaths':
+        results = run_hotpaths(DIFFICULTY_MAP[args.difficulty],
+                               args.repeat,
+                               args.seed)
+        print(format_hotpaths(results))
+    else:
+        sizes = [size for size in args.sizes
+                 if args.max_size is None or size <= args.max_size]
+        results = run_scaling(sizes,
+                              args.density,
+                              args.moves,
+                              args.seed,
+                              args.measure_memory)
+        print(format_scaling(results))
+
+    if args.output is not None:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2)
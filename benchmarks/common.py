@@ -0,0 +1,58 @@
+"""
+Helpers shared between benchmarks.
+"""
+import logging
+import random
+import time
+from collections import Counter
+
+from sweepersolver import Point, TileBank
+from sweepersolver.board.neighbours import neighbour_table
+
+log = logging.getLogger(__name__)
+
+
+def random_layout(difficulty, seed=0):
+    """ Randomly lay out the enemies of a difficulty.
+
+    :return: A mapping from every location on the board to a tuple of the
+             level of the enemy there and the sum of its neighbours' levels.
+    """
+    width = difficulty["width"]
+    levels = list(Counter(difficulty["enemies"]).elements())
+    random.Random(seed).shuffle(levels)
+
+    table = neighbour_table(width, difficulty["height"])
+    return {Point(index % width, index // width):
+            (level, sum(levels[neighbour]
+                        for neighbour in table.neighbours(index)))
+            for index, level in enumerate(levels)}
+
+
+def take_tiles(tile_bank, layout, locations):
+    """ Take the tiles for the given locations in a layout from a bank.
+
+    :return: A mapping of the locations to their tiles.
+    """
+    return {location: tile_bank.take(*layout[location])
+            for location in locations}
+
+
+def new_tile_bank(difficulty):
+    """ Create a full tile bank for a difficulty. """
+    return TileBank(Counter(difficulty["enemies"]))
+
+
+class Timer:
+    """ Context manager recording the wall time spent inside it. """
+
+    def __init__(self):
+        self.elapsed = None
+        self._start_time = None
+
+    def __enter__(self):
+        self._start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.perf_counter() - self._start_time
@@ -0,0 +1,136 @@
+"""
+Time the hot paths of the solver in isolation.
+"""
+import logging
+import random
+
+from sweepersolver import GameBoard, LocalGame, Player, Solver, make_move
+
+from .common import random_layout, take_tiles, new_tile_bank, Timer
+
+log = logging.getLogger(__name__)
+
+
+# The fraction of the board revealed before timing moves.
+MAKE_MOVE_REVEALED_FRACTION = 0.25
+# The maximum number of single reveals to time in each repeat.
+SINGLE_REVEALS = 200
+# The number of moves to time in each repeat.
+MOVES = 50
+
+
+def _setup_board(difficulty, seed):
+    tile_bank = new_tile_bank(difficulty)
+    board = GameBoard(difficulty["width"], difficulty["height"], tile_bank)
+    layout = random_layout(difficulty, seed)
+    return tile_bank, board, layout
+
+
+def _sample_locations(layout, count, seed):
+    locations = sorted(layout, key=lambda location: (location.y, location.x))
+    return random.Random(seed).sample(locations, min(count, len(locations)))
+
+
+def bench_board_construction(difficulty, seed):
+    """ Time building an empty GameBoard. """
+    tile_bank = new_tile_bank(difficulty)
+    with Timer() as timer:
+        GameBoard(difficulty["width"], difficulty["height"], tile_bank)
+    return timer.elapsed, 1
+
+
+def bench_set_revealed_tile(difficulty, seed):
+    """ Time revealing tiles one by one, including propagation. """
+    tile_bank, board, layout = _setup_board(difficulty, seed)
+    locations = _sample_locations(layout, SINGLE_REVEALS, seed)
+    tiles = take_tiles(tile_bank, layout, locations)
+    with Timer() as timer:
+        for location in locations:
+            board.set_revealed_tile(location, tiles[location])
+    return timer.elapsed, len(locations)
+
+
+def bench_bulk_reveal_tiles(difficulty, seed):
+    """ Time revealing half the board in one go. """
+    tile_bank, board, layout = _setup_board(difficulty, seed)
+    locations = _sample_locations(layout, len(layout) // 2, seed)
+    tiles = take_tiles(tile_bank, layout, locations)
+    with Timer() as timer:
+        board.bulk_reveal_tiles(tiles)
+    return timer.elapsed, 1
+
+
+def bench_make_move(difficulty, seed):
+    """ Time choosing moves on a partially revealed board. """
+    tile_bank, board, layout = _setup_board(difficulty, seed)
+    locations = _sample_locations(
+        layout, int(len(layout) * MAKE_MOVE_REVEALED_FRACTION), seed)
+    board.bulk_reveal_tiles(take_tiles(tile_bank, layout, locations))
+    player = Player(difficulty["hp"], difficulty["xp thresholds"])
+    random.seed(seed)
+    with Timer() as timer:
+        for _ in range(MOVES):
+            make_move(player, board)
+    return timer.elapsed, MOVES
+
+
+def bench_solver_make_move(difficulty, seed):
+    """ Time choosing moves with a Solver on a partially revealed board. """
+    tile_bank, board, layout = _setup_board(difficulty, seed)
+    locations = _sample_locations(
+        layout, int(len(layout) * MAKE_MOVE_REVEALED_FRACTION), seed)
+    board.bulk_reveal_tiles(take_tiles(tile_bank, layout, locations))
+    player = Player(difficulty["hp"], difficulty["xp thresholds"])
+    solver = Solver(board, rng=random.Random(seed))
+    with Timer() as timer:
+        for _ in range(MOVES):
+            solver.make_move(player)
+    return timer.elapsed, MOVES
+
+
+def bench_local_game(difficulty, seed):
+    """ Time generating a new LocalGame. """
+    rng = random.Random(seed)
+    with Timer() as timer:
+        LocalGame(difficulty, rng)
+    return timer.elapsed, 1
+
+
+BENCHMARKS = (("GameBoard construction", bench_board_construction),
+              ("set_revealed_tile", bench_set_revealed_tile),
+              ("bulk_reveal_tiles", bench_bulk_reveal_tiles),
+              ("make_move", bench_make_move),
+              ("Solver.make_move", bench_solver_make_move),
+              ("LocalGame generation", bench_local_game))
+
+
+def run_hotpaths(difficulty, repeat=5, seed=0):
+    """ Run each hot path benchmark a number of times.
+
+    :return: A list of dictionaries of the results of each benchmark, with
+             times per operation.
+    """
+    results = []
+    for name, benchmark in BENCHMARKS:
+        log.info("Running benchmark: %s", name)
+        samples = []
+        for iteration in range(repeat):
+            elapsed, operations = benchmark(difficulty, seed + iteration)
+            samples.append(elapsed / operations)
+        results.append({"name": name,
+                        "operations": operations,
+                        "best_ms": min(samples) * 1000,
+                        "mean_ms": sum(samples) / len(samples) * 1000})
+    return results
+
+
+def format_hotpaths(results):
+    """ Format the results of the hot path benchmarks as a table. """
+    lines = ["%-24s %10s %12s %12s" % ("benchmark", "ops/repeat",
+                                       "best ms/op", "mean ms/op")]
+    lines.extend("%-24s %10d %12.4f %12.4f" % (result["name"],
+                                               result["operations"],
+                                               result["best_ms"],
+                                               result["mean_ms"])
+                 for result in results)
+    return "\n".join(lines)
@@ -0,0 +1,105 @@
+"""
+Measure how time and memory scale with board size.
+"""
+import logging
+import random
+import tracemalloc
+
+from sweepersolver import GameBoard, LocalGame, Solver
+from sweepersolver.localgame import GameOverError, make_difficulty
+
+from .common import new_tile_bank, Timer
+
+log = logging.getLogger(__name__)
+
+
+DEFAULT_SIZES = (16, 32, 64, 128, 256, 512, 1000)
+
+
+def _run_size(difficulty, moves, seed):
+    """ Generate a game, build a board and play up to the given number of
+        moves, timing each stage.
+    """
+    timings = {}
+
+    with Timer() as timer:
+        local_game = LocalGame(difficulty, random.Random(seed))
+    timings["generate_s"] = timer.elapsed
+
+    tile_bank = new_tile_bank(difficulty)
+    with Timer() as timer:
+        game_board = GameBoard(difficulty["width"],
+                               difficulty["height"],
+                               tile_bank)
+    timings["construct_s"] = timer.elapsed
+
+    solver = Solver(game_board, rng=random.Random(seed))
+    moves_made = 0
+    with Timer() as timer:
+        try:
+            while moves_made < moves and not local_game.is_complete:
+                location = solver.make_move(local_game.player)
+                tile = local_game.reveal(location)
+                game_board.set_revealed_tile(
+                    location,
+                    tile_bank.take(tile.enemy_lvl.exact,
+                                   tile.neighbour_lvls_sum))
+                moves_made += 1
+        except GameOverError:
+            log.debug("Player died after %d moves", moves_made)
+    timings["moves"] = moves_made
+    timings["play_s"] = timer.elapsed
+
+    return timings
+
+
+def run_scaling(sizes=DEFAULT_SIZES, density=0.15, moves=100, seed=0,
+                measure_memory=True):
+    """ Run the scaling benchmark over square boards of the given sizes.
+
+    Timings are taken without tracing memory allocations, which slows
+    everything down, so peak memory is measured in a second run.
+
+    :return: A list of dictionaries of results, one per size.
+    """
+    results = []
+    for size in sizes:
+        log.info("Running %dx%d board", size, size)
+        difficulty = make_difficulty(size, size, density)
+        result = {"size": size, "cells": size * size, "density": density}
+        result.update(_run_size(difficulty, moves, seed))
+
+        if measure_memory:
+            tracemalloc.start()
+            try:
+                _run_size(difficulty, moves, seed)
+                result["peak_mb"] = \
+                    tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            finally:
+                tracemalloc.stop()
+
+        results.append(result)
+    return results
+
+
+def format_scaling(results):
+    """ Format the results of the scaling benchmark as a table, including the
+        time per cell of each stage to make superlinear growth stand out.
+    """
+    lines = ["%6s %9s %11s %9s %12s %9s %10s %9s" % (
+        "size", "cells", "generate s", "us/cell", "construct s", "us/cell",
+        "ms/move", "peak MB")]
+    for result in results:
+        cells = result["cells"]
+        play_per_move = (result["play_s"] / result["moves"] * 1000
+                         if result["moves"] else float('nan'))
+        lines.append("%6d %9d %11.4f %9.3f %12.4f %9.3f %10.4f %9s" % (
+            result["size"],
+            cells,
+            result["generate_s"],
+            result["generate_s"] / cells * 1e6,
+            result["construct_s"],
+            result["construct_s"] / cells * 1e6,
+            play_per_move,
+            "%.1f" % result["peak_mb"] if "peak_mb" in result else "-"))
+    return "\n".join(lines)
@@ -1 +1,2 @@
 from .cli import CLIInput
+from .eventcli import EventCLI
@@ -0,0 +1,229 @@
+"""
+An event driven CLI for input/output of messages, with no threads or polling.
+"""
+
+import codecs
+import os
+import queue
+import selectors
+import stat
+import sys
+import threading
+import time
+import logging
+from collections import deque
+
+
+log = logging.getLogger(__name__)
+
+
+# Most bytes to read from the input in one go.
+READ_SIZE = 64 * 1024
+
+
+class EventCLI(object):
+    """ A command line interface that reads in commands from users and writes
+        responses back out, on the thread using it.
+
+    It has the put and get methods of a queue, so it can stand in for both
+    the queues used with CLIInput. Messages put are buffered, and all those
+    waiting are written out together as soon as there's nothing left to do
+    but wait for input - that is, when get is called with no line already
+    read - or flush is. Waiting for input blocks in a selector on the input
+    and a wakeup pipe, so there are no wakeups while idle, and stop can wake
+    it from another thread.
+
+    Input is read in large chunks and split into lines, so many lines pasted
+    or piped in at once are read together, and the responses to them all
+    written together. Once the input is at EOF or the CLI is
+    stopped, get returns None, as CLIInput puts None on its queue.
+
+    Selectors only support waiting on pipes and terminals on Unix. Regular
+    files, such as input redirected from a file, are always ready to read,
+    so are read without waiting. Anywhere else, such as on Windows, start
+    raises OSError, and CLIInput can be used instead.
+    """
+
+    def __init__(self, stdin=sys.stdin, stdout=sys.stdout):
+        """ Initialise a new event driven CLI. """
+        log.debug('Initialising a new event CLI instance')
+
+        # The input to read from, and the output to write to.
+        self.stdin = stdin
+        self.stdout = stdout
+
+        # Messages waiting to be written out, and complete lines read in but
+        # not yet got.
+        self._output = []
+        self._lines = deque()
+        # Text read after the last complete line.
+        self._partial_line = ""
+        self._decoder = codecs.getincrementaldecoder(
+            getattr(stdin, "encoding", None) or "utf-8")(errors="replace")
+        self._eof = False
+        # Whether the input can be read without waiting on it.
+        self._always_readable = False
+
+        self._running = False
+        # Whether a call to get is waiting for input, so that stop has to
+        # wake it rather than clean up itself.
+        self._reading = False
+        self._lock = threading.Lock()
+        self._selector = None
+        self._wakeup_read_fd = None
+        self._wakeup_write_fd = None
+
+    def start(self):
+        """ Starts the CLI.
+
+        It will run until it gets an EOF from the input, or is stopped by a
+        call to stop.
+
+        :raises OSError: If the input can't be waited on.
+        """
+        log.debug("Starting event CLI")
+        with self._lock:
+            if self._running:
+                return
+            if sys.platform == "win32":
+                # Selectors can only wait on sockets on Windows.
+                raise OSError("Can't wait on input on Windows")
+            self._wakeup_read_fd, self._wakeup_write_fd = os.pipe()
+            self._selector = selectors.DefaultSelector()
+            try:
+                os.set_blocking(self._wakeup_write_fd, False)
+                self._always_readable = stat.S_ISREG(
+                    os.fstat(self.stdin.fileno()).st_mode)
+                if not self._always_readable:
+                    self._selector.register(self.stdin.fileno(),
+                                            selectors.EVENT_READ)
+                self._selector.register(self._wakeup_read_fd,
+                                        selectors.EVENT_READ)
+            except (OSError, ValueError) as error:
+                self._close()
+                raise OSError("Can't wait on input: %s" % error)
+            self._running = True
+        log.debug('Event CLI is started')
+
+    def stop(self):
+        """ Stops the CLI, writing out any messages still waiting.
+
+        Can be called from any thread. Once it returns, nothing more will be
+        written, and any call to get waiting for input returns None.
+        """
+        log.debug("Stopping event CLI")
+        with self._lock:
+            if not self._running:
+                return
+            self._flush()
+            self._running = False
+            if self._reading:
+                # The reading thread cleans up once it wakes.
+                os.write(self._wakeup_write_fd, b"\0")
+            else:
+                self._close()
+        log.debug("Event CLI is stopped")
+
+    def is_running(self):
+        """ Returns whether the CLI has been started. """
+        return self._running
+
+    def put(self, message, block=True, timeout=None):
+        """ Queue a message to be written out to the user. """
+        with self._lock:
+            self._output.append(message)
+
+    def flush(self):
+        """ Write out all queued messages now, in one go. """
+        with self._lock:
+            self._flush()
+
+    def get(self, block=True, timeout=None):
+        """ Get the next line of input, without its line ending, first writing
+            out any queued messages if it has to wait for one.
+
+        :param block: If False, only return a line already read.
+        :param timeout: If given, the most seconds to wait for a line.
+        :return: The line, or None if the input is at EOF or the CLI has
+                 been stopped.
+        :raises queue.Empty: If not blocking or timing out, and no line was
+                             available.
+        """
+        with self._lock:
+            if not self._running:
+                return None
+            if not self._lines:
+                self._flush()
+            self._reading = True
+
+        try:
+            return self._read_line(block, timeout)
+        finally:
+            with self._lock:
+                self._reading = False
+                if not self._running:
+                    self._close()
+
+    def _flush(self):
+        if self._output:
+            text = "".join('{}\n'.format(message)
+                           for message in self._output)
+            self._output = []
+            log.debug('Writing out responses: %s', text)
+            self.stdout.write(text)
+            self.stdout.flush()
+
+    def _read_line(self, block, timeout):
+        """ Wait for and return the next complete line of input. """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._lines:
+            if self._eof:
+                return None
+            if not block:
+                raise queue.Empty
+            if self._always_readable:
+                self._read_input()
+                continue
+
+            if deadline is None:
+                events = self._selector.select()
+            else:
+                events = self._selector.select(
+                    max(0, deadline - time.monotonic()))
+            if not self._running:
+                return None
+            if not events:
+                raise queue.Empty
+            for key, _ in events:
+                if key.fd != self._wakeup_read_fd:
+                    self._read_input()
+
+        line = self._lines.popleft()
+        log.debug('Got command from prompt: %s', line)
+        return line
+
+    def _read_input(self):
+        """ Read whatever input is available, splitting it into lines. """
+        data = os.read(self.stdin.fileno(), READ_SIZE)
+        if not data:
+            log.debug("Got EOF")
+            self._eof = True
+            text = self._decoder.decode(b"", final=True)
+        else:
+            text = self._decoder.decode(data)
+
+        lines = (self._partial_line + text).split('\n')
+        self._partial_line = lines.pop()
+        if self._eof and self._partial_line:
+            # A last line without a line ending.
+            lines.append(self._partial_line)
+            self._partial_line = ""
+        self._lines.extend(lines)
+
+    def _close(self):
+        self._selector.close()
+        os.close(self._wakeup_read_fd)
+        os.close(self._wakeup_write_fd)
+        self._selector = None
+        self._wakeup_read_fd = None
+        self._wakeup_write_fd = None
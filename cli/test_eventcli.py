@@ -0,0 +1,92 @@
+"""
+Tests for the event driven CLI.
+"""
+import io
+import os
+import queue
+import threading
+import unittest
+
+from .eventcli import EventCLI
+
+
+class TestEventCLI(unittest.TestCase):
+    """ Test reading lines and writing messages through pipes. """
+
+    def setUp(self):
+        read_fd, self.write_fd = os.pipe()
+        self.stdin = os.fdopen(read_fd, 'r')
+        self.stdout = io.StringIO()
+        self.cli = EventCLI(self.stdin, self.stdout)
+        self.cli.start()
+
+    def tearDown(self):
+        self.cli.stop()
+        self.stdin.close()
+        if self.write_fd is not None:
+            os.close(self.write_fd)
+
+    def close_input(self):
+        os.close(self.write_fd)
+        self.write_fd = None
+
+    def test_lines(self):
+        os.write(self.write_fd, "first\nsecond\nthi".encode())
+        self.assertEqual(self.cli.get(), "first")
+        self.assertEqual(self.cli.get(), "second")
+        os.write(self.write_fd, "rd\n".encode())
+        self.assertEqual(self.cli.get(), "third")
+
+    def test_eof(self):
+        os.write(self.write_fd, "last".encode())
+        self.close_input()
+        self.assertEqual(self.cli.get(), "last")
+        self.assertIsNone(self.cli.get())
+        self.assertIsNone(self.cli.get())
+
+    def test_output_batched_until_get(self):
+        self.cli.put("one")
+        self.cli.put(2)
+        self.assertEqual(self.stdout.getvalue(), "")
+        os.write(self.write_fd, b"\n")
+        self.cli.get()
+        self.assertEqual(self.stdout.getvalue(), "one\n2\n")
+
+    def test_output_batched_while_lines_read(self):
+        os.write(self.write_fd, b"a\nb\n")
+        self.assertEqual(self.cli.get(), "a")
+        self.cli.put("after a")
+        self.assertEqual(self.cli.get(), "b")
+        self.assertEqual(self.stdout.getvalue(), "")
+        self.cli.put("after b")
+        with self.assertRaises(queue.Empty):
+            self.cli.get(timeout=0.01)
+        self.assertEqual(self.stdout.getvalue(), "after a\nafter b\n")
+
+    def test_timeout(self):
+        with self.assertRaises(queue.Empty):
+            self.cli.get(timeout=0.01)
+        with self.assertRaises(queue.Empty):
+            self.cli.get(block=False)
+
+    def test_stop_wakes_get(self):
+        results = []
+        reader = threading.Thread(target=lambda: results.append(
+            self.cli.get()))
+        reader.start()
+        self.cli.put("bye")
+        self.cli.stop()
+        reader.join(5)
+        self.assertFalse(reader.is_alive())
+        self.assertEqual(results, [None])
+        self.assertFalse(self.cli.is_running())
+
+    def test_stop_flushes(self):
+        self.cli.put("bye")
+        self.cli.stop()
+        self.assertEqual(self.stdout.getvalue(), "bye\n")
+        self.assertIsNone(self.cli.get())
+
+
+if __name__ == "__main__":
+    unittest.main()
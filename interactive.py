@@ -1,36 +1,75 @@
 """
 Run the solver with a user interface.
 """
-from queue import Queue
 import logging
+import queue
 
-from cli import CLIInput
+from cli import CLIInput, EventCLI
 from sweepersolver import GameBoard, TileBank, Point, Player, make_move
+from sweepersolver.session import bulk_reveal
 
 
 log = logging.getLogger(__name__)
 
 
+class _InputQueue(queue.Queue):
+    """ A queue of lines from the user for CLIInput which, like EventCLI,
+        keeps giving None once the input has ended, rather than just once.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._ended = False
+
+    def get(self, block=True, timeout=None):
+        if self._ended:
+            return None
+        item = super().get(block, timeout)
+        self._ended = item is None
+        return item
+
+
+def _get_input(from_user_q):
+    """ Get the next line the user entered, stripped of whitespace. The end
+        of the input is treated as the user entering 'q'.
+    """
+    user_input = from_user_q.get()
+    if user_input is None:
+        return 'q'
+    return user_input.strip()
+
+
 def _get_initial_parameters(to_user_q, from_user_q):
+    """ Ask the user about the game.
+
+    :return: A tuple of the width and height of the board and the enemy
+             counts, or None if the user quit.
+    """
     log.debug("Retrieving initial parameters")
     to_user_q.put("We'll need some initial information.")
     to_user_q.put("1. Please enter the width of the board, in squares:")
-    width = int(from_user_q.get())
+    user_input = _get_input(from_user_q)
+    if user_input == 'q':
+        return None
+    width = int(user_input)
     to_user_q.put("2. Please enter the height of the board, in squares:")
-    height = int(from_user_q.get())
+    user_input = _get_input(from_user_q)
+    if user_input == 'q':
+        return None
+    height = int(user_input)
     to_user_q.put("3. Please provide the counts of enemies on the board. "
                   "Enter them in the format: '<enemy_level>: <count>', with "
                   "each entry on a new line. Once all have been entered, "
                   "enter 'q' on its own line.")
 
     enemies = {}
-    response = from_user_q.get().strip()
+    response = _get_input(from_user_q)
     while response != 'q':
         level_str, count_str = response.split(':')
         level = int(level_str.strip())
         count = int(count_str.strip())
         enemies[level] = count
-        response = from_user_q.get().strip()
+        response = _get_input(from_user_q)
 
     return width, height, enemies
 
@@ -46,10 +85,12 @@ def _output_next_move(to_user_q, game_board, level):
     to_user_q.put("Next move: %s" % next_move)
 
 
-def _get_new_level(to_user_q, from_user_q):
-    to_user_q.put("Please enter current level:")
-    level = int(from_user_q.get().strip())
-    return level
+def _get_new_level(to_user_q, from_user_q, level):
+    to_user_q.put("Please enter current level, or q to keep it:")
+    user_input = _get_input(from_user_q)
+    if user_input == 'q':
+        return level
+    return int(user_input)
 
 
 def _get_more_board_state(to_user_q, from_user_q, game_board, tile_bank):
@@ -60,7 +101,7 @@ def _get_more_board_state(to_user_q, from_user_q, game_board, tile_bank):
                       "<x_coord>, <y_coord>, <monster_level>, "
                       "<neighbour_levels_sum>\n"
                       "Enter q to stop entering tiles.")
-        user_input = from_user_q.get().strip()
+        user_input = _get_input(from_user_q)
         split_input = user_input.split(',')
 
         if len(split_input) == 4:
@@ -73,6 +114,73 @@ def _get_more_board_state(to_user_q, from_user_q, game_board, tile_bank):
                                                         neighbour_levels_sum))
 
 
+def _parse_grid(lines, width, height):
+    """ Parse rows of squares of a board into the contents of the revealed
+        squares.
+
+    Each line is a row of the board, starting with the top row, made up of
+    squares separated by whitespace. Each square is either '?' if it hasn't
+    been revealed, or '<monster_level>/<neighbour_levels_sum>' if it has.
+    Blank lines are ignored.
+
+    :return: A mapping of the locations of revealed squares to tuples of their
+             monster level and neighbour levels sum.
+    :raises ValueError: If a square isn't in the expected format, or there
+                        aren't the given height of rows of width squares.
+    """
+    contents_by_location = {}
+    rows = [line.split() for line in lines if line.strip()]
+    if len(rows) != height:
+        raise ValueError("Expected %d rows, but got %d" % (height,
+                                                           len(rows)))
+    for y_coord, row in enumerate(rows):
+        if len(row) != width:
+            raise ValueError("Expected %d squares in row %d, but got %d" %
+                             (width, y_coord, len(row)))
+        for x_coord, square in enumerate(row):
+            if square == '?':
+                continue
+            level_str, slash, sum_str = square.partition('/')
+            if not slash:
+                raise ValueError("Square %r in row %d isn't '?' or "
+                                 "'<level>/<sum>'" % (square, y_coord))
+            contents_by_location[Point(x_coord, y_coord)] = (int(level_str),
+                                                             int(sum_str))
+    return contents_by_location
+
+
+def _bulk_input_board_state(to_user_q, from_user_q, game_board, tile_bank,
+                            level):
+    to_user_q.put("Please paste the board, one row per line starting with "
+                  "the top row, with the squares in each row separated by "
+                  "spaces. Enter '?' for a square that hasn't been revealed, "
+                  "or <monster_level>/<neighbour_levels_sum> for one that "
+                  "has, giving every row and every square in each row. "
+                  "Enter q on its own line when done.\n"
+                  "Alternatively, enter @<path> to read the board from a "
+                  "file in the same format.")
+    user_input = _get_input(from_user_q)
+    try:
+        if user_input.startswith('@'):
+            with open(user_input[1:].strip()) as grid_file:
+                lines = grid_file.readlines()
+        else:
+            lines = []
+            while user_input != 'q':
+                lines.append(user_input)
+                user_input = _get_input(from_user_q)
+
+        revealed = bulk_reveal(game_board, tile_bank,
+                               _parse_grid(lines, game_board.width,
+                                           game_board.height))
+    except (OSError, ValueError) as error:
+        to_user_q.put("Board not updated: %s" % error)
+        return
+
+    to_user_q.put("Revealed %d new tiles." % revealed)
+    _output_next_move(to_user_q, game_board, level)
+
+
 def _main_loop(to_user_q, from_user_q, game_board, tile_bank):
     level = 1
 
@@ -81,34 +189,55 @@ def _main_loop(to_user_q, from_user_q, game_board, tile_bank):
         _output_game_state(to_user_q, game_board, level)
         to_user_q.put("Please select one of the following:\n"
                       "  i: input more data about the state of the board\n"
+                      "  b: input the state of the whole board at once, "
+                      "and get next move\n"
                       "  n: get next move\n"
                       "  l: update level\n"
                       "  q: quit")
-        action = from_user_q.get().strip()
+        action = _get_input(from_user_q)
 
         if action == 'i':
             _get_more_board_state(to_user_q,
                                   from_user_q,
                                   game_board,
                                   tile_bank)
+        elif action == 'b':
+            _bulk_input_board_state(to_user_q,
+                                    from_user_q,
+                                    game_board,
+                                    tile_bank,
+                                    level)
         elif action == 'l':
-            level = _get_new_level(to_user_q, from_user_q)
+            level = _get_new_level(to_user_q, from_user_q, level)
         elif action == 'n':
             _output_next_move(to_user_q, game_board, level)
 
 
 def run_interactive():
-    to_user_q = Queue()
-    from_user_q = Queue()
-    interface = CLIInput(to_user_q, from_user_q)
-    interface.start()
-
-    to_user_q.put("Welcome to the sweepersolver!")
-
-    width, height, enemies = _get_initial_parameters(to_user_q, from_user_q)
-    tile_bank = TileBank(enemies)
-    game_board = GameBoard(width, height, tile_bank)
-
-    _main_loop(to_user_q, from_user_q, game_board, tile_bank)
-
-    interface.stop()
+    # The event driven CLI stands in for both the queue of messages to the
+    # user and the queue of their responses. Where it can't wait on the
+    # input, such as on Windows, fall back to the threaded CLI and queues.
+    interface = EventCLI()
+    try:
+        interface.start()
+        to_user_q = from_user_q = interface
+    except OSError as error:
+        log.debug("Using threaded CLI: %s", error)
+        to_user_q = queue.Queue()
+        from_user_q = _InputQueue()
+        interface = CLIInput(to_user_q, from_user_q)
+        interface.start()
+
+    try:
+        to_user_q.put("Welcome to the sweepersolver!")
+
+        parameters = _get_initial_parameters(to_user_q, from_user_q)
+        if parameters is None:
+            return
+        width, height, enemies = parameters
+        tile_bank = TileBank(enemies)
+        game_board = GameBoard(width, height, tile_bank)
+
+        _main_loop(to_user_q, from_user_q, game_board, tile_bank)
+    finally:
+        interface.stop()
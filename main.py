@@ -6,6 +6,11 @@ import argparse
 
 from interactive import run_interactive
 from automated import run_automated
+from batch import run_batch
+from replay import run_replay
+from profiling import run_profile
+from server import run_server
+from stream import run_stream
 from sweepersolver import DIFFICULTY_EASY, DIFFICULTY_HUGE_EX
 
 
@@ -29,17 +34,82 @@ def _set_up_arg_parser():
                             dest="automated",
                             action="store_true",
                             help="Run automated")
+    main_group.add_argument('--replay',
+                            type=str,
+                            metavar="RECORDING",
+                            help="Replay a recorded game through the solver")
+    main_group.add_argument('--serve',
+                            type=int,
+                            metavar="PORT",
+                            help="Serve the solver over HTTP on this port, "
+                                 "for many games at once")
+    main_group.add_argument('--stream',
+                            action="store_true",
+                            help="Read events as newline delimited JSON from "
+                                 "stdin and write next moves to stdout, to "
+                                 "drive the solver from another program")
     parser.add_argument('-d',
                         dest="difficulty",
                         type=str,
                         choices=DIFFICULTY_MAP.keys(),
-                        default=DIFFICULTY_EASY,
+                        default="easy",
                         help="Select difficulty")
     parser.add_argument('-p',
                         dest="pause",
                         type=float,
                         default=0,
                         help="Time to pause between moves")
+    parser.add_argument('--games',
+                        type=int,
+                        help="Play this many automated games without pausing "
+                             "or logging each move, and summarise the results")
+    parser.add_argument('--workers',
+                        type=int,
+                        default=1,
+                        help="Number of processes to spread games across, "
+                             "or of threads to solve games with when serving")
+    parser.add_argument('--seed',
+                        type=int,
+                        help="Seed for the game played, or the first of the "
+                             "games played - random for a single game and 0 "
+                             "for many by default")
+    parser.add_argument('--output',
+                        type=str,
+                        default="batch_summary.json",
+                        help="File to write the summary of the games to")
+    parser.add_argument('--lookahead',
+                        type=int,
+                        default=0,
+                        metavar="DEPTH",
+                        help="When there's no safe move, look this many moves "
+                             "ahead to choose one - slow, and off by default")
+    parser.add_argument('--record',
+                        type=str,
+                        metavar="RECORDING",
+                        help="File to write a recording of an automated game "
+                             "to")
+    parser.add_argument('--solver-moves',
+                        action="store_true",
+                        help="When replaying, play the solver's own moves "
+                             "rather than the recorded ones")
+    parser.add_argument('--host',
+                        type=str,
+                        default="127.0.0.1",
+                        help="Address to serve on")
+    parser.add_argument('--max-memory',
+                        type=int,
+                        default=256,
+                        metavar="MB",
+                        help="When serving, evict the least recently used "
+                             "games to keep their estimated memory use below "
+                             "this")
+    parser.add_argument('--profile',
+                        type=str,
+                        metavar="PREFIX",
+                        help="Profile automated games, one by default, "
+                             "writing per-move latencies, cProfile "
+                             "statistics, sampled stacks and peak memory to "
+                             "files starting with this prefix")
     return parser
 
 
@@ -47,9 +117,62 @@ if __name__ == "__main__":
     parser = _set_up_arg_parser()
     args = parser.parse_args()
 
+    if args.games is not None and not args.automated:
+        parser.error("--games can only be used when running automated")
+    if args.record is not None and (not args.automated or
+                                    args.games is not None):
+        parser.error("--record can only be used when running a single "
+                     "automated game")
+    if args.profile is not None and (not args.automated or
+                                     args.record is not None):
+        parser.error("--profile can only be used when running automated "
+                     "without recording")
+
     if args.interactive:
         run_interactive()
-    if args.automated:
+    if args.automated and args.profile is not None:
+        logging.basicConfig(level=logging.WARNING,
+                            format='%(asctime)-15s %(message)s')
+        logging.getLogger("profiling").setLevel(logging.INFO)
+        run_profile(args.difficulty,
+                    DIFFICULTY_MAP[args.difficulty],
+                    args.profile,
+                    1 if args.games is None else args.games,
+                    0 if args.seed is None else args.seed,
+                    args.lookahead)
+    elif args.automated and args.games is not None:
+        logging.basicConfig(level=logging.WARNING,
+                            format='%(asctime)-15s %(message)s')
+        logging.getLogger("batch").setLevel(logging.INFO)
+        run_batch(args.difficulty,
+                  DIFFICULTY_MAP[args.difficulty],
+                  args.games,
+                  args.workers,
+                  0 if args.seed is None else args.seed,
+                  args.output,
+                  args.lookahead)
+    elif args.automated:
         logging.basicConfig(level=logging.INFO,
                             format='%(asctime)-15s %(message)s')
-        run_automated(DIFFICULTY_MAP[args.difficulty], args.pause)
+        run_automated(DIFFICULTY_MAP[args.difficulty],
+                      args.pause,
+                      args.seed,
+                      args.difficulty,
+                      args.record,
+                      args.lookahead)
+    elif args.replay is not None:
+        logging.basicConfig(level=logging.WARNING,
+                            format='%(asctime)-15s %(message)s')
+        logging.getLogger("replay").setLevel(logging.INFO)
+        run_replay(args.replay, not args.solver_moves, args.lookahead)
+    elif args.stream:
+        # Logging goes to stderr, leaving stdout for responses.
+        logging.basicConfig(level=logging.WARNING,
+                            format='%(asctime)-15s %(message)s')
+        run_stream()
+    elif args.serve is not None:
+        logging.basicConfig(level=logging.WARNING,
+                            format='%(asctime)-15s %(message)s')
+        logging.getLogger("server").setLevel(logging.INFO)
+        logging.getLogger("sweepersolver.session").setLevel(logging.INFO)
+        run_server(args.host, args.serve, args.workers, args.max_memory)
@@ -0,0 +1,178 @@
+"""
+Profile the solver over automated games, to show where the time and memory
+go and make performance regressions visible.
+"""
+import cProfile
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+from sweepersolver.metrics import Metrics
+from batch import LatencyHistogram, play_game
+
+log = logging.getLogger(__name__)
+
+
+# Seconds between samples of the stack for the folded stack output.
+SAMPLE_INTERVAL = 0.001
+
+
+class StackSampler:
+    """ Samples the stack of a thread at regular intervals from a background
+        thread, counting how often each distinct stack is seen.
+
+    The counts are written out in the folded stack format read by flamegraph
+    tools - one line per stack, with the frames from the outermost in
+    separated by semicolons, followed by a space and the count.
+    """
+
+    def __init__(self, thread_id=None, interval=SAMPLE_INTERVAL):
+        """
+        :param thread_id: Ident of the thread to sample, by default the thread
+                          creating the sampler.
+        """
+        self._thread_id = (threading.get_ident() if thread_id is None
+                           else thread_id)
+        self._interval = interval
+        self._stacks = Counter()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def samples(self):
+        """ The total number of stacks sampled. """
+        return sum(self._stacks.values())
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        """ Start sampling in a background thread. """
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """ Stop sampling, waiting for the background thread to finish. """
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self._stacks[_folded_stack(frame)] += 1
+
+    def write(self, path):
+        """ Write the stacks sampled so far to a file, most common first. """
+        with open(path, 'w') as folded_file:
+            for stack, count in self._stacks.most_common():
+                folded_file.write("%s %d\n" % (stack, count))
+
+
+def _folded_stack(frame):
+    """ A string of the frames in a stack from the outermost in. """
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append("%s (%s:%d)" % (code.co_name,
+                                      os.path.basename(code.co_filename),
+                                      code.co_firstlineno))
+        frame = frame.f_back
+    return ";".join(reversed(frames))
+
+
+def run_profile(difficulty_name, difficulty, prefix, games=1, seed=0,
+                lookahead_depth=0):
+    """ Profile the solver over a number of games, writing the results to
+        files starting with the given prefix:
+
+    - <prefix>.json: per-move solver and board update latencies, metrics
+      from the board and solver, and peak traced memory
+    - <prefix>.prof: cProfile statistics, for pstats or snakeviz
+    - <prefix>.folded: sampled stacks, for flamegraph tools
+
+    Each kind of instrumentation slows down the solver in its own way, so the
+    same games are played once for each with nothing else running - first to
+    time moves, then under cProfile, then sampling stacks, then tracing
+    memory. Game i is seeded with seed + i, as for batch games.
+
+    :return: The summary written to <prefix>.json.
+    """
+    seeds = range(seed, seed + games)
+    log.info("Profiling %d games with difficulty %s", games, difficulty_name)
+
+    metrics = Metrics()
+    solver_latencies = LatencyHistogram()
+    board_latencies = LatencyHistogram()
+    wins = 0
+    start_time = time.perf_counter()
+    for game_seed in seeds:
+        result = play_game(difficulty, game_seed, lookahead_depth, metrics,
+                           board_latencies)
+        solver_latencies.merge(result["latencies"])
+        wins += result["won"]
+    elapsed = time.perf_counter() - start_time
+
+    profile_path = prefix + ".prof"
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        for game_seed in seeds:
+            play_game(difficulty, game_seed, lookahead_depth)
+    finally:
+        profile.disable()
+    profile.dump_stats(profile_path)
+    log.info("Written cProfile statistics to: %s", profile_path)
+
+    folded_path = prefix + ".folded"
+    with StackSampler() as sampler:
+        for game_seed in seeds:
+            play_game(difficulty, game_seed, lookahead_depth)
+    sampler.write(folded_path)
+    log.info("Written %d sampled stacks to: %s", sampler.samples, folded_path)
+
+    tracemalloc.start()
+    try:
+        for game_seed in seeds:
+            play_game(difficulty, game_seed, lookahead_depth)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    summary = {"difficulty": difficulty_name,
+               "seed": seed,
+               "games": games,
+               "wins": wins,
+               "moves": solver_latencies.count,
+               "elapsed_seconds": elapsed,
+               "solver_latency_ms": solver_latencies.summary(),
+               "board_latency_ms": board_latencies.summary(),
+               "metrics": metrics.stats(),
+               "peak_memory_mb": peak_memory / (1024 * 1024),
+               "profile_path": profile_path,
+               "folded_path": folded_path}
+
+    for name in ("solver", "board"):
+        latency = summary["%s_latency_ms" % name]
+        log.info("%s ms per move: p50 %.3f, p95 %.3f, p99 %.3f, max %.3f",
+                 name.capitalize(), latency["p50"], latency["p95"],
+                 latency["p99"], latency["max"])
+    log.info("Peak traced memory: %.1f MB", summary["peak_memory_mb"])
+
+    summary_path = prefix + ".json"
+    with open(summary_path, 'w') as summary_file:
+        json.dump(summary, summary_file, indent=2, sort_keys=True)
+    log.info("Written profile summary to: %s", summary_path)
+
+    return summary
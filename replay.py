@@ -0,0 +1,37 @@
+"""
+Replay a recorded game through the current solver, and report how it
+compares with the recording.
+"""
+import logging
+
+from sweepersolver.recording import read_recording, replay
+
+log = logging.getLogger(__name__)
+
+
+def run_replay(path, follow_recording=True, lookahead_depth=0):
+    """ Replay the recording at the given path, logging a summary.
+
+    :return: The summary of the replay.
+    """
+    recording = read_recording(path)
+    log.info("Replaying %r", recording)
+    summary = replay(recording, follow_recording, lookahead_depth)
+
+    log.info("Replayed %d of %d recorded moves, %d differed from the "
+             "recording", summary["moves"], summary["recorded_moves"],
+             summary["mismatches"])
+    if summary["first_mismatch"] is not None:
+        log.info("First differing move: %d", summary["first_mismatch"])
+    log.info("Solver time: %.3fs (recorded %.3fs), board update time: %.3fs",
+             summary["solver_seconds"],
+             summary["recorded_solver_seconds"],
+             summary["board_seconds"])
+    if summary["won"]:
+        log.info("Game won (recorded %s)",
+                 "won" if summary["recorded_won"] else "lost")
+    elif summary["killed_by"] is not None:
+        log.info("Killed by level %d enemy (recorded %s)",
+                 summary["killed_by"],
+                 "won" if summary["recorded_won"] else "lost")
+    return summary
@@ -0,0 +1,317 @@
+"""
+Serve the solver over HTTP, so that many games played elsewhere - such as by
+JavaScript running in a browser - can be solved at once.
+
+Requests and responses are JSON. Each game has a session, created with:
+
+    POST /sessions
+    {"width": 50, "height": 25, "enemies": {"0": 926, "1": 36, ...}}
+    -> 201 {"session": "<id>"}
+
+Revealed squares are sent in batches, which are all propagated together,
+and the response gives the next move to make:
+
+    POST /sessions/<id>/reveal
+    {"tiles": [[x, y, level, neighbour_levels_sum], ...],
+     "level": 1, "hp": 10}
+    -> 200 {"revealed": 3, "move": {"x": 4, "y": 7}}
+
+where "level" and "hp" describe the player, and are optional. If finding
+the move fails, the squares aren't revealed either. Once every square has
+been revealed, there is no move to make, and {"move": null, "complete": true}
+is given instead. The next move can also be asked for without revealing
+anything:
+
+    POST /sessions/<id>/move
+    {"level": 1, "hp": 10}
+    -> 200 {"move": {"x": 4, "y": 7}}
+
+and a finished session removed with:
+
+    DELETE /sessions/<id>
+    -> 200 {}
+
+Errors are given as {"error": "<message>"} with a 4xx status, including 404
+for sessions that have been evicted.
+
+The event loop only parses requests and keeps track of sessions - all
+building of boards and solving is done in a pool of worker threads, so the
+server keeps accepting and parsing requests while a slow board is solved.
+Solving is CPU bound though, so under the GIL the workers still take turns
+on a single core - more workers let more games be in progress at once, but
+don't make solving them any faster in total.
+"""
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from sweepersolver.session import (Session, SessionStore, get_int,
+                                   make_player, parse_enemies, parse_tiles)
+from sweepersolver.session.session import (DEFAULT_MAX_BYTES,
+                                           DEFAULT_IDLE_TIMEOUT)
+
+log = logging.getLogger(__name__)
+
+
+# Limits on the size of requests.
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# Seconds between checks for idle sessions to evict.
+IDLE_CHECK_INTERVAL = 60
+
+
+class HTTPError(Exception):
+    """ An error to report to the client with the given status. """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class SolverServer:
+    """ Handles HTTP connections, solving games in a SessionStore. """
+
+    def __init__(self, store, workers):
+        """
+        :param workers: Number of threads to solve sessions with.
+        """
+        self._store = store
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    def close(self):
+        """ Stop the worker threads, once they've finished their work. """
+        self._executor.shutdown()
+
+    async def evict_idle_sessions(self):
+        """ Evict idle sessions every so often, until cancelled. """
+        while True:
+            await asyncio.sleep(IDLE_CHECK_INTERVAL)
+            self._store.evict_idle()
+
+    async def handle_connection(self, reader, writer):
+        """ Respond to requests on a connection until it's closed. """
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request = await _read_request(reader)
+                except HTTPError as error:
+                    # The rest of the request can't be trusted, so give up
+                    # on the connection after responding.
+                    writer.write(_response(error.status,
+                                           {"error": str(error)},
+                                           keep_alive=False))
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                status, payload = await self._respond(method, path, body)
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, method, path, body):
+        """ The status and JSON payload of the response to a request. """
+        try:
+            return await self._dispatch(method, path, body)
+        except HTTPError as error:
+            return error.status, {"error": str(error)}
+        except ValueError as error:
+            return HTTPStatus.BAD_REQUEST, {"error": str(error)}
+        except Exception:
+            log.exception("Error handling %s %s", method, path)
+            return (HTTPStatus.INTERNAL_SERVER_ERROR,
+                    {"error": "Internal server error"})
+
+    async def _dispatch(self, method, path, body):
+        parts = [part for part in path.split('?')[0].split('/') if part]
+        if method == "OPTIONS":
+            return HTTPStatus.NO_CONTENT, None
+        if not parts or parts[0] != "sessions" or len(parts) > 3:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "No such path: %s" % path)
+
+        if len(parts) == 1:
+            if method != "POST":
+                raise _method_not_allowed(method, path)
+            return await self._create_session(_parse_json(body))
+
+        session_id = parts[1]
+        if len(parts) == 2:
+            if method != "DELETE":
+                raise _method_not_allowed(method, path)
+            try:
+                self._store.remove(session_id)
+            except KeyError:
+                raise _no_session(session_id)
+            return HTTPStatus.OK, {}
+
+        if method != "POST":
+            raise _method_not_allowed(method, path)
+        try:
+            session = self._store.get(session_id)
+        except KeyError:
+            raise _no_session(session_id)
+        request = _parse_json(body)
+        if parts[2] == "reveal":
+            return await self._reveal(session, request)
+        if parts[2] == "move":
+            return await self._move(session, request)
+        raise HTTPError(HTTPStatus.NOT_FOUND, "No such path: %s" % path)
+
+    async def _run(self, function, *args):
+        """ Run a function in the worker pool. """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, function, *args)
+
+    async def _create_session(self, request):
+        width = get_int(request, "width")
+        height = get_int(request, "height")
+        enemies = parse_enemies(request.get("enemies"))
+
+        self._store.check_fits(width, height)
+        session = await self._run(Session, width, height, enemies)
+        session_id = self._store.add(session)
+        return HTTPStatus.CREATED, {"session": session_id}
+
+    async def _reveal(self, session, request):
+        contents_by_location = parse_tiles(request.get("tiles"))
+        revealed, move = await self._run(session.reveal_and_move,
+                                         contents_by_location,
+                                         _get_player(request))
+        response = _move_response(move)
+        response["revealed"] = revealed
+        return HTTPStatus.OK, response
+
+    async def _move(self, session, request):
+        move = await self._run(session.next_move, _get_player(request))
+        return HTTPStatus.OK, _move_response(move)
+
+
+async def _read_request(reader):
+    """ Read a request from a connection.
+
+    :return: A tuple of the method, path, headers - with lower case names -
+             and body, or None if the connection was closed first.
+    :raises HTTPError: If the request is malformed or too large.
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                        "Request headers too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, path, _ = lines[0].split(" ")
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid content length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                        "Request body too large")
+    try:
+        body = await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        return None
+    return method, path, headers, body
+
+
+def _response(status, payload, keep_alive=True):
+    """ The bytes of a response with the given status and JSON payload. """
+    body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+    head = ["HTTP/1.1 %d %s" % (status, status.phrase),
+            "Content-Type: application/json",
+            "Content-Length: %d" % len(body),
+            # Allow pages from anywhere to use the solver.
+            "Access-Control-Allow-Origin: *",
+            "Access-Control-Allow-Methods: POST, DELETE, OPTIONS",
+            "Access-Control-Allow-Headers: Content-Type",
+            "Connection: %s" % ("keep-alive" if keep_alive else "close")]
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+def _parse_json(body):
+    try:
+        request = json.loads(body.decode("utf-8") if body else "{}")
+    except ValueError:
+        raise ValueError("Request body is not valid JSON")
+    if not isinstance(request, dict):
+        raise ValueError("Request body must be a JSON object")
+    return request
+
+
+def _get_player(request):
+    level = get_int(request, "level", 1)
+    hp = request.get("hp")
+    if hp is not None:
+        hp = get_int(request, "hp")
+    return make_player(level, hp)
+
+
+def _move_response(move):
+    """ The JSON payload giving a move, or that the game is complete if
+        there's no move to make.
+    """
+    if move is None:
+        return {"move": None, "complete": True}
+    return {"move": {"x": move.x, "y": move.y}}
+
+
+def _method_not_allowed(method, path):
+    return HTTPError(HTTPStatus.METHOD_NOT_ALLOWED,
+                     "Can't %s %s" % (method, path))
+
+
+def _no_session(session_id):
+    return HTTPError(HTTPStatus.NOT_FOUND,
+                     "No session %s - it may have been evicted" % session_id)
+
+
+def run_server(host, port, workers=4,
+               max_memory_mb=DEFAULT_MAX_BYTES // (1024 * 1024),
+               idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """ Serve the solver until interrupted.
+
+    :param workers: Number of threads to solve sessions with.
+    :param max_memory_mb: Limit on the estimated memory used by sessions,
+                          beyond which the least recently used are evicted.
+    :param idle_timeout: Seconds a session can go unused before it's evicted.
+    """
+    store = SessionStore(max_memory_mb * 1024 * 1024, idle_timeout)
+    server = SolverServer(store, workers)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    tcp = loop.run_until_complete(asyncio.start_server(
+        server.handle_connection, host, port, limit=MAX_HEADER_BYTES))
+    log.info("Serving on %s", ", ".join("%s:%d" % socket.getsockname()[:2]
+                                        for socket in tcp.sockets))
+    eviction_task = asyncio.ensure_future(server.evict_idle_sessions())
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        log.info("Stopped serving")
+    finally:
+        eviction_task.cancel()
+        tcp.close()
+        loop.run_until_complete(tcp.wait_closed())
+        server.close()
+        loop.close()
@@ -0,0 +1,139 @@
+"""
+Drive the solver from another process with newline delimited JSON.
+
+Each line read from stdin is a JSON object describing an event, and for
+each one a single line with a JSON object in response is written to stdout,
+in order, with no prompts. Events have a "type" of:
+
+- "init": start a new game, with "width", "height" and "enemies" (a mapping
+  of enemy level to count) as for the HTTP service, and optionally a "seed"
+  for the solver's random moves. Any game already going is replaced.
+- "reveal": reveal a batch of "tiles", each a list of x, y, enemy level and
+  neighbour levels sum, all propagated together.
+- "level": update the player's "level" and optionally "hp".
+- "move": just ask for the next move.
+
+Every event may also give the player's "level" and "hp", which are kept for
+later events. Successful responses give the next move to make, as
+{"move": {"x": 4, "y": 7}}, and for reveals also the number of tiles newly
+revealed. Once every square has been revealed there is no move to make, and
+{"move": null, "complete": true} is given instead. Failures give
+{"error": "<message>"}, and leave the game as it was - a reveal is only kept
+if the next move is found too. If an event has an "id", it's copied into the
+response.
+
+Responses are written out together whenever the solver has caught up with
+all the events read, so events can be pipelined through a pipe without
+waiting for each response.
+"""
+import json
+import logging
+import random
+import sys
+
+from cli import EventCLI
+from sweepersolver.session import (Session, get_int, make_player,
+                                   parse_enemies, parse_tiles)
+
+log = logging.getLogger(__name__)
+
+
+# The types of event that can be sent.
+EVENT_TYPES = ("init", "reveal", "level", "move")
+
+
+class StreamSolver:
+    """ The state of a game being driven by a stream of events. """
+
+    def __init__(self):
+        self._session = None
+        self._level = 1
+        self._hp = None
+
+    def handle(self, event):
+        """ Handle an event, returning the response to it.
+
+        :raises ValueError: If the event is invalid, in which case the state
+                            of the game is unchanged.
+        """
+        if not isinstance(event, dict):
+            raise ValueError("Event must be a JSON object")
+        event_type = event.get("type")
+        if event_type not in EVENT_TYPES:
+            raise ValueError("Unknown event type: %r" % (event_type,))
+
+        if event_type == "init":
+            level, hp = 1, None
+        else:
+            level, hp = self._level, self._hp
+        if "level" in event:
+            level = get_int(event, "level")
+        if "hp" in event:
+            hp = get_int(event, "hp")
+        player = make_player(level, hp)
+
+        if event_type == "init":
+            seed = event.get("seed")
+            if seed is not None:
+                seed = get_int(event, "seed")
+            session = Session(get_int(event, "width"),
+                              get_int(event, "height"),
+                              parse_enemies(event.get("enemies")),
+                              None if seed is None else random.Random(seed))
+        elif self._session is None:
+            raise ValueError("No game - send an init event first")
+        else:
+            session = self._session
+
+        if event_type == "reveal":
+            revealed, move = session.reveal_and_move(
+                parse_tiles(event.get("tiles")), player)
+        else:
+            move = session.next_move(player)
+
+        if move is None:
+            response = {"move": None, "complete": True}
+        else:
+            response = {"move": {"x": move.x, "y": move.y}}
+        if event_type == "reveal":
+            response["revealed"] = revealed
+
+        self._session = session
+        self._level = level
+        self._hp = hp
+        return response
+
+
+def run_stream(stdin=sys.stdin, stdout=sys.stdout):
+    """ Respond to events from stdin until it's closed. """
+    interface = EventCLI(stdin, stdout)
+    interface.start()
+    solver = StreamSolver()
+    try:
+        line = interface.get()
+        while line is not None:
+            if line.strip():
+                interface.put(json.dumps(_respond(solver, line)))
+            line = interface.get()
+    finally:
+        interface.stop()
+
+
+def _respond(solver, line):
+    """ The response to a line of input. """
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return {"error": "Invalid JSON: %r" % line}
+
+    try:
+        response = solver.handle(event)
+    except ValueError as error:
+        response = {"error": str(error)}
+    except Exception:
+        # Keep responding to later events, which may well be fine.
+        log.exception("Error handling event: %r", event)
+        response = {"error": "Internal error"}
+    if isinstance(event, dict) and "id" in event:
+        response["id"] = event["id"]
+    return response
@@ -1,5 +1,5 @@
-from .solver import make_move
-from .board import GameBoard
+from .solver import make_move, Solver
+from .board import GameBoard, ArrayGameBoard
 from .point import Point
 from .tiles import TileBank
 from .player import Player
@@ -1 +1,2 @@
-from .board import GameBoard
+from .board import GameBoard, PropagationStats
+from .arrayboard import ArrayGameBoard
@@ -0,0 +1,322 @@
+"""
+Object to represent a game board, storing the state of every space in flat
+arrays rather than as a graph of objects.
+"""
+import logging
+from array import array
+from collections import deque
+
+from ..boundedint import BoundedInt
+from ..tiles import Tile
+from .board import BoardSpace
+from .neighbours import neighbour_table, point_grid
+from .vectorised import propagate_flat, require_numpy
+
+
+log = logging.getLogger(__name__)
+
+
+class ArrayGameBoard:
+    """ Object to represent a game board, with the same interface as GameBoard.
+
+    Instead of a BoardSpace, Point, Tile and BoundedInt per space, the minimum
+    level, maximum level, revealed flag and neighbour levels sum of each space
+    are held in flat buffers indexed by ``y * width + x``. Spaces and tiles
+    handed out by this board are snapshots built on demand, and don't change
+    as the board is updated.
+    """
+
+    def __init__(self, width, height, tile_bank):
+        if width <= 0:
+            raise ValueError("Width must be strictly positive")
+        if height <= 0:
+            raise ValueError("Height must be strictly positive")
+
+        self._width = width
+        self._height = height
+        self._tile_bank = tile_bank
+
+        size = width * height
+        self._min_lvls = array('b', [tile_bank.min_level]) * size
+        self._max_lvls = array('b', [tile_bank.max_level]) * size
+        self._revealed = bytearray(size)
+        self._neighbour_lvls_sums = array('h', [0]) * size
+        self._revealed_count = 0
+        self._neighbours = neighbour_table(width, height)
+        self._points = point_grid(width, height)
+
+    def __repr__(self):
+        row_strs = ["[%s]" % ", ".join(repr(self._space(index))
+                                       for index in self._row_indices(y))
+                    for y in range(self.height)]
+        return "%s([%s])" % (self.__class__.__name__, ", ".join(row_strs))
+
+    def __str__(self):
+        row_strs = ["|%s|" % "|".join(str(self._space(index))
+                                      for index in self._row_indices(y))
+                    for y in range(self.height)]
+        border = '-' * len(row_strs[0])
+        inner_border = "\n%s\n" % border
+        return "%s\n%s\n%s" % (border, inner_border.join(row_strs), border)
+
+    @property
+    def condensed_repr(self):
+        """ A minimal string representaton of the board. """
+        row_strs = ["".join(str(self._min_lvls[index])
+                            if self._revealed[index] else '?'
+                            for index in self._row_indices(y))
+                    for y in range(self.height)]
+        return "\n".join(row_strs)
+
+    @property
+    def width(self):
+        """ The read only width of the board. """
+        return self._width
+
+    @property
+    def height(self):
+        """ The read only height of the board. """
+        return self._height
+
+    def _row_indices(self, y):
+        """ The range of indices of the spaces in the given row. """
+        return range(y * self.width, (y + 1) * self.width)
+
+    def location(self, x, y):
+        """ Get the location on the board with the given coordinates, as the
+            same Point every space at it reports.
+        """
+        return self._points.point(x, y)
+
+    def _index(self, location):
+        """ Get the index into the board buffers of the given location. """
+        if not self._point_inside_board(location):
+            raise ValueError("Tried to get tile outside board")
+
+        return location.y * self.width + location.x
+
+    def _tile(self, index):
+        """ Build a snapshot of the tile at the given index. """
+        enemy_lvl = BoundedInt(self._min_lvls[index], self._max_lvls[index])
+        if self._revealed[index]:
+            return Tile(enemy_lvl, self._neighbour_lvls_sums[index])
+        return Tile(enemy_lvl, placeholder=True)
+
+    def _space(self, index):
+        """ Build a snapshot of the space at the given index. """
+        return BoardSpace(self._points.points[index], self._tile(index),
+                          index)
+
+    def get_tile(self, location):
+        """ Get the tile at the given location on the board. """
+        return self._tile(self._index(location))
+
+    def iter_spaces(self):
+        """ Return an iterator over all spaces in the board. """
+        return (self._space(index) for index in range(len(self._revealed)))
+
+    def iter_revealed_spaces(self):
+        """ Return an iterator over all revealed spaces in the board. """
+        return (self._space(index) for index in range(len(self._revealed))
+                if self._revealed[index])
+
+    def iter_unrevealed_spaces(self):
+        """ Return an iterator over all unrevealed spaces in the board. """
+        return (self._space(index) for index in range(len(self._revealed))
+                if not self._revealed[index])
+
+    def iter_neighbours(self, space):
+        """ Return an iterator over all spaces in the board neighbouring the
+            given space.
+        """
+        return (self._space(index) for index in
+                self._neighbours.neighbours(self._index(space.location)))
+
+    def iter_revealed_neighbours(self, space):
+        """ Return an iterator over all revealed spaces in the board
+            neighbouring the given space.
+        """
+        return (self._space(index) for index in
+                self._neighbours.neighbours(self._index(space.location))
+                if self._revealed[index])
+
+    def iter_unrevealed_neighbours(self, space):
+        """ Return an iterator over all unrevealed spaces in the board
+            neighbouring the given space.
+        """
+        return (self._space(index) for index in
+                self._neighbours.neighbours(self._index(space.location))
+                if not self._revealed[index])
+
+    def in_start_state(self):
+        """ Whether the board still has all tiles unrevealed. """
+        return self._revealed_count == 0
+
+    def all_revealed(self):
+        """ Whether every tile on the board has been revealed. """
+        return self._revealed_count == len(self._revealed)
+
+    def iter_unrevealed_below_level(self, level):
+        """ Iterator over all unrevealed tiles known to contain an enemy with
+            a level no greater than the provided level.
+        """
+        return (self._space(index) for index in range(len(self._revealed))
+                if not self._revealed[index] and
+                self._max_lvls[index] <= level)
+
+    def iter_first_unrevealed_per_bounds(self, level):
+        """ Iterator over the first unrevealed space in board order for each
+            distinct bounds on enemy level, of those spaces known to contain
+            an enemy with a level no greater than the provided level.
+        """
+        seen_bounds = set()
+        for index in range(len(self._revealed)):
+            if self._revealed[index] or self._max_lvls[index] > level:
+                continue
+            bounds = (self._min_lvls[index], self._max_lvls[index])
+            if bounds not in seen_bounds:
+                seen_bounds.add(bounds)
+                yield self._space(index)
+
+    def _point_inside_board(self, point):
+        """ Check that the given point is that of a space on the board. """
+        return (0 <= point.x < self.width) and (0 <= point.y < self.height)
+
+    def _reveal(self, location, tile):
+        """ Store the given tile in the buffers at the given location.
+
+        :return: The index of the revealed space.
+        """
+        index = self._index(location)
+        if self._revealed[index]:
+            raise ValueError("Can replace placeholder tile only")
+        if tile.placeholder:
+            raise ValueError("Must replace placeholder with non-placeholder")
+
+        self._min_lvls[index] = tile.enemy_lvl.min
+        self._max_lvls[index] = tile.enemy_lvl.max
+        self._neighbour_lvls_sums[index] = tile.neighbour_lvls_sum
+        self._revealed[index] = 1
+        self._revealed_count += 1
+
+        return index
+
+    def set_revealed_tile(self, location, tile):
+        """ Set the tile at the given coordinates to the given tile. """
+        log.debug("Setting revealed tile %r at location: %r", tile, location)
+        index = self._reveal(location, tile)
+
+        self._update_board_after_reveal([index])
+
+    def bulk_reveal_tiles(self, tiles_by_locations, vectorised=False):
+        """ Given a mapping of locations to tiles, set all those locations
+            to contain their given tiles.
+
+        :param vectorised: If True, propagate the effects of the reveals by
+                           sweeping the whole board at once with NumPy, which
+                           is faster when a large part of the board changes.
+        :raises ImportError: If vectorised, and NumPy isn't installed.
+        """
+        if vectorised:
+            # Check before changing anything, so the board isn't left with
+            # tiles revealed but not propagated.
+            require_numpy()
+        log.debug("Setting revealed tiles: %r", tiles_by_locations)
+        indices = [self._reveal(location, tile)
+                   for location, tile in tiles_by_locations.items()]
+
+        if vectorised:
+            new_min_lvls, new_max_lvls, _ = propagate_flat(
+                self._min_lvls,
+                self._max_lvls,
+                self._revealed,
+                self._neighbour_lvls_sums,
+                self.width)
+            self._min_lvls = array('b', new_min_lvls)
+            self._max_lvls = array('b', new_max_lvls)
+        else:
+            self._update_board_after_reveal(indices)
+
+    def space_level_bounds_from_neighbour(self, space, neighbour):
+        """ Given a space and one of its neighbours, examine all other
+            neighbours of the neighbour space to give a maximum and minumum
+            possible level for the space.
+        """
+        index = self._index(space.location)
+        neighbour_index = self._index(neighbour.location)
+        if not self._revealed[neighbour_index]:
+            raise ValueError("Cannot calculate for unrevealed neighbour")
+        neighbour_indices = self._neighbours.neighbours(neighbour_index)
+        if index not in neighbour_indices:
+            raise ValueError("Spaces given must be neighbours")
+
+        lvls_sum = self._neighbour_lvls_sums[neighbour_index]
+        bounds = BoundedInt(
+            lvls_sum - sum(self._max_lvls[other] for other in neighbour_indices
+                           if other != index),
+            lvls_sum - sum(self._min_lvls[other] for other in neighbour_indices
+                           if other != index))
+
+        log.debug("Found possible level limits as: %r", bounds)
+        return bounds
+
+    def _update_board_after_reveal(self, indices):
+        """ Spaces on the board have just been revealed. Update all affected
+            spaces on the board to reflect this new information.
+
+        Each revealed space is a constraint on the levels of its unrevealed
+        neighbours, and revealing a space changes the constraints it is part
+        of - its own, and those of its revealed neighbours. Those constraints
+        are put on a worklist, and whenever applying one tightens the bounds
+        on an unrevealed space, the constraints of all revealed neighbours of
+        that space are queued again, until no more modifications take place.
+        """
+        min_lvls = self._min_lvls
+        max_lvls = self._max_lvls
+        revealed = self._revealed
+        neighbours = self._neighbours.neighbours
+
+        worklist = deque()
+        queued = set()
+        for index in indices:
+            for constraint in (index, *neighbours(index)):
+                if revealed[constraint] and constraint not in queued:
+                    queued.add(constraint)
+                    worklist.append(constraint)
+
+        while worklist:
+            constraint = worklist.popleft()
+            queued.discard(constraint)
+
+            neighbour_indices = neighbours(constraint)
+            lvls_sum = self._neighbour_lvls_sums[constraint]
+            min_sum = sum(min_lvls[index] for index in neighbour_indices)
+            max_sum = sum(max_lvls[index] for index in neighbour_indices)
+
+            for index in neighbour_indices:
+                if revealed[index]:
+                    continue
+
+                old_min = min_lvls[index]
+                old_max = max_lvls[index]
+                bound_min = lvls_sum - (max_sum - old_max)
+                bound_max = lvls_sum - (min_sum - old_min)
+                if bound_min > old_max or bound_max < old_min:
+                    raise ValueError("New bounds don't intersect existing "
+                                     "bounds")
+                if bound_min <= old_min and bound_max >= old_max:
+                    continue
+
+                new_min = max(old_min, bound_min)
+                new_max = min(old_max, bound_max)
+                log.debug("Restricted space %d to [%d-%d]",
+                          index, new_min, new_max)
+                min_lvls[index] = new_min
+                max_lvls[index] = new_max
+                min_sum += new_min - old_min
+                max_sum += new_max - old_max
+
+                for other in neighbours(index):
+                    if revealed[other] and other not in queued:
+                        queued.add(other)
+                        worklist.append(other)
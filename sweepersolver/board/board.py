@@ -2,9 +2,15 @@
 Object to represent a game board.
 """
 import logging
+import time
+from array import array
+from collections import deque
 
-from ..point import Point
 from ..boundedint import BoundedInt
+from ..metrics import NULL_METRICS
+from .neighbours import neighbour_table, point_grid
+from .levelindex import UnrevealedIndex
+from .vectorised import propagate_flat, require_numpy
 
 
 log = logging.getLogger(__name__)
@@ -15,9 +21,10 @@ class BoardSpace:
         tile.
     """
 
-    def __init__(self, location, tile):
+    def __init__(self, location, tile, index=None):
         self._location = location
         self._tile = tile
+        self._index = index
 
     def __repr__(self):
         return "%s(%r, %r)" % (self.__class__.__name__,
@@ -37,6 +44,11 @@ class BoardSpace:
         """ The coordinates of this tile on the game board. """
         return self._location
 
+    @property
+    def index(self):
+        """ The index of this space in its board, if it has one. """
+        return self._index
+
     @property
     def revealed(self):
         """ Whether this space is revealed, and so if the tile in this space is
@@ -58,15 +70,52 @@ class BoardSpace:
 
         return old_tile
 
+    def restore_placeholder(self, placeholder):
+        """ Put back the placeholder a tile replaced, returning the tile. """
+        if self.tile.placeholder:
+            raise ValueError("Can restore placeholder over revealed tile only")
+        if not placeholder.placeholder:
+            raise ValueError("Must restore a placeholder tile")
+
+        old_tile = self._tile
+        self._tile = placeholder
+
+        return old_tile
+
     def is_neighbour(self, neighbour):
         """ Returns True if this space neighbours the given space. """
         return self.location.chebyshev_distance(neighbour.location) == 1
 
 
+class PropagationStats:
+    """ Counts of the work done in propagating the effects of a reveal across
+        the board.
+    """
+
+    def __init__(self):
+        # The number of constraints taken from the worklist.
+        self.iterations = 0
+        # The number of times a constraint was used to bound a space.
+        self.evaluations = 0
+        # The number of distinct spaces which had their bounds tightened.
+        self.tightened = 0
+
+    def __repr__(self):
+        return "%s(iterations=%r, evaluations=%r, tightened=%r)" % (
+            self.__class__.__name__,
+            self.iterations,
+            self.evaluations,
+            self.tightened)
+
+
 class GameBoard:
     """ Object to represent a game board made up of a 2D array of tiles. """
 
-    def __init__(self, width, height, tile_bank):
+    def __init__(self, width, height, tile_bank, metrics=None):
+        """
+        :param metrics: Metrics to report reveals and propagation work to.
+                        Nothing is reported if not given.
+        """
         if width <= 0:
             raise ValueError("Width must be strictly positive")
         if height <= 0:
@@ -75,11 +124,43 @@ class GameBoard:
         self._width = width
         self._height = height
         self._tile_bank = tile_bank
+        self._metrics = NULL_METRICS if metrics is None else metrics
 
-        self._board = [[BoardSpace(Point(x, y),
-                                   self._tile_bank.new_placeholder())
+        self._points = point_grid(self.width, self.height)
+        self._board = [[BoardSpace(self._points.points[y * self.width + x],
+                                   self._tile_bank.new_placeholder(),
+                                   y * self.width + x)
                         for x in range(self.width)]
                        for y in range(self.height)]
+        self._spaces = [space for row in self._board for space in row]
+        self._neighbours = neighbour_table(self.width, self.height)
+
+        # Running sums of the minimum and maximum levels of the neighbours of
+        # each space, indexed by space index. These are kept up to date as
+        # the bounds on spaces change, so that bounds from a revealed space
+        # can be calculated without walking all its neighbours.
+        offsets = self._neighbours.offsets
+        neighbour_counts = [offsets[index + 1] - offsets[index]
+                            for index in range(len(self._spaces))]
+        self._neighbour_min_sums = array('i', (count * tile_bank.min_level
+                                               for count in neighbour_counts))
+        self._neighbour_max_sums = array('i', (count * tile_bank.max_level
+                                               for count in neighbour_counts))
+
+        self._unrevealed_index = UnrevealedIndex(self._spaces)
+        self._revealed_count = 0
+        self._listeners = []
+
+        # Undo trail of changes made since the first active checkpoint, and
+        # the length of the trail at each checkpoint. The trail is None when
+        # there are no checkpoints, so nothing is recorded.
+        self._trail = None
+        self._checkpoints = []
+
+        # Flags for which revealed spaces are on the propagation worklist,
+        # indexed by space index.
+        self._queued = bytearray(len(self._spaces))
+        self._last_propagation_stats = PropagationStats()
 
     def __repr__(self):
         row_strs = ["[%s]" % ", ".join(repr(space) for space in row)
@@ -107,11 +188,32 @@ class GameBoard:
         """ The read only width of the board. """
         return self._width
 
+    @property
+    def tile_bank(self):
+        """ The bank the tiles on this board come from. """
+        return self._tile_bank
+
+    @property
+    def metrics(self):
+        """ The metrics this board reports its work to. """
+        return self._metrics
+
+    @property
+    def last_propagation_stats(self):
+        """ Statistics on the work done propagating the most recent reveal. """
+        return self._last_propagation_stats
+
     @property
     def height(self):
         """ The read only height of the board. """
         return self._height
 
+    def location(self, x, y):
+        """ Get the location on the board with the given coordinates, as the
+            same Point every space at it reports.
+        """
+        return self._points.point(x, y)
+
     def _get_space(self, location):
         """ Get the space at the given location on the board. """
         if not self._point_inside_board(location):
@@ -125,7 +227,7 @@ class GameBoard:
 
     def iter_spaces(self):
         """ Return an iterator over all spaces in the board. """
-        return (space for row in self._board for space in row)
+        return iter(self._spaces)
 
     def iter_revealed_spaces(self):
         """ Return an iterator over all revealed spaces in the board. """
@@ -139,34 +241,126 @@ class GameBoard:
         """ Return an iterator over all spaces in the board neighbouring the
             given space.
         """
-        return (self._get_space(point)
-                for point in space.location.all_chebyshev_neighbours()
-                if self._point_inside_board(point))
+        spaces = self._spaces
+        return (spaces[index]
+                for index in self._neighbours.neighbours(space.index))
 
     def iter_revealed_neighbours(self, space):
         """ Return an iterator over all revealed spaces in the board
             neighbouring the given space.
         """
-        return (neighbour for neighbour in self.iter_neighbours(space)
-                if neighbour.revealed)
+        spaces = self._spaces
+        return (spaces[index]
+                for index in self._neighbours.neighbours(space.index)
+                if not spaces[index].tile.placeholder)
 
     def iter_unrevealed_neighbours(self, space):
         """ Return an iterator over all unrevealed spaces in the board
             neighbouring the given space.
         """
-        return (neighbour for neighbour in self.iter_neighbours(space)
-                if not neighbour.revealed)
+        spaces = self._spaces
+        return (spaces[index]
+                for index in self._neighbours.neighbours(space.index)
+                if spaces[index].tile.placeholder)
 
     def in_start_state(self):
         """ Whether the board still has all tiles unrevealed. """
-        return next(self.iter_revealed_spaces(), None) is None
+        return self._revealed_count == 0
+
+    def all_revealed(self):
+        """ Whether every tile on the board has been revealed. """
+        return self._revealed_count == len(self._spaces)
 
     def iter_unrevealed_below_level(self, level):
         """ Iterator over all unrevealed tiles known to contain an enemy with
             a level no greater than the provided level.
         """
-        return (space for space in self.iter_unrevealed_spaces()
-                if space.tile.enemy_lvl <= level)
+        return self._unrevealed_index.iter_below_level(level)
+
+    def iter_first_unrevealed_per_bounds(self, level):
+        """ Iterator over the first unrevealed space in board order for each
+            distinct bounds on enemy level, of those spaces known to contain
+            an enemy with a level no greater than the provided level.
+
+        Since the scores of moves only depend on the bounds, this gives the
+        best moves without having to look through every candidate space.
+        """
+        return self._unrevealed_index.iter_first_per_bounds(level)
+
+    def unrevealed_bounds_counts(self):
+        """ A mapping of each distinct (min, max) bounds on enemy level of
+            unrevealed spaces to the number of spaces with those bounds.
+        """
+        return self._unrevealed_index.bounds_counts()
+
+    def iter_unrevealed_with_bounds(self, min_level, max_level):
+        """ Iterator over all unrevealed spaces with exactly the given bounds
+            on enemy level, in no particular order.
+        """
+        return self._unrevealed_index.iter_bucket(min_level, max_level)
+
+    def add_listener(self, listener):
+        """ Register a function to be called whenever the bounds on the level
+            of the enemy in a space change, including when it's revealed.
+
+        The listener is called with the space, its bounds before the change
+        and its neighbour levels sum before the change (None unless a reveal
+        is being rolled back), after the board's own state has been updated.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """ Stop calling a function registered with add_listener. """
+        self._listeners.remove(listener)
+
+    def checkpoint(self):
+        """ Mark the current state of the board, so that all changes made
+            after this can be undone with rollback.
+
+        Checkpoints nest - each rollback or commit applies to the most recent
+        checkpoint not yet rolled back or committed. While there are any
+        checkpoints, every change is recorded on a trail, so rolling back
+        takes time in proportion to the changes made since the checkpoint
+        rather than the size of the board.
+        """
+        if self._trail is None:
+            self._trail = []
+        self._checkpoints.append(len(self._trail))
+
+    def rollback(self):
+        """ Undo all changes made since the most recent checkpoint, and
+            remove the checkpoint.
+
+        The tile bank, and anything listening to the board, are restored
+        along with the board.
+        """
+        if not self._checkpoints:
+            raise ValueError("No checkpoint to roll back to")
+        mark = self._checkpoints.pop()
+        trail = self._trail
+        while len(trail) > mark:
+            space, old_tile, old_enemy_lvl = trail.pop()
+            if old_tile is None:
+                current_lvl = space.tile.enemy_lvl
+                space.tile.restore_enemy_level(old_enemy_lvl)
+                self._bounds_changed(space, current_lvl)
+            else:
+                tile = space.restore_placeholder(old_tile)
+                self._tile_bank.put_back(tile, old_tile)
+                self._bounds_changed(space, tile.enemy_lvl,
+                                     tile.neighbour_lvls_sum)
+        if not self._checkpoints:
+            self._trail = None
+
+    def commit(self):
+        """ Keep all changes made since the most recent checkpoint, and
+            remove the checkpoint.
+        """
+        if not self._checkpoints:
+            raise ValueError("No checkpoint to commit")
+        self._checkpoints.pop()
+        if not self._checkpoints:
+            self._trail = None
 
     def _point_inside_board(self, point):
         """ Check that the given point is that of a space on the board. """
@@ -176,150 +370,243 @@ class GameBoard:
         """ Set the tile at the given coordinates to the given tile. """
         log.debug("Setting revealed tile %r at location: %r", tile, location)
         space = self._get_space(location)
-        placeholder = space.replace_placeholder(tile)
-        self._tile_bank.return_placeholder(placeholder)
+        self._reveal(space, tile)
 
-        self._update_board_after_reveal(space)
+        self._update_board_after_reveal([space])
 
-    def bulk_reveal_tiles(self, tiles_by_locations):
+    def bulk_reveal_tiles(self, tiles_by_locations, vectorised=False):
         """ Given a mapping of locations to tiles, set all those locations
             to contain their given tiles.
+
+        :param vectorised: If True, propagate the effects of the reveals by
+                           sweeping the whole board at once with NumPy, which
+                           is faster when a large part of the board changes.
+        :raises ImportError: If vectorised, and NumPy isn't installed.
         """
+        if vectorised:
+            # Check before changing anything, so the board isn't left with
+            # tiles revealed but not propagated.
+            require_numpy()
         log.debug("Setting revealed tiles: %r", tiles_by_locations)
         updated_spaces = []
         for location, tile in tiles_by_locations.items():
             space = self._get_space(location)
-            placeholder = space.replace_placeholder(tile)
-            self._tile_bank.return_placeholder(placeholder)
+            self._reveal(space, tile)
 
             updated_spaces.append(space)
 
-        for space in updated_spaces:
-            self._update_board_after_reveal(space)
+        if vectorised:
+            self._update_board_vectorised()
+        else:
+            self._update_board_after_reveal(updated_spaces)
 
     def space_level_bounds_from_neighbour(self, space, neighbour):
         """ Given a space and one of its neighbours, examine all other
             neighbours of the neighbour space to give a maximum and minumum
             possible level for the space.
+
+        The sums of the levels of all the neighbours of the neighbour space
+        are maintained as bounds change, so the other neighbours are found by
+        just taking off the contribution of the space itself.
         """
         if not neighbour.revealed:
             raise ValueError("Cannot calculate for unrevealed neighbour")
-        if not space.is_neighbour(neighbour):
+        if neighbour.location not in self._points.neighbours(space.index):
             raise ValueError("Spaces given must be neighbours")
 
-        result_min = neighbour.tile.neighbour_lvls_sum
-        result_max = neighbour.tile.neighbour_lvls_sum
-        result_max -= sum(iter_neighbour.tile.enemy_lvl.min
-                          for iter_neighbour in self.iter_neighbours(neighbour)
-                          if iter_neighbour != space)
-        result_min -= sum(iter_neighbour.tile.enemy_lvl.max
-                          for iter_neighbour in self.iter_neighbours(neighbour)
-                          if iter_neighbour != space)
-
-        bounds = BoundedInt(result_min, result_max)
+        bounds = self._bounds_from_neighbour(space, neighbour)
 
         log.debug("Found possible level limits as: %r", bounds)
         return bounds
 
-    def _update_unrevealed_space(self, space):
-        """ Given an unrevealed space, update its possible state from its
-            neighbours.
-
-        This means looping through all its revealed neighbours, and seeing if
-        base on them we can further restrict the bounds on this space.
-
-        :return: Returns True if the space was actually modified in any way.
+    def _reveal(self, space, tile):
+        """ Replace the placeholder in a space with a revealed tile. """
+        placeholder = space.replace_placeholder(tile)
+        self._tile_bank.return_placeholder(placeholder)
+        self._metrics.count("board.reveals")
+        if self._trail is not None:
+            self._trail.append((space, placeholder, None))
+        self._bounds_changed(space, placeholder.enemy_lvl)
+
+    def _bounds_changed(self, space, old_enemy_lvl,
+                        old_neighbour_lvls_sum=None):
+        """ The bounds on the level of the enemy in a space have changed from
+            the given old bounds - update the index of unrevealed spaces and
+            the level sums of its neighbours, then tell any listeners.
+
+        :param old_neighbour_lvls_sum: The neighbour levels sum of the space
+                                       if it was revealed, and has been
+                                       unrevealed by a rollback.
         """
-        log.debug("Updating bounds on unrevealed space: %r", space)
         if space.revealed:
-            raise ValueError("Require unrevealed space")
-
-        any_updates = False
-
-        for neighbour in self.iter_revealed_neighbours(space):
-            log.debug("Updating bounds based on neighbour: %r", neighbour)
-            new_bounds = self.space_level_bounds_from_neighbour(space,
-                                                                neighbour)
-            updated = space.tile.restrict_enemy_level(new_bounds)
-            any_updates = any_updates or updated
-
-        return any_updates
-
-    def _update_unrevealed_neighbours_of_revealed(self, space):
-        """ Update all the unrevealed neighbours of the given revealed space on
-            the board.
-
-        :return: A set of any modified unrevealed spaces.
+            self._unrevealed_index.remove(space, old_enemy_lvl)
+            self._revealed_count += 1
+        elif old_neighbour_lvls_sum is not None:
+            self._unrevealed_index.add(space)
+            self._revealed_count -= 1
+        else:
+            self._unrevealed_index.move(space, old_enemy_lvl)
+
+        enemy_lvl = space.tile.enemy_lvl
+        min_change = enemy_lvl.min - old_enemy_lvl.min
+        max_change = enemy_lvl.max - old_enemy_lvl.max
+        min_sums = self._neighbour_min_sums
+        max_sums = self._neighbour_max_sums
+        for index in self._neighbours.neighbours(space.index):
+            min_sums[index] += min_change
+            max_sums[index] += max_change
+
+        for listener in self._listeners:
+            listener(space, old_enemy_lvl, old_neighbour_lvls_sum)
+
+    def _restrict_space(self, space, new_bounds):
+        """ Tighten the bounds on the level of the enemy in an unrevealed space
+            if possible.
+
+        :return: True if the bounds on the space were updated at all.
         """
-        if not space.revealed:
-            raise ValueError("Require revealed space")
-
-        updated_spaces = set()
-
-        for neighbour in self.iter_unrevealed_neighbours(space):
-            log.debug("Checking unrevealed neighbour space: %r", neighbour)
-            updated = self._update_unrevealed_space(neighbour)
-            if updated:
-                updated_spaces.add(neighbour)
-
-        return updated_spaces
-
-    def _propagate_unrevealed_space_update(self, unrevealed_space):
-        """ An unrevealed space on the board has been updated - propagate that
-            update to all affected spaces.
-
-        In practice, this means that all revealed neighbours of the unrevealed
-        space must have their unrevealed neighbours updated too.
-
-        :return: Set of any modified unrevealed spaces.
+        old_enemy_lvl = space.tile.enemy_lvl
+        updated = space.tile.restrict_enemy_level(new_bounds)
+        if updated:
+            if self._trail is not None:
+                self._trail.append((space, None, old_enemy_lvl))
+            self._bounds_changed(space, old_enemy_lvl)
+        return updated
+
+    def _bounds_from_neighbour(self, space, neighbour):
+        """ The bounds on the level of the enemy in a space given by one of
+            its revealed neighbours, without checking the arguments.
         """
-        modified_spaces = set()
-
-        for neighbour in self.iter_revealed_neighbours(unrevealed_space):
-            updates = self._update_unrevealed_neighbours_of_revealed(neighbour)
-            modified_spaces.update(updates)
-
-        log.debug("Modified spaces: %r", modified_spaces)
-        return modified_spaces
+        lvls_sum = neighbour.tile.neighbour_lvls_sum
+        enemy_lvl = space.tile.enemy_lvl
+        return BoundedInt(
+            lvls_sum - (self._neighbour_max_sums[neighbour.index] -
+                        enemy_lvl.max),
+            lvls_sum - (self._neighbour_min_sums[neighbour.index] -
+                        enemy_lvl.min))
+
+    def _update_board_vectorised(self):
+        """ Update the bounds on all unrevealed spaces on the board to reflect
+            all revealed spaces, using whole board NumPy operations.
+        """
+        spaces = self._spaces
+        min_lvls = [space.tile.enemy_lvl.min for space in spaces]
+        max_lvls = [space.tile.enemy_lvl.max for space in spaces]
+        revealed = [space.revealed for space in spaces]
+        neighbour_lvls_sums = [space.tile.neighbour_lvls_sum or 0
+                               for space in spaces]
+
+        with self._metrics.timer("board.propagate_vectorised"):
+            new_min_lvls, new_max_lvls, sweeps = propagate_flat(
+                min_lvls, max_lvls, revealed, neighbour_lvls_sums,
+                self.width)
+
+        stats = PropagationStats()
+        stats.iterations = sweeps
+        stats.evaluations = sweeps * sum(
+            1 for space in spaces if space.revealed
+            for _ in self.iter_unrevealed_neighbours(space))
+        for index, space in enumerate(spaces):
+            if (new_min_lvls[index] != min_lvls[index] or
+                    new_max_lvls[index] != max_lvls[index]):
+                self._restrict_space(space, BoundedInt(new_min_lvls[index],
+                                                       new_max_lvls[index]))
+                stats.tightened += 1
+
+        self._record_propagation(stats)
+        log.debug("Vectorised propagation complete: %r", stats)
+
+    def _update_board_after_reveal(self, spaces):
+        """ Spaces on the board have just been revealed. Update all affected
+            spaces on the board to reflect this new information.
 
-    def _update_set_of_unrevealed_spaces(self, space_set):
-        """ Given a set of updated unrevealed spaces, propagate those updates
-            to the rest of the board. If any further updates are made,
-            propagate those too, and so on until all updates are complete.
+        Each revealed space is a constraint on the levels of its unrevealed
+        neighbours. Revealing a space changes its own constraint and those of
+        its revealed neighbours, so they all need applying again.
         """
-        while len(space_set) > 0:
-            space = space_set.pop()
-            modified_spaces = self._propagate_unrevealed_space_update(space)
-            space_set.update(modified_spaces)
+        constraints = []
+        for space in spaces:
+            constraints.append(space)
+            constraints.extend(self.iter_revealed_neighbours(space))
 
-    def _update_board_after_reveal(self, space):
-        """ A space on the board has just been revealed. Update all affected
-            spaces on the board to reflect this new information.
+        self._propagate(constraints)
 
-        When a space is revealed:
-        - Each revealed neighbour needs to update all its unrevealed neighbours
-          since their values are more closely constrained, but revealed
-          neighbours of that revealed neighbour are unaffected.
-        - Each unrevealed neighbour needs to update its possible values.
+    def restrict_spaces(self, bounds_by_space):
+        """ Tighten the bounds on unrevealed spaces given information from
+            outside the board, such as further inference, and propagate the
+            effects across the board.
 
-        Following on from and including those updates, any time that an
-        unrevealed space is actually altered, all revealed neighbours of that
-        space must have their unrevealed neighbours updated too. This cascade
-        then continues until no more modifications take place.
+        :param bounds_by_space: Mapping of unrevealed spaces on this board to
+                                new bounds on their levels.
+        :return: The number of the given spaces that were actually tightened.
+        """
+        updated_spaces = [space for space, bounds in bounds_by_space.items()
+                          if self._restrict_space(space, bounds)]
+        log.debug("Restricted spaces: %r", updated_spaces)
+
+        self._propagate(neighbour
+                        for space in updated_spaces
+                        for neighbour in self.iter_revealed_neighbours(space))
+        return len(updated_spaces)
+
+    def _propagate(self, constraints):
+        """ Given revealed spaces whose constraints on their unrevealed
+            neighbours may have changed, propagate those changes across the
+            board.
+
+        Constraints are put on a worklist, then taken off and used to tighten
+        the bounds on their unrevealed neighbours. Any time that an unrevealed
+        space is actually altered, all revealed neighbours of that space are
+        queued again (if they aren't already). This continues until no more
+        modifications take place.
         """
-        updated_spaces = set()
-
-        for neighbour in self.iter_unrevealed_neighbours(space):
-            log.debug("Checking unrevealed neighbour space: %r", neighbour)
-            updated = self._update_unrevealed_space(neighbour)
-            if updated:
-                log.debug("Space was updated")
-                updated_spaces.add(neighbour)
-
-        for neighbour in self.iter_revealed_neighbours(space):
-            log.debug("Checking revealed neighbour space: %r", neighbour)
-            updates = self._update_unrevealed_neighbours_of_revealed(neighbour)
-            updated_spaces.update(updates)
-
-        log.debug("Set of spaces to propagate updates to: %r", updated_spaces)
-        self._update_set_of_unrevealed_spaces(updated_spaces)
+        stats = PropagationStats()
+        tightened = set()
+        queued = self._queued
+        worklist = deque()
+        start_time = time.perf_counter() if self._metrics.enabled else None
+
+        def enqueue(constraint):
+            if not queued[constraint.index]:
+                queued[constraint.index] = 1
+                worklist.append(constraint)
+
+        try:
+            for constraint in constraints:
+                enqueue(constraint)
+
+            while worklist:
+                constraint = worklist.popleft()
+                queued[constraint.index] = 0
+                stats.iterations += 1
+                log.debug("Applying constraint from space: %r", constraint)
+
+                for space in self.iter_unrevealed_neighbours(constraint):
+                    stats.evaluations += 1
+                    bounds = self._bounds_from_neighbour(space, constraint)
+                    if self._restrict_space(space, bounds):
+                        log.debug("Space was updated: %r", space)
+                        tightened.add(space.index)
+                        for neighbour in self.iter_revealed_neighbours(space):
+                            enqueue(neighbour)
+        finally:
+            # Leave the flags clear for next time, even if the tiles revealed
+            # turned out to be inconsistent with the board.
+            for constraint in worklist:
+                queued[constraint.index] = 0
+
+        stats.tightened = len(tightened)
+        if start_time is not None:
+            self._metrics.add_time("board.propagate",
+                                   time.perf_counter() - start_time)
+        self._record_propagation(stats)
+        log.debug("Propagation complete: %r", stats)
+
+    def _record_propagation(self, stats):
+        """ Keep the statistics from a propagation, and report them. """
+        self._last_propagation_stats = stats
+        metrics = self._metrics
+        metrics.count("board.propagations")
+        metrics.count("board.propagation_rounds", stats.iterations)
+        metrics.count("board.constraint_evaluations", stats.evaluations)
+        metrics.count("board.bounds_tightened", stats.tightened)
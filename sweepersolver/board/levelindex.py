@@ -0,0 +1,107 @@
+"""
+An index of the unrevealed spaces on a game board.
+"""
+import heapq
+import logging
+
+
+log = logging.getLogger(__name__)
+
+
+class UnrevealedIndex:
+    """ Index of the unrevealed spaces on a board, bucketed by the bounds on
+        the level of the enemy in each space.
+
+    Each bucket holds the indices of its spaces, along with a heap of them so
+    that the first space in board order in each bucket can be found without
+    scanning. Entries are removed from the heaps lazily, when they reach the
+    top and are found to no longer be in the bucket.
+    """
+
+    def __init__(self, spaces):
+        self._spaces = spaces
+        self._buckets = {}
+        self._heaps = {}
+
+        for space in spaces:
+            if not space.revealed:
+                self.add(space)
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+    @staticmethod
+    def _key(enemy_lvl):
+        """ The key of the bucket for spaces with the given bounds. """
+        return (enemy_lvl.min, enemy_lvl.max)
+
+    def add(self, space):
+        """ Add an unrevealed space to the index. """
+        key = self._key(space.tile.enemy_lvl)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = set()
+            self._heaps[key] = []
+        bucket.add(space.index)
+        heapq.heappush(self._heaps[key], space.index)
+
+    def remove(self, space, enemy_lvl):
+        """ Remove a space from the index, given the bounds it was indexed
+            under.
+        """
+        key = self._key(enemy_lvl)
+        bucket = self._buckets[key]
+        bucket.remove(space.index)
+        if not bucket:
+            del self._buckets[key]
+            del self._heaps[key]
+
+    def move(self, space, old_enemy_lvl):
+        """ Move a space that was indexed under the given bounds to the bucket
+            for its current bounds.
+        """
+        self.remove(space, old_enemy_lvl)
+        self.add(space)
+
+    def bucket_size(self, min_level, max_level):
+        """ The number of unrevealed spaces with exactly the given bounds. """
+        return len(self._buckets.get((min_level, max_level), ()))
+
+    def bounds_counts(self):
+        """ A mapping of the (min, max) bounds of all non-empty buckets to the
+            number of spaces in them.
+        """
+        return {key: len(bucket) for key, bucket in self._buckets.items()}
+
+    def iter_bucket(self, min_level, max_level):
+        """ Iterator over the spaces with exactly the given bounds, in no
+            particular order.
+        """
+        bucket = self._buckets.get((min_level, max_level), ())
+        return (self._spaces[index] for index in list(bucket))
+
+    def _first_in_bucket(self, key):
+        """ The index of the first space in board order in a bucket. """
+        bucket = self._buckets[key]
+        heap = self._heaps[key]
+        while heap[0] not in bucket:
+            heapq.heappop(heap)
+        return heap[0]
+
+    def iter_first_per_bounds(self, level):
+        """ Iterator over the first space in board order with each distinct
+            bounds no greater than the given level, in board order.
+        """
+        indices = sorted(self._first_in_bucket(key)
+                         for key in self._buckets if key[1] <= level)
+        return (self._spaces[index] for index in indices)
+
+    def iter_below_level(self, level):
+        """ Iterator over all indexed spaces with bounds no greater than the
+            given level, in board order.
+        """
+        indices = sorted(index
+                         for key, bucket in self._buckets.items()
+                         if key[1] <= level
+                         for index in bucket)
+        return (self._spaces[index] for index in indices)
@@ -0,0 +1,138 @@
+"""
+Precomputed tables of which spaces on a board neighbour each other, and of
+the locations of the spaces.
+"""
+import logging
+from array import array
+from functools import lru_cache
+
+from ..point import Point
+
+
+log = logging.getLogger(__name__)
+
+
+class NeighbourTable:
+    """ The indices of the neighbours of every space on a board, where spaces
+        are indexed by ``y * width + x``.
+
+    The table is held in compressed sparse row form: the neighbours of the
+    space at index ``i`` are ``indices[offsets[i]:offsets[i + 1]]``, with
+    spaces at the edges of the board just having fewer neighbours.
+    """
+
+    def __init__(self, width, height):
+        if width <= 0:
+            raise ValueError("Width must be strictly positive")
+        if height <= 0:
+            raise ValueError("Height must be strictly positive")
+
+        self._width = width
+        self._height = height
+
+        offsets = array('i', [0])
+        indices = array('i')
+        for y in range(height):
+            y_range = range(max(y - 1, 0), min(y + 2, height))
+            for x in range(width):
+                x_range = range(max(x - 1, 0), min(x + 2, width))
+                indices.extend(n_y * width + n_x
+                               for n_y in y_range
+                               for n_x in x_range
+                               if n_x != x or n_y != y)
+                offsets.append(len(indices))
+
+        self._offsets = offsets
+        self._indices = indices
+        self._indices_view = memoryview(indices)
+
+    @property
+    def width(self):
+        """ The read only width of the board the table is for. """
+        return self._width
+
+    @property
+    def height(self):
+        """ The read only height of the board the table is for. """
+        return self._height
+
+    @property
+    def offsets(self):
+        """ Array of where each space's neighbours start in the indices. """
+        return self._offsets
+
+    @property
+    def indices(self):
+        """ Flat array of the neighbour indices of all spaces. """
+        return self._indices
+
+    def neighbours(self, index):
+        """ Return the indices of the neighbours of the space at the given
+            index, as a view onto the table rather than a copy.
+        """
+        return self._indices_view[self._offsets[index]:
+                                  self._offsets[index + 1]]
+
+
+class PointGrid:
+    """ A single shared Point for every location on a board, and a tuple of
+        the neighbouring Points of each, indexed by ``y * width + x``.
+
+    Boards hand out these Points rather than making new ones, so walking
+    the board allocates no Points, and Points from the same board compare
+    equal by identity.
+    """
+
+    def __init__(self, table):
+        """
+        :param table: The NeighbourTable of the board.
+        """
+        width = table.width
+        self._width = width
+        self._height = table.height
+        self._points = tuple(Point(index % width, index // width)
+                             for index in range(width * table.height))
+
+        points = self._points
+        self._neighbours = tuple(
+            tuple(points[neighbour]
+                  for neighbour in table.neighbours(index))
+            for index in range(len(points)))
+
+    @property
+    def points(self):
+        """ Tuple of the Point of every space, in index order. """
+        return self._points
+
+    def point(self, x, y):
+        """ Get the shared Point with the given coordinates.
+
+        :raises ValueError: If the coordinates are outside the board.
+        """
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            raise ValueError("Point (%s, %s) is outside board" % (x, y))
+        return self._points[y * self._width + x]
+
+    def neighbours(self, index):
+        """ Return the tuple of the Points neighbouring the space at the
+            given index, which only includes those on the board.
+        """
+        return self._neighbours[index]
+
+
+@lru_cache(maxsize=8)
+def neighbour_table(width, height):
+    """ Get the neighbour table for a board of the given size. Tables are
+        never modified, so boards of the same size share one.
+    """
+    log.debug("Building neighbour table for %dx%d board", width, height)
+    return NeighbourTable(width, height)
+
+
+@lru_cache(maxsize=8)
+def point_grid(width, height):
+    """ Get the grid of Points for a board of the given size. Points are
+        immutable, so boards of the same size share one.
+    """
+    log.debug("Building point grid for %dx%d board", width, height)
+    return PointGrid(neighbour_table(width, height))
@@ -0,0 +1,117 @@
+"""
+Tests for the array backed game board.
+"""
+import random
+import unittest
+
+from ..point import Point
+from ..tiles import TileBank
+from ..player import Player
+from ..solver import make_move
+from .board import GameBoard
+from .arrayboard import ArrayGameBoard
+
+# import logging
+# logging.basicConfig(level=logging.DEBUG)
+
+
+ENEMIES = {0: 60, 1: 8, 2: 6, 3: 4, 4: 2}
+WIDTH = 10
+HEIGHT = 10
+
+
+def _random_layout(seed):
+    """ Build a random layout of enemies and return a mapping of locations
+        to (level, neighbour levels sum) pairs.
+    """
+    levels = [level for level, count in ENEMIES.items()
+              for _ in range(count)]
+    random.Random(seed).shuffle(levels)
+    level_at = {Point(index % WIDTH, index // WIDTH): level
+                for index, level in enumerate(levels)}
+    return {location: (level,
+                       sum(level_at[neighbour]
+                           for neighbour in location.all_chebyshev_neighbours()
+                           if neighbour in level_at))
+            for location, level in level_at.items()}
+
+
+class TestMatchesGameBoard(unittest.TestCase):
+    """ Test that the array board reaches the same bounds as a GameBoard. """
+
+    def setUp(self):
+        self.object_bank = TileBank(ENEMIES)
+        self.object_board = GameBoard(WIDTH, HEIGHT, self.object_bank)
+        self.array_bank = TileBank(ENEMIES)
+        self.array_board = ArrayGameBoard(WIDTH, HEIGHT, self.array_bank)
+
+    def assertBoardsMatch(self):
+        for y in range(HEIGHT):
+            for x in range(WIDTH):
+                object_tile = self.object_board.get_tile(Point(x, y))
+                array_tile = self.array_board.get_tile(Point(x, y))
+                self.assertEqual(object_tile.enemy_lvl, array_tile.enemy_lvl)
+                self.assertEqual(object_tile.placeholder,
+                                 array_tile.placeholder)
+        self.assertEqual(self.object_board.condensed_repr,
+                         self.array_board.condensed_repr)
+        self.assertEqual(str(self.object_board), str(self.array_board))
+
+    def test_single_reveals(self):
+        layout = _random_layout(1)
+        locations = random.Random(2).sample(sorted(layout, key=str), 30)
+        for location in locations:
+            level, neighbour_lvls_sum = layout[location]
+            self.object_board.set_revealed_tile(
+                location, self.object_bank.take(level, neighbour_lvls_sum))
+            self.array_board.set_revealed_tile(
+                location, self.array_bank.take(level, neighbour_lvls_sum))
+            self.assertBoardsMatch()
+
+    def test_bulk_reveal(self):
+        layout = _random_layout(3)
+        locations = random.Random(4).sample(sorted(layout, key=str), 40)
+        self.object_board.bulk_reveal_tiles(
+            {location: self.object_bank.take(*layout[location])
+             for location in locations})
+        self.array_board.bulk_reveal_tiles(
+            {location: self.array_bank.take(*layout[location])
+             for location in locations})
+        self.assertBoardsMatch()
+
+    def test_same_moves(self):
+        layout = _random_layout(5)
+        player = Player()
+        for move in range(10):
+            # Moves may be random guesses, so use the same random state for
+            # both boards.
+            random.seed(move)
+            location = make_move(player, self.object_board)
+            random.seed(move)
+            self.assertEqual(location, make_move(player, self.array_board))
+            level, neighbour_lvls_sum = layout[location]
+            self.object_board.set_revealed_tile(
+                location, self.object_bank.take(level, neighbour_lvls_sum))
+            self.array_board.set_revealed_tile(
+                location, self.array_bank.take(level, neighbour_lvls_sum))
+
+
+class TestInvalidReveals(unittest.TestCase):
+    """ Test that invalid reveals are rejected. """
+
+    def setUp(self):
+        self.tile_bank = TileBank({0: 4})
+        self.board = ArrayGameBoard(2, 2, self.tile_bank)
+
+    def test_repeated_reveal(self):
+        self.board.set_revealed_tile(Point(0, 0), self.tile_bank.take(0, 0))
+        self.assertRaises(ValueError, self.board.set_revealed_tile,
+                          Point(0, 0), self.tile_bank.take(0, 0))
+
+    def test_outside_board(self):
+        self.assertRaises(ValueError, self.board.set_revealed_tile,
+                          Point(2, 0), self.tile_bank.take(0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,288 @@
+"""
+Tests for the game board.
+"""
+import random
+import unittest
+from unittest import mock
+
+from ..point import Point
+from ..tiles import TileBank
+from ..boundedint import BoundedInt
+from .board import GameBoard
+from .arrayboard import ArrayGameBoard
+from . import vectorised
+from .vectorised import HAVE_NUMPY
+from .test_arrayboard import ENEMIES, WIDTH, HEIGHT, _random_layout
+
+# import logging
+# logging.basicConfig(level=logging.DEBUG)
+
+
+class TestNeighbourLevelSums(unittest.TestCase):
+    """ Test that the running sums of neighbour levels are kept up to date as
+        the board changes.
+    """
+
+    def setUp(self):
+        self.tile_bank = TileBank(ENEMIES)
+        self.board = GameBoard(WIDTH, HEIGHT, self.tile_bank)
+
+    def assertBoundsMatchNeighbours(self):
+        for neighbour in self.board.iter_revealed_spaces():
+            lvls_sum = neighbour.tile.neighbour_lvls_sum
+            for space in self.board.iter_unrevealed_neighbours(neighbour):
+                others = [other for other in
+                          self.board.iter_neighbours(neighbour)
+                          if other is not space]
+                bounds = self.board.space_level_bounds_from_neighbour(
+                    space, neighbour)
+                self.assertEqual(
+                    bounds.min,
+                    lvls_sum - sum(other.tile.enemy_lvl.max
+                                   for other in others))
+                self.assertEqual(
+                    bounds.max,
+                    lvls_sum - sum(other.tile.enemy_lvl.min
+                                   for other in others))
+
+    def test_sums_after_reveals(self):
+        layout = _random_layout(6)
+        locations = random.Random(7).sample(sorted(layout, key=str), 30)
+        for location in locations:
+            tile = self.tile_bank.take(*layout[location])
+            self.board.set_revealed_tile(location, tile)
+            self.assertBoundsMatchNeighbours()
+
+
+class TestUnrevealedIndex(unittest.TestCase):
+    """ Test that the index of unrevealed spaces is kept up to date as the
+        board changes.
+    """
+
+    def setUp(self):
+        self.tile_bank = TileBank(ENEMIES)
+        self.board = GameBoard(WIDTH, HEIGHT, self.tile_bank)
+
+    def assertIndexMatchesBoard(self):
+        for level in range(max(ENEMIES) + 1):
+            expected = [space for space in self.board.iter_unrevealed_spaces()
+                        if space.tile.enemy_lvl <= level]
+            self.assertEqual(
+                list(self.board.iter_unrevealed_below_level(level)),
+                expected)
+
+            first_per_bounds = {}
+            for space in expected:
+                bounds = (space.tile.enemy_lvl.min, space.tile.enemy_lvl.max)
+                first_per_bounds.setdefault(bounds, space)
+            self.assertEqual(
+                list(self.board.iter_first_unrevealed_per_bounds(level)),
+                sorted(first_per_bounds.values(),
+                       key=lambda space: space.index))
+
+    def test_index_after_reveals(self):
+        layout = _random_layout(8)
+        locations = random.Random(9).sample(sorted(layout, key=str), 30)
+        for location in locations:
+            tile = self.tile_bank.take(*layout[location])
+            self.board.set_revealed_tile(location, tile)
+            self.assertIndexMatchesBoard()
+
+
+class TestCheckpoints(unittest.TestCase):
+    """ Test that rolling back to a checkpoint restores the board exactly. """
+
+    def setUp(self):
+        self.tile_bank = TileBank(ENEMIES)
+        self.board = GameBoard(WIDTH, HEIGHT, self.tile_bank)
+        self.layout = _random_layout(10)
+        self.locations = random.Random(11).sample(
+            sorted(self.layout, key=str), 40)
+        self.changes = []
+        self.board.add_listener(
+            lambda space, old_enemy_lvl, old_sum: self.changes.append(
+                (space, old_enemy_lvl, old_sum)))
+
+    def _reveal(self, locations):
+        for location in locations:
+            self.board.set_revealed_tile(
+                location, self.tile_bank.take(*self.layout[location]))
+
+    def _state(self):
+        return (str(self.board),
+                self.tile_bank.remaining_counts,
+                self.board.unrevealed_bounds_counts(),
+                list(self.board.iter_first_unrevealed_per_bounds(9)),
+                self.board.in_start_state(),
+                list(self.board._neighbour_min_sums),
+                list(self.board._neighbour_max_sums))
+
+    def test_rollback(self):
+        self._reveal(self.locations[:10])
+        before = self._state()
+
+        self.board.checkpoint()
+        self._reveal(self.locations[10:])
+        self.assertNotEqual(self._state(), before)
+        self.board.rollback()
+        self.assertEqual(self._state(), before)
+
+        # The board still works as normal afterwards.
+        self._reveal(self.locations[10:])
+
+    def test_rollback_from_start(self):
+        before = self._state()
+        self.board.checkpoint()
+        self._reveal(self.locations)
+        self.board.rollback()
+        self.assertEqual(self._state(), before)
+        self.assertTrue(self.board.in_start_state())
+
+    def test_nested(self):
+        first_state = self._state()
+        self.board.checkpoint()
+        self._reveal(self.locations[:10])
+        second_state = self._state()
+        self.board.checkpoint()
+        self._reveal(self.locations[10:20])
+        self.board.commit()
+        self.board.checkpoint()
+        self._reveal(self.locations[20:])
+
+        self.board.rollback()
+        self.assertNotEqual(self._state(), second_state)
+        self.board.rollback()
+        self.assertEqual(self._state(), first_state)
+        self.assertRaises(ValueError, self.board.rollback)
+        self.assertRaises(ValueError, self.board.commit)
+
+    def test_rollback_after_contradiction(self):
+        self._reveal(self.locations[:10])
+        before = self._state()
+
+        # The first restriction is made before the second is found to be
+        # impossible.
+        unrevealed = [space for space in self.board.iter_unrevealed_spaces()
+                      if not space.tile.enemy_lvl.is_exact]
+        self.board.checkpoint()
+        self._reveal(self.locations[10:12])
+        with self.assertRaises(ValueError):
+            self.board.restrict_spaces({unrevealed[-1]: BoundedInt(0, 0),
+                                        unrevealed[-2]: BoundedInt(9, 9)})
+        self.assertEqual(unrevealed[-1].tile.enemy_lvl, 0)
+        self.board.rollback()
+        self.assertEqual(self._state(), before)
+
+    def test_listeners_told_of_undo(self):
+        self.board.checkpoint()
+        self._reveal(self.locations[:5])
+        changes = len(self.changes)
+        self.board.rollback()
+        self.assertEqual(len(self.changes), 2 * changes)
+        unrevealed = [change for change in self.changes[changes:]
+                      if change[2] is not None]
+        self.assertEqual(len(unrevealed), 5)
+
+
+class TestPropagationStats(unittest.TestCase):
+    """ Test that the work done propagating a reveal is recorded. """
+
+    def test_surrounded_by_zeros(self):
+        tile_bank = TileBank({0: 8, 1: 1})
+        board = GameBoard(3, 3, tile_bank)
+        board.set_revealed_tile(Point(1, 1), tile_bank.take(1, 0))
+
+        stats = board.last_propagation_stats
+        self.assertEqual(stats.tightened, 8)
+        # The centre's constraint tightens all its neighbours, so is applied
+        # a second time to check for further changes.
+        self.assertEqual(stats.iterations, 2)
+        self.assertEqual(stats.evaluations, 16)
+
+
+class TestSharedPoints(unittest.TestCase):
+    """ Test that boards hand out one shared Point per location. """
+
+    def test_spaces_and_neighbours(self):
+        board = GameBoard(4, 3, TileBank({0: 12}))
+        for space in board.iter_spaces():
+            location = space.location
+            self.assertIs(board.location(location.x, location.y), location)
+            for neighbour in board.iter_neighbours(space):
+                self.assertIs(board.get_tile(neighbour.location),
+                              neighbour.tile)
+                self.assertIs(
+                    neighbour.location,
+                    board.location(neighbour.location.x,
+                                   neighbour.location.y))
+
+    def test_boards_of_same_size(self):
+        first = GameBoard(4, 3, TileBank({0: 12}))
+        second = ArrayGameBoard(4, 3, TileBank({0: 12}))
+        self.assertIs(first.location(2, 1), second.location(2, 1))
+        self.assertEqual(first.location(2, 1), Point(2, 1))
+
+    def test_outside_board(self):
+        board = GameBoard(4, 3, TileBank({0: 12}))
+        self.assertRaises(ValueError, board.location, 4, 0)
+        self.assertRaises(ValueError, board.location, 0, -1)
+
+
+class TestVectorisedWithoutNumPy(unittest.TestCase):
+    """ Test that asking for vectorised propagation without NumPy leaves the
+        board untouched.
+    """
+
+    def assertUnchanged(self, board_class):
+        tile_bank = TileBank({0: 12})
+        board = board_class(4, 3, tile_bank)
+        tiles = {Point(0, 0): tile_bank.take(0, 0),
+                 Point(3, 2): tile_bank.take(0, 0)}
+        with mock.patch.object(vectorised, "HAVE_NUMPY", False):
+            with self.assertRaises(ImportError):
+                board.bulk_reveal_tiles(tiles, vectorised=True)
+        self.assertTrue(board.in_start_state())
+        for location in tiles:
+            self.assertTrue(board.get_tile(location).placeholder)
+
+    def test_game_board(self):
+        self.assertUnchanged(GameBoard)
+
+    def test_array_board(self):
+        self.assertUnchanged(ArrayGameBoard)
+
+
+@unittest.skipUnless(HAVE_NUMPY, "NumPy is not installed")
+class TestVectorisedPropagation(unittest.TestCase):
+    """ Test that vectorised propagation gives the same bounds as the
+        worklist.
+    """
+
+    def assertSameBounds(self, board_class, seed):
+        layout = _random_layout(seed)
+        locations = random.Random(seed).sample(sorted(layout, key=str), 40)
+        boards = []
+        for vectorised in (False, True):
+            tile_bank = TileBank(ENEMIES)
+            board = board_class(WIDTH, HEIGHT, tile_bank)
+            tiles = {location: tile_bank.take(*layout[location])
+                     for location in locations}
+            board.bulk_reveal_tiles(tiles, vectorised=vectorised)
+            boards.append(board)
+
+        worklist_board, vectorised_board = boards
+        self.assertEqual(
+            [space.tile.enemy_lvl for space in worklist_board.iter_spaces()],
+            [space.tile.enemy_lvl for space in vectorised_board.iter_spaces()])
+
+    def test_game_board(self):
+        for seed in range(5):
+            self.assertSameBounds(GameBoard, seed)
+
+    def test_array_board(self):
+        for seed in range(5):
+            self.assertSameBounds(ArrayGameBoard, seed)
+
+
+if __name__ == "__main__":
+    unittest.main()
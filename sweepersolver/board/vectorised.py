@@ -0,0 +1,144 @@
+"""
+Whole board bounds propagation using NumPy, for when large parts of a board
+are revealed at once, and other whole board sums.
+
+NumPy is optional - everything else works without it, and HAVE_NUMPY says
+whether it's available.
+"""
+import logging
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+log = logging.getLogger(__name__)
+
+
+HAVE_NUMPY = numpy is not None
+
+# Stands in for an unbounded value when no revealed space constrains a space.
+_UNBOUNDED = 1 << 20
+
+
+def require_numpy():
+    """ Raise ImportError if NumPy isn't available. """
+    if not HAVE_NUMPY:
+        raise ImportError("NumPy is required for vectorised propagation")
+
+
+def _window_reduce(grid, pad_value, reduce):
+    """ Combine each element of a 2D array with its eight neighbours using the
+        given element-wise reduction, treating spaces off the board as the
+        given pad value.
+    """
+    height, width = grid.shape
+    padded = numpy.pad(grid, 1, mode='constant', constant_values=pad_value)
+    result = grid.copy()
+    for y_diff in (0, 1, 2):
+        for x_diff in (0, 1, 2):
+            if y_diff == 1 and x_diff == 1:
+                continue
+            result = reduce(result,
+                            padded[y_diff:y_diff + height,
+                                   x_diff:x_diff + width])
+    return result
+
+
+def _neighbour_sums(grid):
+    """ The sum of the eight neighbours of each element of a 2D array. """
+    return _window_reduce(grid, 0, numpy.add) - grid
+
+
+def propagate(min_lvls, max_lvls, revealed, neighbour_lvls_sums):
+    """ Tighten the bounds on all unrevealed spaces of a board until nothing
+        more can be learnt from the revealed spaces.
+
+    This applies the same rule as GameBoard - a revealed space bounds each of
+    its unrevealed neighbours by its neighbour levels sum less the sum of the
+    maximum or minimum levels of its other neighbours - but to every space on
+    the board at once using sliding window sums, repeating until a fixpoint.
+    The fixpoint is the same whatever order the rule is applied in, so the
+    bounds found are identical to those from GameBoard.
+
+    :param min_lvls: 2D array of the minimum level of each space.
+    :param max_lvls: 2D array of the maximum level of each space.
+    :param revealed: 2D boolean array of which spaces are revealed.
+    :param neighbour_lvls_sums: 2D array of the neighbour levels sum of each
+                                revealed space - other values are ignored.
+    :return: A tuple of the new minimum and maximum level arrays, and the
+             number of sweeps over the board it took to reach the fixpoint.
+    """
+    require_numpy()
+    revealed = numpy.asarray(revealed, dtype=bool)
+    unrevealed = ~revealed
+    min_lvls = numpy.array(min_lvls, dtype=numpy.int32)
+    max_lvls = numpy.array(max_lvls, dtype=numpy.int32)
+    neighbour_lvls_sums = numpy.asarray(neighbour_lvls_sums,
+                                        dtype=numpy.int32)
+
+    sweeps = 0
+    while True:
+        sweeps += 1
+        # For each revealed space, how far its neighbour levels sum is above
+        # the sums of the minimum and maximum levels of its neighbours. The
+        # bound it gives an unrevealed neighbour is then that neighbour's own
+        # level offset by this slack.
+        max_slack = numpy.where(
+            revealed, neighbour_lvls_sums - _neighbour_sums(min_lvls),
+            _UNBOUNDED)
+        min_slack = numpy.where(
+            revealed, neighbour_lvls_sums - _neighbour_sums(max_lvls),
+            -_UNBOUNDED)
+        bound_max = min_lvls + _window_reduce(max_slack,
+                                              _UNBOUNDED,
+                                              numpy.minimum)
+        bound_min = max_lvls + _window_reduce(min_slack,
+                                              -_UNBOUNDED,
+                                              numpy.maximum)
+
+        new_min = numpy.where(unrevealed,
+                              numpy.maximum(min_lvls, bound_min),
+                              min_lvls)
+        new_max = numpy.where(unrevealed,
+                              numpy.minimum(max_lvls, bound_max),
+                              max_lvls)
+        if numpy.any(new_min > new_max):
+            raise ValueError("New bounds don't intersect existing bounds")
+
+        if (numpy.array_equal(new_min, min_lvls) and
+                numpy.array_equal(new_max, max_lvls)):
+            break
+        min_lvls = new_min
+        max_lvls = new_max
+
+    log.debug("Vectorised propagation took %d sweeps", sweeps)
+    return min_lvls, max_lvls, sweeps
+
+
+def propagate_flat(min_lvls, max_lvls, revealed, neighbour_lvls_sums, width):
+    """ As propagate, but taking and returning flat sequences of the values
+        for each space, indexed by ``y * width + x``.
+
+    :return: A tuple of lists of the new minimum and maximum levels, and the
+             number of sweeps over the board taken.
+    """
+    require_numpy()
+    shape = (len(revealed) // width, width)
+    new_min, new_max, sweeps = propagate(
+        numpy.asarray(min_lvls).reshape(shape),
+        numpy.asarray(max_lvls).reshape(shape),
+        numpy.asarray(revealed).reshape(shape),
+        numpy.asarray(neighbour_lvls_sums).reshape(shape))
+    return new_min.ravel().tolist(), new_max.ravel().tolist(), sweeps
+
+
+def neighbour_sums_flat(levels, width):
+    """ The sum of the levels of the neighbours of every space, taking and
+        returning a flat sequence of values indexed by ``y * width + x``.
+    """
+    require_numpy()
+    grid = numpy.asarray(levels, dtype=numpy.int32).reshape(
+        (len(levels) // width, width))
+    return _neighbour_sums(grid).ravel().tolist()
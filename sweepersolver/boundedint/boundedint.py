@@ -3,23 +3,66 @@ An integer that may not be exactly known, so is represented by a set of bounds.
 """
 
 
+# Bounds are only interned when both lie in this range, which covers the
+# enemy levels of the built in difficulties. Anything else, such as the
+# wider bounds from neighbour level sums or levels sent by clients, gets a
+# new instance each time, so the intern table stays small however many
+# games are played.
+INTERNED_MIN = 0
+INTERNED_MAX = 9
+
+
 class BoundedInt:
+    """ An immutable pair of inclusive bounds on an integer.
+
+    Bounds within INTERNED_MIN and INTERNED_MAX are interned, so there's only
+    ever one instance with each such pair - constructing the same bounds
+    again returns the existing one rather than allocating a new one. Copying
+    and pickling preserve this.
+    """
     # Todo: Add docstings to all properties, magic methods, etc.
 
-    def __init__(self, init_min, init_max):
+    __slots__ = ("_min", "_max")
+
+    # Mapping of (min, max) bounds to the one instance with those bounds, for
+    # bounds in the interned range.
+    _interned = {}
+
+    def __new__(cls, init_min, init_max):
         if not isinstance(init_min, int) or not isinstance(init_max, int):
             raise TypeError("Bounds are not integers")
-        if init_max < init_min:
-            raise ValueError("Min bound greater than max bound")
 
-        self._min = int(init_min)
-        self._max = int(init_max)
+        key = (init_min, init_max)
+        bounded = cls._interned.get(key)
+        if bounded is None:
+            if init_max < init_min:
+                raise ValueError("Min bound greater than max bound")
+            bounded = super().__new__(cls)
+            bounded._min = int(init_min)
+            bounded._max = int(init_max)
+            if INTERNED_MIN <= init_min and init_max <= INTERNED_MAX:
+                # setdefault is atomic, so if another thread interned the
+                # same bounds first, theirs is used, and there's still only
+                # one.
+                bounded = cls._interned.setdefault(key, bounded)
+        return bounded
+
+    def __reduce__(self):
+        return (self.__class__, (self._min, self._max))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def __eq__(self, other):
-        if isinstance(other, int):
+        if other is self:
+            return True
+        elif isinstance(other, int):
             return self.is_exact and self.exact == other
         elif isinstance(other, self.__class__):
-            return (self.min == other.min) and (self.max == other.max)
+            return self._min == other._min and self._max == other._max
         else:
             return NotImplemented
 
@@ -78,21 +121,35 @@ class BoundedInt:
         return self.min if self.is_exact else None
 
     def intersection(self, other):
-        if not isinstance(other, self.__class__):
+        """ The bounds covered by both these and the other bounds, or None if
+            they don't overlap.
+
+        If either bounds lie entirely within the other, they're returned as
+        they are, so narrowing bounds that don't change allocates nothing.
+        """
+        if not isinstance(other, BoundedInt):
             raise TypeError("Can only take intersection with same type")
 
-        if (self.min > other.max) or (self.max < other.min):
+        self_min = self._min
+        self_max = self._max
+        other_min = other._min
+        other_max = other._max
+        if other_min <= self_min and self_max <= other_max:
+            return self
+        if self_min <= other_min and other_max <= self_max:
+            return other
+        if (self_min > other_max) or (self_max < other_min):
             # Ranges don't overlap at all.
             return None
 
-        # Ranges must overlap somewhat - build that overlapping range.
-        new_min = max(self.min, other.min)
-        new_max = min(self.max, other.max)
-
-        return BoundedInt(new_min, new_max)
+        # Ranges must overlap partly - build that overlapping range.
+        return BoundedInt(max(self_min, other_min), min(self_max, other_max))
 
 
 if __name__ == "__main__":
+    import copy
+    import pickle
+    import threading
     import unittest
 
     class TestCreationErrors(unittest.TestCase):
@@ -211,4 +268,54 @@ if __name__ == "__main__":
             self.assertEqual(BoundedInt(-5, 15).intersection(self.bounded),
                              self.bounded)
 
+    class TestInterning(unittest.TestCase):
+        def test_same_instance(self):
+            self.assertIs(BoundedInt(1, 4), BoundedInt(1, 4))
+            self.assertIsNot(BoundedInt(1, 4), BoundedInt(1, 5))
+
+        def test_slots(self):
+            self.assertFalse(hasattr(BoundedInt(1, 4), "__dict__"))
+
+        def test_copies_are_same_instance(self):
+            bounded = BoundedInt(2, 7)
+            self.assertIs(copy.copy(bounded), bounded)
+            self.assertIs(copy.deepcopy([bounded])[0], bounded)
+            self.assertIs(pickle.loads(pickle.dumps(bounded)), bounded)
+
+        def test_intersection_unchanged(self):
+            bounded = BoundedInt(2, 7)
+            self.assertIs(bounded.intersection(BoundedInt(0, 9)), bounded)
+            self.assertIs(BoundedInt(0, 9).intersection(bounded), bounded)
+            self.assertIs(bounded.intersection(BoundedInt(3, 9)),
+                          BoundedInt(3, 7))
+
+        def test_same_instance_across_threads(self):
+            pairs = [(low, high)
+                     for low in range(INTERNED_MIN, INTERNED_MAX + 1)
+                     for high in range(low, INTERNED_MAX + 1)]
+            for pair in pairs:
+                BoundedInt._interned.pop(pair, None)
+            results = [[] for _ in range(4)]
+
+            def construct(result):
+                result.extend(BoundedInt(*pair) for pair in pairs)
+            threads = [threading.Thread(target=construct, args=(result,))
+                       for result in results]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            for result in results:
+                for pair, bounded in zip(pairs, result):
+                    self.assertIs(bounded, BoundedInt(*pair))
+
+        def test_outside_interned_range(self):
+            size = len(BoundedInt._interned)
+            for offset in range(100):
+                bounded = BoundedInt(-1000 - offset, 1000)
+                self.assertIsNot(bounded, BoundedInt(-1000 - offset, 1000))
+                self.assertEqual(bounded, BoundedInt(-1000 - offset, 1000))
+                self.assertNotEqual(bounded, BoundedInt(-1000 - offset, 999))
+            self.assertEqual(len(BoundedInt._interned), size)
+
     unittest.main()
@@ -0,0 +1,2 @@
+from .bankcounts import BankCountInference
+from .frontier import FrontierInference
@@ -0,0 +1,137 @@
+"""
+Inference from the number of enemies of each level left in the tile bank.
+"""
+import logging
+
+from ..boundedint import BoundedInt
+
+
+log = logging.getLogger(__name__)
+
+
+class BankCountInference:
+    """ Narrows the bounds on unrevealed spaces using the counts of enemies of
+        each level that haven't been revealed yet.
+
+    For every range of levels, the unrevealed spaces whose bounds lie inside
+    the range can only hold as many enemies as remain with levels in it, and
+    the enemies remaining in the range must all fit in spaces whose bounds
+    overlap it. When either count is tight, the range is used up:
+
+    - If the spaces inside the range need every remaining enemy in it, no
+      other space can have a level in the range.
+    - If exactly as many spaces overlap the range as there are enemies left
+      in it, every one of those spaces must have a level in the range.
+
+    E.g. once every level 9 enemy has been revealed, no unrevealed space can
+    have a level above 8.
+
+    It checks each range of levels on its own rather than doing a full
+    counting DP over all levels at once, so it can narrow less than that
+    would.
+
+    The counts only depend on how many unrevealed spaces have each distinct
+    bounds, which the board keeps track of, so they're cheap to work out. If
+    neither those nor the bank have changed since the last run, nothing is
+    done at all.
+    """
+
+    def __init__(self):
+        self._last_signature = None
+
+    def narrow(self, game_board):
+        """ Narrow the bounds on unrevealed spaces as far as possible using
+            the remaining tile counts, propagating any changes across the
+            board.
+
+        :return: The number of spaces narrowed.
+        """
+        narrowed = 0
+        while True:
+            remaining = game_board.tile_bank.remaining_counts
+            bounds_counts = game_board.unrevealed_bounds_counts()
+            signature = (sorted(remaining.items()),
+                         sorted(bounds_counts.items()))
+            if signature == self._last_signature:
+                break
+            self._last_signature = signature
+
+            if sum(remaining.values()) != sum(bounds_counts.values()):
+                log.debug("Tile bank doesn't match unrevealed spaces - "
+                          "skipping")
+                break
+
+            new_bounds = narrowed_bounds(remaining, bounds_counts)
+            if not new_bounds:
+                break
+
+            narrowed += game_board.restrict_spaces(
+                {space: bounds
+                 for old_bounds, bounds in new_bounds.items()
+                 for space in game_board.iter_unrevealed_with_bounds(
+                     *old_bounds)})
+
+        log.debug("Bank count inference narrowed %d spaces", narrowed)
+        return narrowed
+
+
+def narrowed_bounds(remaining, bounds_counts):
+    """ Work out which bounds on unrevealed spaces can be narrowed given the
+        enemies remaining.
+
+    :param remaining: Mapping of levels to the number of enemies of that level
+                      which are yet to be revealed.
+    :param bounds_counts: Mapping of (min, max) bounds to the number of
+                          unrevealed spaces with those bounds.
+    :return: A mapping of (min, max) bounds that can be narrowed to new
+             BoundedInts for spaces with those bounds.
+    :raises ValueError: If the remaining enemies can't fit in the spaces.
+    """
+    if not bounds_counts:
+        return {}
+
+    lowest = min(min_level for min_level, _ in bounds_counts)
+    highest = max(max_level for _, max_level in bounds_counts)
+
+    # Running totals of remaining enemies up to each level, so the number in
+    # any range of levels is a difference of two totals.
+    totals = [0]
+    for level in range(lowest, highest + 1):
+        totals.append(totals[-1] + remaining.get(level, 0))
+
+    new_bounds = {bounds: bounds for bounds in bounds_counts}
+    for low in range(lowest, highest + 1):
+        for high in range(low, highest + 1):
+            enemies = totals[high - lowest + 1] - totals[low - lowest]
+            inside = sum(count for (min_level, max_level), count
+                         in bounds_counts.items()
+                         if low <= min_level and max_level <= high)
+            overlapping = sum(count for (min_level, max_level), count
+                              in bounds_counts.items()
+                              if min_level <= high and low <= max_level)
+            if inside > enemies or overlapping < enemies:
+                raise ValueError("Remaining enemies can't fit in the "
+                                 "unrevealed spaces")
+
+            for bounds, (min_level, max_level) in new_bounds.items():
+                if low <= bounds[0] and bounds[1] <= high:
+                    continue
+                if inside == enemies:
+                    # Levels in the range are all used up by other spaces.
+                    if low <= min_level <= high:
+                        min_level = high + 1
+                    if low <= max_level <= high:
+                        max_level = low - 1
+                if overlapping == enemies and \
+                        min_level <= high and low <= max_level:
+                    # This space must take one of the levels in the range.
+                    min_level = max(min_level, low)
+                    max_level = min(max_level, high)
+                if min_level > max_level:
+                    raise ValueError("Remaining enemies can't fit in the "
+                                     "unrevealed spaces")
+                new_bounds[bounds] = (min_level, max_level)
+
+    return {bounds: BoundedInt(*narrowed)
+            for bounds, narrowed in new_bounds.items()
+            if narrowed != bounds}
@@ -0,0 +1,289 @@
+"""
+Exact inference over the frontier of a game board - the unrevealed spaces
+next to revealed ones.
+"""
+import logging
+from collections import OrderedDict, deque
+
+from ..boundedint import BoundedInt
+
+
+log = logging.getLogger(__name__)
+
+
+# Default limit on the number of distinct partial states considered at any
+# point while solving one component, beyond which it's left alone.
+DEFAULT_MAX_STATES = 4096
+
+# Default number of solved components to remember.
+DEFAULT_CACHE_SIZE = 4096
+
+
+class Component:
+    """ A connected set of frontier spaces, and the revealed spaces that
+        constrain them.
+
+    Each constraint is a pair of the sum its unrevealed neighbours' levels
+    must add up to, and the positions of those neighbours in the component.
+    """
+
+    def __init__(self, spaces, constraints):
+        self.spaces = spaces
+        self.constraints = constraints
+
+    @property
+    def key(self):
+        """ A key identifying the component in its current state. """
+        return (tuple((space.index,
+                       space.tile.enemy_lvl.min,
+                       space.tile.enemy_lvl.max) for space in self.spaces),
+                tuple((target, tuple(positions))
+                      for target, positions in self.constraints))
+
+
+class FrontierInference:
+    """ Narrows the bounds on frontier spaces to the values that appear in at
+        least one assignment of levels consistent with all revealed spaces.
+
+    The pairwise bounds propagated by the board only consider one revealed
+    space at a time, so can miss levels ruled out by several together.
+
+    The frontier is split into independent connected components, and the
+    consistent assignments of each are enumerated space by space. Partial
+    assignments are memoised by the sums they leave on the constraints that
+    are still open, so the work grows with the width of the frontier rather
+    than exponentially with its length. Components that haven't changed
+    since they were last solved are skipped.
+    """
+
+    def __init__(self, max_states=DEFAULT_MAX_STATES,
+                 cache_size=DEFAULT_CACHE_SIZE):
+        self._max_states = max_states
+        self._cache_size = cache_size
+        # Keys of components already narrowed as far as possible.
+        self._solved = OrderedDict()
+
+        # Counts of what happened to components, for diagnostics.
+        self.components_solved = 0
+        self.components_skipped = 0
+        self.components_abandoned = 0
+
+    def narrow(self, game_board):
+        """ Narrow the bounds on all frontier spaces of the board as far as
+            possible, propagating any changes across the board.
+
+        :return: The number of spaces narrowed.
+        """
+        narrowed = 0
+        while True:
+            restrictions = {}
+            for component in find_components(game_board):
+                restrictions.update(self._solve_component(component))
+            if not restrictions:
+                break
+            narrowed += game_board.restrict_spaces(restrictions)
+
+        log.debug("Frontier inference narrowed %d spaces", narrowed)
+        return narrowed
+
+    def _remember(self, key):
+        self._solved[key] = True
+        self._solved.move_to_end(key)
+        while len(self._solved) > self._cache_size:
+            self._solved.popitem(last=False)
+
+    def _solve_component(self, component):
+        """ Find the narrowed bounds for any spaces in a component that can
+            be narrowed.
+
+        :return: A mapping of spaces to their narrowed bounds.
+        """
+        key = component.key
+        if key in self._solved:
+            self._solved.move_to_end(key)
+            self.components_skipped += 1
+            return {}
+
+        masks = feasible_levels(component, self._max_states)
+        if masks is None:
+            log.debug("Abandoned component of %d spaces",
+                      len(component.spaces))
+            self.components_abandoned += 1
+            self._remember(key)
+            return {}
+        self.components_solved += 1
+
+        restrictions = {}
+        for space, mask in zip(component.spaces, masks):
+            enemy_lvl = space.tile.enemy_lvl
+            new_min = _lowest_bit(mask)
+            new_max = mask.bit_length() - 1
+            if new_min > enemy_lvl.min or new_max < enemy_lvl.max:
+                restrictions[space] = BoundedInt(new_min, new_max)
+
+        if not restrictions:
+            self._remember(key)
+        return restrictions
+
+
+def _lowest_bit(mask):
+    return (mask & -mask).bit_length() - 1
+
+
+def find_components(game_board):
+    """ Split the frontier of a board into connected components, where two
+        unrevealed spaces are connected if they share a revealed neighbour.
+
+    Spaces within a component are ordered breadth first, which keeps the
+    number of constraints that are part way through being assigned small.
+
+    :return: A list of Components.
+    """
+    # Each revealed space with unrevealed neighbours is a constraint that the
+    # levels of those neighbours sum to what's left of its neighbour sum
+    # after taking off its revealed neighbours.
+    constraints_by_space = {}
+    constraint_spaces = {}
+    for revealed in game_board.iter_revealed_spaces():
+        unrevealed = list(game_board.iter_unrevealed_neighbours(revealed))
+        if not unrevealed:
+            continue
+        target = (revealed.tile.neighbour_lvls_sum -
+                  sum(neighbour.tile.enemy_lvl.exact for neighbour
+                      in game_board.iter_revealed_neighbours(revealed)))
+        constraint_spaces[revealed.index] = (target, unrevealed)
+        for space in unrevealed:
+            constraints_by_space.setdefault(space, []).append(revealed.index)
+
+    components = []
+    visited = set()
+    for start in sorted(constraints_by_space, key=lambda space: space.index):
+        if start in visited:
+            continue
+        visited.add(start)
+        spaces = []
+        constraint_indices = []
+        seen_constraints = set()
+        queue = deque([start])
+        while queue:
+            space = queue.popleft()
+            spaces.append(space)
+            for constraint_index in constraints_by_space[space]:
+                if constraint_index in seen_constraints:
+                    continue
+                seen_constraints.add(constraint_index)
+                constraint_indices.append(constraint_index)
+                for neighbour in constraint_spaces[constraint_index][1]:
+                    if neighbour not in visited:
+                        visited.add(neighbour)
+                        queue.append(neighbour)
+
+        positions = {space: position for position, space in enumerate(spaces)}
+        constraints = [(constraint_spaces[index][0],
+                        sorted(positions[space]
+                               for space in constraint_spaces[index][1]))
+                       for index in constraint_indices]
+        components.append(Component(spaces, constraints))
+
+    return components
+
+
+def feasible_levels(component, max_states=DEFAULT_MAX_STATES):
+    """ Find the levels each space in a component can take in at least one
+        assignment satisfying all its constraints.
+
+    Spaces are assigned in order. The state after assigning a prefix of the
+    spaces is the partial sums of the constraints that have some spaces
+    assigned and some not, and prefixes reaching the same state are merged.
+    A forward pass finds all reachable states and the transitions between
+    them, then a backward pass keeps the transitions that can be completed.
+
+    :return: A list of bitmasks of the feasible levels of each space, in the
+             order of the component's spaces, or None if there were too many
+             states to consider.
+    :raises ValueError: If no assignment satisfies the constraints.
+    """
+    spaces = component.spaces
+    space_count = len(spaces)
+    domains = [range(space.tile.enemy_lvl.min, space.tile.enemy_lvl.max + 1)
+               for space in spaces]
+
+    # For each position, the constraints involving the space there, and the
+    # constraints open after assigning it, in a fixed order.
+    constraints_at = [[] for _ in range(space_count)]
+    last_position = []
+    remaining_min = []
+    remaining_max = []
+    for constraint_id, (target, positions) in \
+            enumerate(component.constraints):
+        for position in positions:
+            constraints_at[position].append(constraint_id)
+        last_position.append(positions[-1])
+        # Sums of the bounds of the constraint's spaces after each position.
+        remaining_min.append({position: sum(domains[later][0] for later
+                                            in positions if later > position)
+                              for position in positions})
+        remaining_max.append({position: sum(domains[later][-1] for later
+                                            in positions if later > position)
+                              for position in positions})
+    first_position = [positions[0] for _, positions in component.constraints]
+    open_after = [[constraint_id
+                   for constraint_id in range(len(component.constraints))
+                   if first_position[constraint_id] <= position <
+                   last_position[constraint_id]]
+                  for position in range(space_count)]
+    targets = [target for target, _ in component.constraints]
+
+    # Forward pass - the states reachable before each position, and the
+    # transitions (state, level, next state) out of them.
+    states = {(): None}
+    transitions = []
+    open_before = []
+    for position in range(space_count):
+        next_states = {}
+        position_transitions = []
+        open_now = open_before
+        for state in states:
+            partial_sums = dict(zip(open_now, state))
+            for level in domains[position]:
+                new_sums = dict(partial_sums)
+                consistent = True
+                for constraint_id in constraints_at[position]:
+                    new_sum = new_sums.get(constraint_id, 0) + level
+                    new_sums[constraint_id] = new_sum
+                    target = targets[constraint_id]
+                    if last_position[constraint_id] == position:
+                        consistent = new_sum == target
+                    else:
+                        consistent = (
+                            new_sum + remaining_min[constraint_id][position] <=
+                            target <=
+                            new_sum + remaining_max[constraint_id][position])
+                    if not consistent:
+                        break
+                if not consistent:
+                    continue
+                next_state = tuple(new_sums[constraint_id]
+                                   for constraint_id in open_after[position])
+                next_states[next_state] = None
+                position_transitions.append((state, level, next_state))
+        if len(next_states) > max_states:
+            return None
+        transitions.append(position_transitions)
+        states = next_states
+        open_before = open_after[position]
+
+    # Backward pass - keep only transitions leading to a complete assignment.
+    live_states = set(states)
+    masks = [0] * space_count
+    for position in range(space_count - 1, -1, -1):
+        previous_live_states = set()
+        for state, level, next_state in transitions[position]:
+            if next_state in live_states:
+                previous_live_states.add(state)
+                masks[position] |= 1 << level
+        live_states = previous_live_states
+
+    if not live_states:
+        raise ValueError("No levels satisfy the revealed spaces")
+    return masks
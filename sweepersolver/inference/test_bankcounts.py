@@ -0,0 +1,61 @@
+"""
+Tests for inference from the counts of enemies left in the tile bank.
+"""
+import unittest
+
+from ..point import Point
+from ..tiles import TileBank
+from ..board import GameBoard
+from .bankcounts import BankCountInference, narrowed_bounds
+
+# import logging
+# logging.basicConfig(level=logging.DEBUG)
+
+
+class TestBankCountInference(unittest.TestCase):
+
+    def test_exhausted_level_removed(self):
+        """ Once the only level 9 enemy is revealed, everything else must be
+            level 0.
+        """
+        tile_bank = TileBank({0: 8, 9: 1})
+        board = GameBoard(3, 3, tile_bank)
+        board.set_revealed_tile(Point(0, 0), tile_bank.take(9, 0))
+
+        self.assertFalse(board.get_tile(Point(2, 2)).enemy_lvl.is_exact)
+        self.assertEqual(BankCountInference().narrow(board), 5)
+        for space in board.iter_unrevealed_spaces():
+            self.assertEqual(space.tile.enemy_lvl, 0)
+
+    def test_remaining_spaces_filled(self):
+        """ Once the level 0 enemies left are all accounted for, the other
+            spaces must hold the level 5 enemies.
+        """
+        tile_bank = TileBank({0: 4, 5: 5})
+        board = GameBoard(3, 3, tile_bank)
+        board.set_revealed_tile(Point(0, 0), tile_bank.take(0, 0))
+
+        inference = BankCountInference()
+        self.assertEqual(inference.narrow(board), 5)
+        for space in board.iter_unrevealed_spaces():
+            if space.location in (Point(1, 0), Point(0, 1), Point(1, 1)):
+                self.assertEqual(space.tile.enemy_lvl, 0)
+            else:
+                self.assertEqual(space.tile.enemy_lvl, 5)
+
+        # Nothing has changed, so a second run does nothing.
+        self.assertEqual(inference.narrow(board), 0)
+
+    def test_nothing_to_narrow(self):
+        tile_bank = TileBank({0: 5, 1: 4})
+        board = GameBoard(3, 3, tile_bank)
+        self.assertEqual(BankCountInference().narrow(board), 0)
+
+    def test_inconsistent_counts(self):
+        # Three spaces that must be level 1, but only two level 1 enemies.
+        with self.assertRaises(ValueError):
+            narrowed_bounds({0: 1, 1: 2}, {(1, 1): 3})
+
+
+if __name__ == '__main__':
+    unittest.main()
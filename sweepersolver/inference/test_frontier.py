@@ -0,0 +1,99 @@
+"""
+Tests for exact inference over the frontier of a board.
+"""
+import itertools
+import random
+import unittest
+
+from ..point import Point
+from ..tiles import TileBank
+from ..board import GameBoard
+from .frontier import FrontierInference, find_components, feasible_levels
+
+# import logging
+# logging.basicConfig(level=logging.DEBUG)
+
+
+class TestCombinedConstraints(unittest.TestCase):
+    """ Test that spaces only determined by several revealed spaces together
+        are narrowed.
+
+    The board is a row of unrevealed spaces with levels 1, 0, 1 above a row
+    of revealed level 0 spaces. No single revealed space pins down any level,
+    but together they do.
+    """
+
+    def setUp(self):
+        self.tile_bank = TileBank({0: 4, 1: 2})
+        self.board = GameBoard(3, 2, self.tile_bank)
+        self.board.bulk_reveal_tiles({Point(0, 1): self.tile_bank.take(0, 1),
+                                      Point(1, 1): self.tile_bank.take(0, 2),
+                                      Point(2, 1): self.tile_bank.take(0, 1)})
+
+    def test_pairwise_bounds_not_enough(self):
+        for x in range(3):
+            self.assertFalse(
+                self.board.get_tile(Point(x, 0)).enemy_lvl.is_exact)
+
+    def test_narrowed(self):
+        inference = FrontierInference()
+        self.assertEqual(inference.narrow(self.board), 3)
+
+        self.assertEqual(self.board.get_tile(Point(0, 0)).enemy_lvl, 1)
+        self.assertEqual(self.board.get_tile(Point(1, 0)).enemy_lvl, 0)
+        self.assertEqual(self.board.get_tile(Point(2, 0)).enemy_lvl, 1)
+
+    def test_unchanged_components_skipped(self):
+        inference = FrontierInference()
+        inference.narrow(self.board)
+        solved = inference.components_solved
+
+        self.assertEqual(inference.narrow(self.board), 0)
+        self.assertEqual(inference.components_solved, solved)
+        self.assertGreater(inference.components_skipped, 0)
+
+
+class TestMatchesBruteForce(unittest.TestCase):
+    """ Test that the feasible levels found match enumerating every possible
+        assignment of levels.
+    """
+
+    def test_random_boards(self):
+        enemies = {0: 14, 1: 5, 2: 3, 3: 3}
+        for seed in range(10):
+            rng = random.Random(seed)
+            levels = list(itertools.chain.from_iterable(
+                [level] * count for level, count in enemies.items()))
+            rng.shuffle(levels)
+            tile_bank = TileBank(enemies)
+            board = GameBoard(5, 5, tile_bank)
+            for index in rng.sample(range(25), 8):
+                location = Point(index % 5, index // 5)
+                neighbours_sum = sum(
+                    levels[neighbour.y * 5 + neighbour.x]
+                    for neighbour in location.all_chebyshev_neighbours()
+                    if 0 <= neighbour.x < 5 and 0 <= neighbour.y < 5)
+                board.set_revealed_tile(
+                    location, tile_bank.take(levels[index], neighbours_sum))
+
+            for component in find_components(board):
+                if len(component.spaces) > 8:
+                    continue
+                self.assertEqual(feasible_levels(component),
+                                 _brute_force_levels(component))
+
+
+def _brute_force_levels(component):
+    masks = [0] * len(component.spaces)
+    domains = [range(space.tile.enemy_lvl.min, space.tile.enemy_lvl.max + 1)
+               for space in component.spaces]
+    for assignment in itertools.product(*domains):
+        if all(sum(assignment[position] for position in positions) == target
+               for target, positions in component.constraints):
+            for position, level in enumerate(assignment):
+                masks[position] |= 1 << level
+    return masks
+
+
+if __name__ == "__main__":
+    unittest.main()
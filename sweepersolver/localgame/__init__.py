@@ -1,2 +1,2 @@
-from .localgame import LocalGame
-from .difficulties import DIFFICULTY_EASY, DIFFICULTY_HUGE_EX
+from .localgame import LocalGame, GameOverError
+from .difficulties import DIFFICULTY_EASY, DIFFICULTY_HUGE_EX, make_difficulty
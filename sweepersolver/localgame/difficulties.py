@@ -52,3 +52,30 @@ DIFFICULTY_HUGE_EX = {"width": WIDTH_HUGE_EX,
                       "hp": HP_HUGE_EX,
                       "enemies": ENEMIES_HUGE_EX,
                       "xp thresholds": XP_THRESHOLDS_HUGE_EX}
+
+
+def make_difficulty(width, height, density=0.15, max_level=9,
+                    hp=HP_HUGE_EX, xp_thresholds=XP_THRESHOLDS_HUGE_EX):
+    """ Generate a difficulty for a board of any size.
+
+    The given fraction of spaces hold non-zero enemies, which are split as
+    evenly as possible across levels 1 to max_level, with any remainder going
+    to the lowest levels. All other spaces hold level 0 enemies.
+    """
+    if not 0 <= density <= 1:
+        raise ValueError("Enemy density must be between 0 and 1")
+    if max_level < 1:
+        raise ValueError("Maximum enemy level must be at least 1")
+
+    spaces = width * height
+    enemy_count = round(spaces * density)
+    per_level, remainder = divmod(enemy_count, max_level)
+    enemies = Counter({level: per_level + (1 if level <= remainder else 0)
+                       for level in range(1, max_level + 1)})
+    enemies[0] = spaces - enemy_count
+
+    return {"width": width,
+            "height": height,
+            "hp": hp,
+            "enemies": +enemies,
+            "xp thresholds": xp_thresholds}
@@ -0,0 +1,97 @@
+"""
+The true contents of every space of a local game's board.
+"""
+import logging
+from array import array
+
+from ..board.vectorised import HAVE_NUMPY, neighbour_sums_flat
+
+log = logging.getLogger(__name__)
+
+
+class GroundTruth:
+    """ The level of the enemy in every space of a board, along with the sum
+        of the levels of each space's neighbours.
+
+    Everything is known up front, so there's no need for the bounds tracking
+    of a GameBoard - levels and sums are stored in flat arrays indexed by
+    ``y * width + x``.
+    """
+
+    def __init__(self, width, height, levels):
+        if len(levels) != width * height:
+            raise ValueError("Must have a level for every board space")
+
+        self._width = width
+        self._height = height
+        self._levels = array('b', levels)
+        if HAVE_NUMPY:
+            self._neighbour_lvls_sums = \
+                array('h', neighbour_sums_flat(self._levels, width))
+        else:
+            self._neighbour_lvls_sums = \
+                array('h', window_sums(self._levels, width, height))
+            for index, level in enumerate(self._levels):
+                self._neighbour_lvls_sums[index] -= level
+
+    def __str__(self):
+        return "\n".join(
+            " ".join("%d/%d" % (self._levels[index],
+                                self._neighbour_lvls_sums[index])
+                     for index in range(row * self._width,
+                                        (row + 1) * self._width))
+            for row in range(self._height))
+
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def height(self):
+        return self._height
+
+    @property
+    def levels(self):
+        """ A copy of the levels of all spaces, in index order. """
+        return array('b', self._levels)
+
+    def index(self, x, y):
+        """ The index of the space at the given coordinates. """
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            raise ValueError("Location is outside board")
+        return y * self._width + x
+
+    def level(self, index):
+        """ The level of the enemy in the space with the given index. """
+        return self._levels[index]
+
+    def neighbour_lvls_sum(self, index):
+        """ The sum of the levels of the neighbours of the space with the
+            given index.
+        """
+        return self._neighbour_lvls_sums[index]
+
+
+def window_sums(values, width, height):
+    """ The sum of the values in the 3x3 window around each space of a board,
+        given a flat sequence of the values of each space.
+
+    The windows are summed along each row then down each column, so each
+    value is only added a handful of times.
+    """
+    row_sums = []
+    for row in range(height):
+        padded = [0]
+        padded.extend(values[row * width:(row + 1) * width])
+        padded.append(0)
+        row_sums.append([left + middle + right for left, middle, right
+                         in zip(padded, padded[1:], padded[2:])])
+
+    empty_row = [0] * width
+    padded_rows = [empty_row] + row_sums + [empty_row]
+    sums = []
+    for above, middle, below in zip(padded_rows,
+                                    padded_rows[1:],
+                                    padded_rows[2:]):
+        sums.extend(a + b + c for a, b, c in zip(above, middle, below))
+    return sums
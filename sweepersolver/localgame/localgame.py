@@ -3,42 +3,73 @@ Run a local game to try and solve.
 """
 import logging
 import random
+from collections import Counter
 
-from ..board import GameBoard
+from ..point import Point
 from ..tiles import TileBank
 from ..player import Player, PlayerDiedError
+from .groundtruth import GroundTruth
 
 log = logging.getLogger(__name__)
 
 
 class GameOverError(Exception):
-    pass
+    """ The player has died, ending the game. """
+
+    def __init__(self, message, enemy_level=None):
+        super().__init__(message)
+        # The level of the enemy that killed the player.
+        self.enemy_level = enemy_level
 
 
 class LocalGame(object):
-    """ A local game to play against. """
+    """ A local game to play against.
+
+    Revealed spaces are tracked in a flat bitmap indexed by
+    ``y * width + x``, and a running count is kept of the non-zero enemies
+    left, so reveals and completion checks take constant time however large
+    the board.
+    """
 
-    def __init__(self, difficulty):
+    def __init__(self, difficulty, rng=None, layout=None):
+        """
+        :param rng: The random.Random to place enemies with. Defaults to the
+                    global random module.
+        :param layout: Optionally, the level of the enemy in every space in
+                       index order, to use instead of placing them randomly.
+        """
         self._width = difficulty["width"]
         self._height = difficulty["height"]
-        self._enemy_counter = difficulty["enemies"]
+        self._enemy_counter = Counter(difficulty["enemies"])
+        self._rng = random if rng is None else rng
 
+        # Tiles are taken from the bank as they're revealed.
         self._tile_bank = TileBank(self._enemy_counter)
-        self._board = GameBoard(self._width, self._height, self._tile_bank)
-
-        self._place_enemies(list(self._enemy_counter.elements()))
+        if layout is None:
+            self._board = self._place_enemies(
+                list(self._enemy_counter.elements()))
+        else:
+            if Counter(layout) != +self._enemy_counter:
+                raise ValueError("Layout doesn't match difficulty's enemies")
+            self._board = GroundTruth(self._width, self._height, layout)
 
         self._player = Player(difficulty["hp"], difficulty["xp thresholds"])
 
-        self._revealed_locations = []
+        self._revealed = bytearray(self._width * self._height)
+        self._enemies_remaining = sum(count for level, count
+                                      in self._enemy_counter.items()
+                                      if level != 0)
 
     def __str__(self):
         enemy_counts_str = ", ".join("%s: %s" % (enemy, count)
                                      for enemy, count in
                                      self._enemy_counter.items())
+        revealed_locations = [Point(index % self._width, index // self._width)
+                              for index, revealed in enumerate(self._revealed)
+                              if revealed]
         return ("%s\nRevealed locations: %s\nEnemies:: %s\n%s" %
                 (self._board,
-                 self._revealed_locations,
+                 revealed_locations,
                  enemy_counts_str,
                  self._player))
 
@@ -46,6 +77,11 @@ class LocalGame(object):
     def player(self):
         return self._player
 
+    @property
+    def layout(self):
+        """ The level of the enemy in every space, in index order. """
+        return self._board.levels
+
     @property
     def enemy_counter(self):
         return self._enemy_counter
@@ -53,49 +89,53 @@ class LocalGame(object):
     @property
     def is_complete(self):
         """ The game is complete when all (non-zero) enemies are defeated. """
-        return (sum(value for key, value in self._enemy_counter.items()
-                    if key is not 0) == 0)
+        return self._enemies_remaining == 0
 
     def reveal(self, location):
         """ Reveal and return a tile, forcing the player to battle any enemy
             on it. If the player dies, an error is raised.
         """
-        if location in self._revealed_locations:
+        return self.reveal_xy(location.x, location.y)
+
+    def reveal_xy(self, x, y):
+        """ As reveal, but taking the coordinates of the location. """
+        return self.reveal_index(self._board.index(x, y))
+
+    def reveal_index(self, index):
+        """ As reveal, but taking the index of the location, which is
+            ``y * width + x``.
+        """
+        if not 0 <= index < len(self._revealed):
+            raise ValueError("Location is outside board")
+        if self._revealed[index]:
             raise ValueError("Can't reveal same location twice")
-        self._revealed_locations.append(location)
+        self._revealed[index] = 1
 
-        tile = self._board.get_tile(location)
+        level = self._board.level(index)
+        tile = self._tile_bank.take(level,
+                                    self._board.neighbour_lvls_sum(index))
         try:
-            self._player.battle(tile.enemy_lvl.exact)
+            self._player.battle(level)
         except PlayerDiedError:
-            raise GameOverError("Player Died! Killed by enemy: %s" %
-                                tile.enemy_lvl.exact)
+            raise GameOverError("Player Died! Killed by enemy: %s" % level,
+                                level)
 
-        self._enemy_counter.subtract({tile.enemy_lvl.exact: 1})
+        self._enemy_counter[level] -= 1
+        if level != 0:
+            self._enemies_remaining -= 1
         return tile
 
     def _place_enemies(self, enemy_list):
-        """ Randomly place the enemies on the board. """
+        """ Randomly place the enemies on the board.
+
+        :return: The GroundTruth of the board.
+        """
         log.debug("Placing enemies: %r", enemy_list)
 
         if len(enemy_list) != (self._height * self._width):
             raise ValueError("Must have an enemy for every board space")
 
-        random.shuffle(enemy_list)
-
-        spaces_to_enemies = {space.location: enemy
-                             for space, enemy in
-                             zip(self._board.iter_spaces(), enemy_list)}
-        log.debug("Decided enemy locations: %r", spaces_to_enemies)
-
-        tiles_by_locations = {}
-        for space in self._board.iter_spaces():
-            log.debug("Placing tile in space: %r", space)
-            neighbour_levels_sum = \
-                sum(spaces_to_enemies[neighbour.location]
-                    for neighbour in self._board.iter_neighbours(space))
-            tile = self._tile_bank.take(spaces_to_enemies[space.location],
-                                        neighbour_levels_sum)
-            tiles_by_locations[space.location] = tile
+        self._rng.shuffle(enemy_list)
+        log.debug("Decided enemy levels: %r", enemy_list)
 
-        self._board.bulk_reveal_tiles(tiles_by_locations)
+        return GroundTruth(self._width, self._height, enemy_list)
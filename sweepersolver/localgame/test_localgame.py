@@ -1,11 +1,13 @@
 """
 Tests for the local game.
 """
+import random
 import unittest
 from collections import Counter
 
 from ..point import Point
 from .localgame import LocalGame, GameOverError
+from .groundtruth import GroundTruth, window_sums
 
 # import logging
 # logging.basicConfig(level=logging.DEBUG)
@@ -55,3 +57,87 @@ class TestInvalidReveals(unittest.TestCase):
 
         local_game.reveal(Point(0, 0))
         self.assertRaises(ValueError, local_game.reveal, Point(0, 0))
+
+
+class TestHeadlessReveals(unittest.TestCase):
+    """ Test revealing by coordinates and index, and seeding placement. """
+
+    def setUp(self):
+        self.difficulty = {"width": 3,
+                           "height": 3,
+                           "hp": 10,
+                           "enemies": Counter({0: 7, 1: 2}),
+                           "xp thresholds": XP_THRESHOLDS}
+
+    def test_seeded_placement(self):
+        first = LocalGame(self.difficulty, random.Random(1))
+        second = LocalGame(self.difficulty, random.Random(1))
+        for index in range(9):
+            first_tile = first.reveal_index(index)
+            second_tile = second.reveal_index(index)
+            self.assertEqual(first_tile.enemy_lvl, second_tile.enemy_lvl)
+            self.assertEqual(first_tile.neighbour_lvls_sum,
+                             second_tile.neighbour_lvls_sum)
+        self.assertTrue(first.is_complete)
+
+    def test_reveal_forms_agree(self):
+        local_game = LocalGame(self.difficulty, random.Random(2))
+        local_game.reveal_xy(1, 0)
+        self.assertRaises(ValueError, local_game.reveal, Point(1, 0))
+        self.assertRaises(ValueError, local_game.reveal_index, 1)
+        self.assertRaises(ValueError, local_game.reveal_xy, 3, 0)
+        self.assertRaises(ValueError, local_game.reveal_index, -1)
+        self.assertRaises(ValueError, local_game.reveal_index, 9)
+
+    def test_difficulty_unchanged(self):
+        local_game = LocalGame(self.difficulty, random.Random(3))
+        for index in range(9):
+            local_game.reveal_index(index)
+        self.assertEqual(self.difficulty["enemies"], Counter({0: 7, 1: 2}))
+        self.assertEqual(local_game.enemy_counter[1], 0)
+
+
+class TestGroundTruth(unittest.TestCase):
+    """ Test that the neighbour sums of a generated board are correct. """
+
+    def setUp(self):
+        rng = random.Random(0)
+        self.width = 7
+        self.height = 5
+        self.levels = [rng.randint(0, 9)
+                       for _ in range(self.width * self.height)]
+
+    def _expected_sum(self, x, y):
+        return sum(self.levels[neighbour_y * self.width + neighbour_x]
+                   for neighbour_x in range(x - 1, x + 2)
+                   for neighbour_y in range(y - 1, y + 2)
+                   if (neighbour_x, neighbour_y) != (x, y) and
+                   0 <= neighbour_x < self.width and
+                   0 <= neighbour_y < self.height)
+
+    def test_neighbour_sums(self):
+        ground_truth = GroundTruth(self.width, self.height, self.levels)
+        for y in range(self.height):
+            for x in range(self.width):
+                index = ground_truth.index(x, y)
+                self.assertEqual(ground_truth.level(index),
+                                 self.levels[index])
+                self.assertEqual(ground_truth.neighbour_lvls_sum(index),
+                                 self._expected_sum(x, y))
+
+    def test_window_sums(self):
+        sums = window_sums(self.levels, self.width, self.height)
+        for y in range(self.height):
+            for x in range(self.width):
+                index = y * self.width + x
+                self.assertEqual(sums[index] - self.levels[index],
+                                 self._expected_sum(x, y))
+
+    def test_outside_board(self):
+        ground_truth = GroundTruth(self.width, self.height, self.levels)
+        self.assertRaises(ValueError, ground_truth.index, self.width, 0)
+        self.assertRaises(ValueError, ground_truth.index, 0, -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1 @@
+from .metrics import Metrics, NullMetrics, NULL_METRICS
@@ -0,0 +1,130 @@
+"""
+Counters and phase timers that the board and solver report their work to.
+"""
+import logging
+import time
+from collections import Counter
+
+log = logging.getLogger(__name__)
+
+
+class Metrics:
+    """ Collects named counters and the time spent in named phases.
+
+    Counters are incremented with count, and phases are timed by running them
+    inside a timer context manager. Phases can nest, in which case the time
+    in the inner phase is also counted in the outer one.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self._counters = Counter()
+        # Mapping of phase names to [times entered, total seconds, longest].
+        self._timers = {}
+
+    def __repr__(self):
+        return "%s(counters=%d, timers=%d)" % (self.__class__.__name__,
+                                               len(self._counters),
+                                               len(self._timers))
+
+    def count(self, name, amount=1):
+        """ Add to the counter with the given name. """
+        self._counters[name] += amount
+
+    def timer(self, name):
+        """ A context manager timing the phase with the given name. """
+        return _PhaseTimer(self, name)
+
+    def add_time(self, name, seconds):
+        """ Record a phase with the given name taking the given time. """
+        timer = self._timers.get(name)
+        if timer is None:
+            self._timers[name] = [1, seconds, seconds]
+        else:
+            timer[0] += 1
+            timer[1] += seconds
+            if seconds > timer[2]:
+                timer[2] = seconds
+
+    def stats(self):
+        """ A snapshot of everything collected since the last reset.
+
+        :return: A dictionary with the counters under "counters", as a
+                 mapping of names to counts, and the phases under "timers",
+                 as a mapping of names to dictionaries of the number of times
+                 the phase was timed, and its total, mean and maximum seconds.
+        """
+        return {"counters": dict(self._counters),
+                "timers": {name: {"count": count,
+                                  "total": total,
+                                  "mean": total / count,
+                                  "max": longest}
+                           for name, (count, total, longest)
+                           in self._timers.items()}}
+
+    def reset(self):
+        """ Clear all counters and timers, such as between games. """
+        self._counters.clear()
+        self._timers.clear()
+
+
+class _PhaseTimer:
+    """ Context manager adding the time spent inside it to a phase. """
+
+    def __init__(self, metrics, name):
+        self._metrics = metrics
+        self._name = name
+        self._start_time = None
+
+    def __enter__(self):
+        self._start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._metrics.add_time(self._name,
+                               time.perf_counter() - self._start_time)
+
+
+class NullMetrics:
+    """ Metrics that discard everything, used when collection is disabled.
+
+    Every method does nothing, and timer returns the same do-nothing context
+    manager each time, so reporting costs only the method call.
+    """
+
+    enabled = False
+
+    def __repr__(self):
+        return "%s()" % self.__class__.__name__
+
+    def count(self, name, amount=1):
+        pass
+
+    def timer(self, name):
+        return _NULL_TIMER
+
+    def add_time(self, name, seconds):
+        pass
+
+    def stats(self):
+        return {"counters": {}, "timers": {}}
+
+    def reset(self):
+        pass
+
+
+class _NullTimer:
+    """ Context manager that times nothing. """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+# Shared instance used by anything not given metrics to report to.
+NULL_METRICS = NullMetrics()
@@ -0,0 +1,62 @@
+"""
+Tests for metrics collection.
+"""
+import unittest
+
+from .metrics import Metrics, NULL_METRICS
+
+
+class TestMetrics(unittest.TestCase):
+    """ Test counting, timing and resetting. """
+
+    def test_counters(self):
+        metrics = Metrics()
+        metrics.count("a")
+        metrics.count("a")
+        metrics.count("b", 5)
+        self.assertEqual(metrics.stats()["counters"], {"a": 2, "b": 5})
+
+    def test_timers(self):
+        metrics = Metrics()
+        with metrics.timer("outer"):
+            with metrics.timer("inner"):
+                pass
+        metrics.add_time("inner", 2.0)
+
+        timers = metrics.stats()["timers"]
+        self.assertEqual(timers["outer"]["count"], 1)
+        self.assertEqual(timers["inner"]["count"], 2)
+        self.assertEqual(timers["inner"]["max"], 2.0)
+        self.assertGreaterEqual(timers["inner"]["total"], 2.0)
+        self.assertAlmostEqual(timers["inner"]["mean"],
+                               timers["inner"]["total"] / 2)
+
+    def test_timer_records_on_error(self):
+        metrics = Metrics()
+        with self.assertRaises(ValueError):
+            with metrics.timer("failing"):
+                raise ValueError
+        self.assertEqual(metrics.stats()["timers"]["failing"]["count"], 1)
+
+    def test_reset(self):
+        metrics = Metrics()
+        metrics.count("a")
+        metrics.add_time("b", 1.0)
+        metrics.reset()
+        self.assertEqual(metrics.stats(), {"counters": {}, "timers": {}})
+
+
+class TestNullMetrics(unittest.TestCase):
+    """ Test that null metrics collect nothing. """
+
+    def test_nothing_collected(self):
+        NULL_METRICS.count("a")
+        NULL_METRICS.add_time("b", 1.0)
+        with NULL_METRICS.timer("c"):
+            pass
+        self.assertFalse(NULL_METRICS.enabled)
+        self.assertEqual(NULL_METRICS.stats(), {"counters": {}, "timers": {}})
+
+
+if __name__ == "__main__":
+    unittest.main()
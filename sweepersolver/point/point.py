@@ -5,17 +5,38 @@ from math import sqrt
 
 
 class Point:
-    """ Represents an immutable 2d point. """
+    """ Represents an immutable 2d point.
+
+    Points are used as dict keys and compared throughout the board and
+    solver, so the hash is worked out once, up front. Boards hand out a
+    single shared Point for each of their locations - see
+    board.neighbours.PointGrid - so most comparisons are of a point with
+    itself.
+    """
+
+    __slots__ = ("_x", "_y", "_hash")
 
     def __init__(self, x, y):
         self._x = x
         self._y = y
+        self._hash = hash((x, y))
 
     def __eq__(self, other):
-        return (self.x == other.x) and (self.y == other.y)
+        if other is self:
+            return True
+        return (self._x == other.x) and (self._y == other.y)
 
     def __hash__(self):
-        return hash((self.x, self.y))
+        return self._hash
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (self.__class__, (self._x, self._y))
 
     def __repr__(self):
         return "Point(%r, %r)" % (self.x, self.y)
@@ -54,6 +75,8 @@ class Point:
 
 
 if __name__ == "__main__":
+    import copy
+    import pickle
     import unittest
 
     class TestChebyshevDistance(unittest.TestCase):
@@ -96,4 +119,26 @@ if __name__ == "__main__":
         def test_y_inequality(self):
             self.assertNotEqual(Point(1, 1), Point(1, 0))
 
+    class TestHashing(unittest.TestCase):
+        """ Test the hashing and copying of Points. """
+
+        def test_equal_hashes(self):
+            self.assertEqual(hash(Point(2, 1)), hash(Point(2, 1)))
+
+        def test_dict_key(self):
+            self.assertEqual({Point(2, 1): "a"}[Point(2, 1)], "a")
+
+        def test_slots(self):
+            self.assertRaises(AttributeError, setattr, Point(2, 1), "z", 0)
+
+        def test_copies_are_same_instance(self):
+            point = Point(2, 1)
+            self.assertIs(copy.copy(point), point)
+            self.assertIs(copy.deepcopy(point), point)
+
+        def test_pickle(self):
+            point = pickle.loads(pickle.dumps(Point(2, 1)))
+            self.assertEqual(point, Point(2, 1))
+            self.assertEqual(hash(point), hash(Point(2, 1)))
+
     unittest.main()
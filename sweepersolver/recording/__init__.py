@@ -0,0 +1,2 @@
+from .recording import Recording, read_recording, write_recording
+from .replay import replay
@@ -0,0 +1,169 @@
+"""
+A compact binary record of a local game, from which it can be replayed.
+
+The format is a fixed header - magic bytes, format version - followed by a
+zlib compressed body of little-endian fields:
+
+- seed (int64), difficulty name (uint16 length then UTF-8)
+- width, height (uint32), hp (int32)
+- xp thresholds: count (uint16) then (level int16, xp int64) pairs
+- enemies: count (uint16) then (level int16, count uint32) pairs
+- layout: the level of every space in index order (int8 each)
+- moves: count (uint32) then (x uint32, y uint32, solver seconds float64)
+- outcome: won (uint8), killed by level (int16, -1 if not killed)
+"""
+import logging
+import struct
+import zlib
+from array import array
+
+log = logging.getLogger(__name__)
+
+
+MAGIC = b"SWRC"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sH")
+_SEED = struct.Struct("<q")
+_LENGTH = struct.Struct("<H")
+_SIZE = struct.Struct("<IIi")
+_XP_THRESHOLD = struct.Struct("<hq")
+_ENEMY_COUNT = struct.Struct("<hI")
+_MOVE_COUNT = struct.Struct("<I")
+_MOVE = struct.Struct("<IId")
+_OUTCOME = struct.Struct("<Bh")
+
+
+class Recording:
+    """ Everything needed to replay a local game: how it was generated, the
+        true contents of the board, and the moves the solver made.
+
+    Each move is a tuple of the x and y coordinates revealed and the time in
+    seconds the solver took to choose it.
+    """
+
+    def __init__(self, seed, difficulty_name, difficulty, layout,
+                 moves=None, won=False, killed_by=None):
+        self.seed = seed
+        self.difficulty_name = difficulty_name
+        self.difficulty = difficulty
+        self.layout = array('b', layout)
+        self.moves = [] if moves is None else moves
+        self.won = won
+        self.killed_by = killed_by
+
+    def __repr__(self):
+        return ("Recording(seed=%r, difficulty=%r, moves=%d, won=%r)" %
+                (self.seed, self.difficulty_name, len(self.moves), self.won))
+
+    def add_move(self, x, y, seconds):
+        """ Record a move, and how long the solver took to make it. """
+        self.moves.append((x, y, seconds))
+
+    def to_bytes(self):
+        """ Encode the recording in the binary format. """
+        difficulty = self.difficulty
+        name = self.difficulty_name.encode("utf-8")
+        parts = [_SEED.pack(self.seed),
+                 _LENGTH.pack(len(name)),
+                 name,
+                 _SIZE.pack(difficulty["width"],
+                            difficulty["height"],
+                            difficulty["hp"]),
+                 _LENGTH.pack(len(difficulty["xp thresholds"]))]
+        parts.extend(_XP_THRESHOLD.pack(level, xp) for level, xp
+                     in sorted(difficulty["xp thresholds"].items()))
+        parts.append(_LENGTH.pack(len(difficulty["enemies"])))
+        parts.extend(_ENEMY_COUNT.pack(level, count) for level, count
+                     in sorted(difficulty["enemies"].items()))
+        parts.append(self.layout.tobytes())
+        parts.append(_MOVE_COUNT.pack(len(self.moves)))
+        parts.extend(_MOVE.pack(*move) for move in self.moves)
+        parts.append(_OUTCOME.pack(self.won,
+                                   -1 if self.killed_by is None
+                                   else self.killed_by))
+
+        return _HEADER.pack(MAGIC, VERSION) + zlib.compress(b"".join(parts))
+
+    @classmethod
+    def from_bytes(cls, data):
+        """ Decode a recording from the binary format.
+
+        :raises ValueError: If the data isn't a recording this version can
+                            read.
+        """
+        if len(data) < _HEADER.size:
+            raise ValueError("Data too short to be a recording")
+        magic, version = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Data is not a game recording")
+        if version != VERSION:
+            raise ValueError("Unsupported recording version: %d" % version)
+        try:
+            body = zlib.decompress(data[_HEADER.size:])
+        except zlib.error as error:
+            raise ValueError("Corrupt recording: %s" % error)
+
+        reader = _Reader(body)
+        seed, = reader.unpack(_SEED)
+        name_length, = reader.unpack(_LENGTH)
+        difficulty_name = reader.read(name_length).decode("utf-8")
+        width, height, hp = reader.unpack(_SIZE)
+        threshold_count, = reader.unpack(_LENGTH)
+        xp_thresholds = dict(reader.unpack(_XP_THRESHOLD)
+                             for _ in range(threshold_count))
+        enemy_count, = reader.unpack(_LENGTH)
+        enemies = dict(reader.unpack(_ENEMY_COUNT)
+                       for _ in range(enemy_count))
+        layout = array('b')
+        layout.frombytes(reader.read(width * height))
+        move_count, = reader.unpack(_MOVE_COUNT)
+        moves = [reader.unpack(_MOVE) for _ in range(move_count)]
+        won, killed_by = reader.unpack(_OUTCOME)
+        if not reader.at_end:
+            raise ValueError("Unexpected data at end of recording")
+
+        difficulty = {"width": width,
+                      "height": height,
+                      "hp": hp,
+                      "enemies": enemies,
+                      "xp thresholds": xp_thresholds}
+        return cls(seed, difficulty_name, difficulty, layout, moves,
+                   bool(won), None if killed_by == -1 else killed_by)
+
+
+class _Reader:
+    """ Reads consecutive fields from a buffer. """
+
+    def __init__(self, data):
+        self._data = data
+        self._offset = 0
+
+    @property
+    def at_end(self):
+        return self._offset == len(self._data)
+
+    def read(self, length):
+        if self._offset + length > len(self._data):
+            raise ValueError("Recording is truncated")
+        chunk = self._data[self._offset:self._offset + length]
+        self._offset += length
+        return chunk
+
+    def unpack(self, field):
+        return field.unpack(self.read(field.size))
+
+
+def write_recording(recording, path):
+    """ Write a recording to a file. """
+    data = recording.to_bytes()
+    with open(path, 'wb') as recording_file:
+        recording_file.write(data)
+    log.info("Written recording of %d moves (%d bytes) to: %s",
+             len(recording.moves), len(data), path)
+
+
+def read_recording(path):
+    """ Read a recording from a file. """
+    with open(path, 'rb') as recording_file:
+        return Recording.from_bytes(recording_file.read())
@@ -0,0 +1,99 @@
+"""
+Replay recorded games through the solver as fast as possible.
+"""
+import logging
+import random
+import time
+from collections import Counter
+
+from ..board import GameBoard
+from ..tiles import TileBank
+from ..point import Point
+from ..solver import Solver
+from ..inference import BankCountInference, FrontierInference
+from ..localgame import LocalGame, GameOverError
+
+log = logging.getLogger(__name__)
+
+
+def replay(recording, follow_recording=True, lookahead_depth=0):
+    """ Re-run the solver over a recorded game, timing it and checking its
+        moves against those recorded.
+
+    The game is rebuilt from the recorded layout, and the solver set up as
+    for automated games with the recorded seed, so an unchanged solver makes
+    exactly the recorded moves.
+
+    :param follow_recording: If True, play the recorded moves whatever the
+                             solver chooses, so that every move is made on
+                             the same board as when recorded - use this to
+                             compare timings. If False, play the solver's own
+                             moves to see how it now does on the game.
+    :param lookahead_depth: Lookahead depth for the solver, as for Solver.
+                            This must match the game as recorded for the
+                            solver to make the same moves.
+    :return: A dictionary summarising the replay.
+    """
+    difficulty = recording.difficulty
+    local_game = LocalGame(difficulty, layout=recording.layout)
+    tile_bank = TileBank(Counter(difficulty["enemies"]))
+    game_board = GameBoard(difficulty["width"],
+                           difficulty["height"],
+                           tile_bank)
+    solver = Solver(game_board,
+                    [BankCountInference(), FrontierInference()],
+                    random.Random(recording.seed),
+                    lookahead_depth)
+
+    moves = 0
+    mismatches = 0
+    first_mismatch = None
+    solver_seconds = 0.0
+    board_seconds = 0.0
+    killed_by = None
+
+    try:
+        while not local_game.is_complete:
+            if follow_recording and moves == len(recording.moves):
+                break
+
+            start_time = time.perf_counter()
+            location = solver.make_move(local_game.player)
+            solver_seconds += time.perf_counter() - start_time
+
+            if moves < len(recording.moves):
+                x, y, _ = recording.moves[moves]
+                if (location.x, location.y) != (x, y):
+                    mismatches += 1
+                    if first_mismatch is None:
+                        first_mismatch = moves
+                        log.info("Move %d differs from recording: %s not %s",
+                                 moves, location, Point(x, y))
+                    if follow_recording:
+                        location = game_board.location(x, y)
+            moves += 1
+
+            tile = local_game.reveal(location)
+            start_time = time.perf_counter()
+            game_board.set_revealed_tile(
+                location,
+                tile_bank.take(tile.enemy_lvl.exact,
+                               tile.neighbour_lvls_sum))
+            board_seconds += time.perf_counter() - start_time
+    except GameOverError as error:
+        killed_by = error.enemy_level
+
+    return {"seed": recording.seed,
+            "difficulty": recording.difficulty_name,
+            "moves": moves,
+            "recorded_moves": len(recording.moves),
+            "mismatches": mismatches,
+            "first_mismatch": first_mismatch,
+            "won": local_game.is_complete,
+            "killed_by": killed_by,
+            "recorded_won": recording.won,
+            "recorded_killed_by": recording.killed_by,
+            "solver_seconds": solver_seconds,
+            "recorded_solver_seconds": sum(seconds for _, _, seconds
+                                           in recording.moves),
+            "board_seconds": board_seconds}
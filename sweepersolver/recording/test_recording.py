@@ -0,0 +1,95 @@
+"""
+Tests for recording and replaying games.
+"""
+import random
+import time
+import unittest
+from collections import Counter
+
+from ..board import GameBoard
+from ..tiles import TileBank
+from ..solver import Solver
+from ..inference import BankCountInference, FrontierInference
+from ..localgame import LocalGame, GameOverError, make_difficulty
+from .recording import Recording
+from .replay import replay
+
+# import logging
+# logging.basicConfig(level=logging.DEBUG)
+
+
+def _play_recorded_game(difficulty, seed):
+    """ Play a game as automated games are played, recording it. """
+    local_game = LocalGame(difficulty, random.Random(seed))
+    tile_bank = TileBank(Counter(difficulty["enemies"]))
+    game_board = GameBoard(difficulty["width"],
+                           difficulty["height"],
+                           tile_bank)
+    solver = Solver(game_board,
+                    [BankCountInference(), FrontierInference()],
+                    random.Random(seed))
+    recording = Recording(seed, "test", difficulty, local_game.layout)
+    try:
+        while not local_game.is_complete:
+            start_time = time.perf_counter()
+            location = solver.make_move(local_game.player)
+            recording.add_move(location.x, location.y,
+                               time.perf_counter() - start_time)
+            tile = local_game.reveal(location)
+            game_board.set_revealed_tile(
+                location,
+                tile_bank.take(tile.enemy_lvl.exact, tile.neighbour_lvls_sum))
+    except GameOverError as error:
+        recording.killed_by = error.enemy_level
+    else:
+        recording.won = True
+    return recording
+
+
+class TestEncoding(unittest.TestCase):
+    """ Test that recordings survive being encoded and decoded. """
+
+    def setUp(self):
+        self.difficulty = make_difficulty(12, 8)
+        self.recording = _play_recorded_game(self.difficulty, 3)
+
+    def test_round_trip(self):
+        decoded = Recording.from_bytes(self.recording.to_bytes())
+        self.assertEqual(decoded.seed, self.recording.seed)
+        self.assertEqual(decoded.difficulty_name, "test")
+        self.assertEqual(decoded.difficulty["enemies"],
+                         dict(self.difficulty["enemies"]))
+        self.assertEqual(decoded.difficulty["xp thresholds"],
+                         self.difficulty["xp thresholds"])
+        self.assertEqual(decoded.difficulty["hp"], self.difficulty["hp"])
+        self.assertEqual(decoded.layout, self.recording.layout)
+        self.assertEqual(decoded.moves, self.recording.moves)
+        self.assertEqual(decoded.won, self.recording.won)
+        self.assertEqual(decoded.killed_by, self.recording.killed_by)
+
+    def test_invalid_data(self):
+        data = self.recording.to_bytes()
+        self.assertRaises(ValueError, Recording.from_bytes, b"")
+        self.assertRaises(ValueError, Recording.from_bytes,
+                          b"XXXX" + data[4:])
+        self.assertRaises(ValueError, Recording.from_bytes, data[:-4])
+
+
+class TestReplay(unittest.TestCase):
+    """ Test that replaying a recording reproduces the game exactly. """
+
+    def test_replay_matches(self):
+        difficulty = make_difficulty(16, 16)
+        for seed in range(3):
+            recording = _play_recorded_game(difficulty, seed)
+            for follow_recording in (True, False):
+                summary = replay(Recording.from_bytes(recording.to_bytes()),
+                                 follow_recording)
+                self.assertEqual(summary["mismatches"], 0)
+                self.assertEqual(summary["moves"], len(recording.moves))
+                self.assertEqual(summary["won"], recording.won)
+                self.assertEqual(summary["killed_by"], recording.killed_by)
+
+
+if __name__ == "__main__":
+    unittest.main()
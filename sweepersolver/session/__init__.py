@@ -0,0 +1,2 @@
+from .session import (Session, SessionStore, bulk_reveal, get_int,
+                      make_player, parse_enemies, parse_tiles)
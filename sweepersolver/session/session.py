@@ -0,0 +1,339 @@
+"""
+Sessions solving a game that is being played elsewhere, such as by a user
+or another program, one update at a time.
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+
+from ..point import Point
+from ..board import GameBoard
+from ..tiles import TileBank
+from ..player import Player
+from ..player.player import XP_THRESHOLDS_DEFAULT
+from ..solver import Solver
+from ..inference import BankCountInference, FrontierInference
+
+log = logging.getLogger(__name__)
+
+
+# Rough memory used by a session per space on its board, from tracing the
+# allocations made setting up and playing huge-extreme games.
+BYTES_PER_SPACE = 1024
+
+# Defaults for the limits on the sessions kept by a SessionStore.
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_IDLE_TIMEOUT = 30 * 60
+
+
+def estimated_bytes(width, height):
+    """ A rough estimate of the memory used by a session for a board of the
+        given size.
+    """
+    return width * height * BYTES_PER_SPACE
+
+
+def bulk_reveal(game_board, tile_bank, contents_by_location):
+    """ Reveal many squares on a board at once, propagating the effects of
+        all of them together.
+
+    Squares that are already revealed with the same contents are skipped, so
+    the whole of the board can be given each time.
+
+    :param contents_by_location: Mapping of locations to tuples of the enemy
+                                 level and neighbour levels sum there.
+    :return: The number of squares newly revealed.
+    :raises ValueError: If the contents don't fit with the board, in which
+                        case the board is left unchanged.
+    """
+    new_contents = {}
+    for location, contents in contents_by_location.items():
+        tile = game_board.get_tile(location)
+        if tile.placeholder:
+            new_contents[location] = contents
+        elif (tile.enemy_lvl.exact, tile.neighbour_lvls_sum) != contents:
+            raise ValueError("Square %s is already revealed as %s" %
+                             (location, tile))
+
+    remaining = tile_bank.remaining_counts
+    needed = Counter(level for level, _ in new_contents.values())
+    for level, count in needed.items():
+        if count > remaining.get(level, 0):
+            raise ValueError("Only %d level %d enemies are left to reveal" %
+                             (remaining.get(level, 0), level))
+
+    tiles = {location: tile_bank.take(level, neighbour_lvls_sum)
+             for location, (level, neighbour_lvls_sum)
+             in new_contents.items()}
+    game_board.checkpoint()
+    try:
+        game_board.bulk_reveal_tiles(tiles)
+    except ValueError:
+        game_board.rollback()
+        raise
+    game_board.commit()
+    return len(tiles)
+
+
+def get_int(request, name, default=None):
+    """ Get an integer value sent as JSON from a request or event.
+
+    :param default: The value to use if there isn't one for the name.
+    :raises ValueError: If the value isn't an integer - booleans, although
+                        ints in Python, aren't accepted.
+    """
+    value = request.get(name, default)
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError("%s must be an integer" % name.capitalize())
+    return value
+
+
+def parse_enemies(enemies):
+    """ Parse enemy counts sent as JSON, where the levels are strings.
+
+    :return: A mapping of enemy levels to counts.
+    :raises ValueError: If the counts aren't a mapping of integers.
+    """
+    if not isinstance(enemies, dict):
+        raise ValueError("Enemies must be a mapping of level to count")
+    if any(isinstance(count, bool) for count in enemies.values()):
+        raise ValueError("Enemy counts must be integers")
+    try:
+        return {int(level): int(count) for level, count in enemies.items()}
+    except (TypeError, ValueError):
+        raise ValueError("Enemy levels and counts must be integers")
+
+
+def parse_tiles(tiles):
+    """ Parse revealed tiles sent as JSON, as a list of lists of the x and y
+        coordinates, enemy level and neighbour levels sum of each.
+
+    :return: A mapping of locations to tuples of the enemy level and
+             neighbour levels sum there, as for bulk_reveal.
+    :raises ValueError: If the tiles aren't in the expected format.
+    """
+    if not isinstance(tiles, list):
+        raise ValueError("Tiles must be a list")
+    contents_by_location = {}
+    for tile in tiles:
+        if (not isinstance(tile, list) or len(tile) != 4 or
+                not all(isinstance(value, int) and
+                        not isinstance(value, bool) for value in tile)):
+            raise ValueError("Each tile must be a list of x, y, level and "
+                             "neighbour levels sum: %r" % (tile,))
+        x_coord, y_coord, level, neighbour_lvls_sum = tile
+        contents_by_location[Point(x_coord, y_coord)] = (level,
+                                                         neighbour_lvls_sum)
+    return contents_by_location
+
+
+def make_player(level=1, hp=None):
+    """ A player with the default XP thresholds and the given level and hp,
+        for choosing moves in a game played elsewhere.
+
+    :param hp: The player's hp, by default that of Player.
+    :raises ValueError: If the level or hp are invalid.
+    """
+    if level not in XP_THRESHOLDS_DEFAULT:
+        raise ValueError("Invalid player level: %r" % level)
+    if hp is None:
+        return Player(level=level)
+    if hp <= 0:
+        raise ValueError("Player hp must be strictly positive")
+    return Player(hp, level=level)
+
+
+class Session:
+    """ The solver's knowledge of a single game, updated as squares are
+        revealed in it.
+
+    All methods are thread safe, with calls on the same session made one at
+    a time, so sessions can be worked on from a pool of threads.
+    """
+
+    def __init__(self, width, height, enemies, rng=None):
+        """
+        :param enemies: Mapping of enemy levels to the number of enemies of
+                        that level in the game.
+        :param rng: The random.Random for the solver to pick random moves
+                    with, as for Solver.
+        """
+        self._width = width
+        self._height = height
+        self._tile_bank = TileBank(Counter(enemies))
+        self._game_board = GameBoard(width, height, self._tile_bank)
+        self._solver = Solver(self._game_board,
+                              [BankCountInference(), FrontierInference()],
+                              rng)
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "%s(%r, %r)" % (self.__class__.__name__,
+                               self._width,
+                               self._height)
+
+    @property
+    def game_board(self):
+        """ The board of the solver's knowledge of the game. """
+        return self._game_board
+
+    @property
+    def estimated_bytes(self):
+        """ A rough estimate of the memory the session uses. """
+        return estimated_bytes(self._width, self._height)
+
+    def reveal(self, contents_by_location):
+        """ Reveal squares on the board, as for bulk_reveal. """
+        with self._lock:
+            return bulk_reveal(self._game_board, self._tile_bank,
+                               contents_by_location)
+
+    def next_move(self, player):
+        """ The point to reveal next for the given player, or None if every
+            square has been revealed.
+        """
+        with self._lock:
+            return self._next_move(player)
+
+    def reveal_and_move(self, contents_by_location, player):
+        """ Reveal squares on the board as for bulk_reveal, then find the
+            next move for the given player, all in one go.
+
+        :return: A tuple of the number of squares newly revealed and the next
+                 move, as for next_move.
+        :raises ValueError: If the contents don't fit with the board. If this
+                            or anything else goes wrong, including finding
+                            the move, the board is left unchanged.
+        """
+        with self._lock:
+            self._game_board.checkpoint()
+            try:
+                revealed = bulk_reveal(self._game_board, self._tile_bank,
+                                       contents_by_location)
+                move = self._next_move(player)
+            except Exception:
+                self._game_board.rollback()
+                raise
+            self._game_board.commit()
+            return revealed, move
+
+    def _next_move(self, player):
+        if self._game_board.all_revealed():
+            return None
+        return self._solver.make_move(player)
+
+
+class SessionStore:
+    """ A collection of sessions, each with a unique ID, within a limit on
+        the memory they use.
+
+    Sessions not used for longer than the idle timeout are evicted, and when
+    the sessions would use more than the memory limit, the least recently
+    used are evicted to make room. Sessions are kept in order of last use,
+    so both evictions take time in proportion to the number of sessions
+    evicted.
+
+    The store itself isn't thread safe, so should only be used from one
+    thread.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT, clock=time.monotonic):
+        """
+        :param max_bytes: Limit on the estimated memory used by all sessions.
+        :param idle_timeout: Seconds a session can go unused before being
+                             evicted.
+        :param clock: Function giving the current time in seconds.
+        """
+        self._max_bytes = max_bytes
+        self._idle_timeout = idle_timeout
+        self._clock = clock
+        # Mapping of session IDs to tuples of the session and when it was last
+        # used, least recently used first.
+        self._sessions = OrderedDict()
+        self._total_bytes = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
+
+    @property
+    def total_bytes(self):
+        """ The estimated memory used by all sessions in the store. """
+        return self._total_bytes
+
+    def check_fits(self, width, height):
+        """ Check that a session for a board of the given size could be added
+            to the store, before going to the expense of creating it.
+
+        :raises ValueError: If the session would be over the memory limit on
+                            its own.
+        """
+        if estimated_bytes(width, height) > self._max_bytes:
+            raise ValueError("Board of %dx%d is too large" % (width, height))
+
+    def add(self, session):
+        """ Add a new session, evicting others to make room if needed.
+
+        :return: The ID of the new session.
+        :raises ValueError: If the session would be over the memory limit on
+                            its own.
+        """
+        if session.estimated_bytes > self._max_bytes:
+            raise ValueError("Session is too large: %r" % session)
+
+        self.evict_idle()
+        while self._total_bytes + session.estimated_bytes > self._max_bytes:
+            self._evict(next(iter(self._sessions)),
+                        "to stay under memory limit")
+
+        session_id = uuid.uuid4().hex
+        self._sessions[session_id] = (session, self._clock())
+        self._total_bytes += session.estimated_bytes
+        log.info("Added session %s for %r", session_id, session)
+        return session_id
+
+    def get(self, session_id):
+        """ Get a session, marking it as used.
+
+        :raises KeyError: If there's no session with the given ID, which may
+                          be because it has been evicted.
+        """
+        self.evict_idle()
+        session, _ = self._sessions[session_id]
+        self._sessions[session_id] = (session, self._clock())
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def remove(self, session_id):
+        """ Remove a session.
+
+        :raises KeyError: If there's no session with the given ID.
+        """
+        session, _ = self._sessions.pop(session_id)
+        self._total_bytes -= session.estimated_bytes
+        log.info("Removed session %s", session_id)
+
+    def evict_idle(self):
+        """ Evict all sessions that have been idle for too long.
+
+        :return: The number of sessions evicted.
+        """
+        cutoff = self._clock() - self._idle_timeout
+        evicted = 0
+        while self._sessions:
+            session_id, (_, last_used) = next(iter(self._sessions.items()))
+            if last_used > cutoff:
+                break
+            self._evict(session_id, "after being idle")
+            evicted += 1
+        return evicted
+
+    def _evict(self, session_id, reason):
+        session, _ = self._sessions.pop(session_id)
+        self._total_bytes -= session.estimated_bytes
+        log.info("Evicted session %s %s", session_id, reason)
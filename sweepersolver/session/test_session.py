@@ -0,0 +1,170 @@
+"""
+Tests for solver sessions.
+"""
+import unittest
+
+from ..point import Point
+from .session import (Session, SessionStore, bulk_reveal, get_int,
+                      make_player, estimated_bytes, parse_enemies,
+                      parse_tiles)
+
+
+class TestBulkReveal(unittest.TestCase):
+    """ Test revealing many squares on a session's board at once. """
+
+    def setUp(self):
+        self.session = Session(3, 3, {0: 8, 1: 1})
+        self.board = self.session.game_board
+
+    def test_reveal(self):
+        revealed = self.session.reveal({Point(0, 0): (0, 0),
+                                        Point(1, 0): (0, 0),
+                                        Point(0, 1): (0, 0)})
+        self.assertEqual(revealed, 3)
+        self.assertTrue(self.board.get_tile(Point(1, 1)).enemy_lvl.is_exact)
+
+        # Revealing the same squares again changes nothing.
+        revealed = self.session.reveal({Point(0, 0): (0, 0),
+                                        Point(2, 2): (1, 0)})
+        self.assertEqual(revealed, 1)
+
+    def test_conflicting_reveal(self):
+        self.session.reveal({Point(0, 0): (0, 0)})
+        with self.assertRaises(ValueError):
+            self.session.reveal({Point(0, 0): (1, 0)})
+
+    def test_too_many_enemies(self):
+        with self.assertRaises(ValueError):
+            self.session.reveal({Point(0, 0): (1, 0), Point(1, 0): (1, 1)})
+        self.assertTrue(self.board.in_start_state())
+
+    def test_contradiction_leaves_board_unchanged(self):
+        self.session.reveal({Point(0, 0): (0, 0)})
+        remaining = self.board.tile_bank.remaining_counts
+        with self.assertRaises(ValueError):
+            bulk_reveal(self.board, self.board.tile_bank,
+                        {Point(1, 0): (0, 0), Point(2, 0): (0, 5)})
+        self.assertEqual(self.board.tile_bank.remaining_counts, remaining)
+        self.assertTrue(self.board.get_tile(Point(1, 0)).placeholder)
+
+    def test_next_move(self):
+        self.assertEqual(self.session.next_move(make_player()), Point(1, 1))
+
+    def test_no_move_once_complete(self):
+        session = Session(2, 1, {0: 1, 1: 1})
+        revealed, move = session.reveal_and_move({Point(0, 0): (0, 1)},
+                                                 make_player())
+        self.assertEqual((revealed, move), (1, Point(1, 0)))
+        revealed, move = session.reveal_and_move({Point(1, 0): (1, 0)},
+                                                 make_player())
+        self.assertEqual((revealed, move), (1, None))
+        self.assertIsNone(session.next_move(make_player()))
+
+    def test_failed_move_undoes_reveal(self):
+        remaining = self.board.tile_bank.remaining_counts
+
+        def fail(player):
+            raise ValueError("No move")
+        self.session._solver.make_move = fail
+        with self.assertRaises(ValueError):
+            self.session.reveal_and_move({Point(0, 0): (0, 0)},
+                                         make_player())
+        self.assertTrue(self.board.in_start_state())
+        self.assertEqual(self.board.tile_bank.remaining_counts, remaining)
+
+    def test_invalid_player(self):
+        with self.assertRaises(ValueError):
+            make_player(level=0)
+        with self.assertRaises(ValueError):
+            make_player(hp=0)
+
+
+class TestParsing(unittest.TestCase):
+    """ Test parsing game parameters and tiles sent as JSON. """
+
+    def test_enemies(self):
+        self.assertEqual(parse_enemies({"0": 8, "1": 1}), {0: 8, 1: 1})
+        for enemies in ([[0, 8]], {"zero": 8}, {"0": None}, {"0": True}):
+            with self.assertRaises(ValueError):
+                parse_enemies(enemies)
+
+    def test_int(self):
+        self.assertEqual(get_int({"width": 3}, "width"), 3)
+        self.assertEqual(get_int({}, "level", 1), 1)
+        for request in ({}, {"width": "3"}, {"width": 3.0},
+                        {"width": True}, {"width": None}):
+            with self.assertRaisesRegex(ValueError, "Width"):
+                get_int(request, "width")
+
+    def test_tiles(self):
+        self.assertEqual(parse_tiles([[0, 1, 2, 3], [4, 5, 6, 7]]),
+                         {Point(0, 1): (2, 3), Point(4, 5): (6, 7)})
+        for tiles in ({"0": 1}, [[0, 1, 2]], [[0, 1, 2, "3"]], [None],
+                      [[0, 1, 2, True]]):
+            with self.assertRaises(ValueError):
+                parse_tiles(tiles)
+
+
+class FakeClock:
+    """ A clock that only moves when told to. """
+
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+
+class TestSessionStore(unittest.TestCase):
+    """ Test that sessions are evicted when idle or over the memory limit. """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.store = SessionStore(max_bytes=3 * estimated_bytes(3, 3),
+                                  idle_timeout=10,
+                                  clock=self.clock)
+
+    def add_session(self):
+        return self.store.add(Session(3, 3, {0: 9}))
+
+    def test_memory_limit(self):
+        first, second, third = [self.add_session() for _ in range(3)]
+        self.store.get(first)
+        fourth = self.add_session()
+
+        self.assertEqual(len(self.store), 3)
+        self.assertNotIn(second, self.store)
+        for session_id in (first, third, fourth):
+            self.assertIn(session_id, self.store)
+        self.assertEqual(self.store.total_bytes, 3 * estimated_bytes(3, 3))
+
+    def test_too_large(self):
+        with self.assertRaises(ValueError):
+            self.store.check_fits(10, 10)
+        self.store.check_fits(3, 3)
+
+    def test_idle_timeout(self):
+        first = self.add_session()
+        self.clock.time = 5
+        second = self.add_session()
+        self.clock.time = 12
+        self.assertEqual(self.store.evict_idle(), 1)
+        self.assertNotIn(first, self.store)
+        with self.assertRaises(KeyError):
+            self.store.get(first)
+        self.store.get(second)
+
+        self.clock.time = 30
+        self.assertEqual(self.store.evict_idle(), 1)
+        self.assertEqual(self.store.total_bytes, 0)
+
+    def test_remove(self):
+        session_id = self.add_session()
+        self.store.remove(session_id)
+        self.assertEqual(len(self.store), 0)
+        with self.assertRaises(KeyError):
+            self.store.remove(session_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
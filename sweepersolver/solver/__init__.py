@@ -1 +1 @@
-from .solver import make_move
+from .solver import make_move, Solver
@@ -0,0 +1,283 @@
+"""
+Depth limited lookahead over the possible outcomes of revealing spaces, for
+choosing a move when none is known to be safe.
+"""
+import copy
+import logging
+import random
+from collections import OrderedDict
+
+from ..player import PlayerDiedError
+from .scoring import score_survivable_move
+
+
+log = logging.getLogger(__name__)
+
+
+# Default number of candidate moves considered in each position.
+DEFAULT_MAX_CANDIDATES = 4
+
+# Default number of the most likely neighbour levels sums considered for each
+# level a revealed space could have.
+DEFAULT_MAX_SUMS = 3
+
+# Default number of evaluated positions to remember.
+DEFAULT_TABLE_SIZE = 4096
+
+# Value of surviving a reveal without finding a safe move, when there's no
+# lookahead left, or no survivable move, to see what happens next.
+STUCK_VALUE = 0.5
+
+
+class ZobristHasher:
+    """ Keeps a Zobrist hash of the knowledge on a board up to date as it
+        changes.
+
+    Each possible state of each space - its bounds while unrevealed, or its
+    level and neighbour levels sum once revealed - has a random 64 bit key,
+    and the hash is the XOR of the keys of the current state of every space.
+    The board tells the hasher about every change, so the hash is updated by
+    XORing out the old key and in the new one.
+    """
+
+    def __init__(self, game_board, seed=0):
+        self._game_board = game_board
+        self._rng = random.Random(seed)
+        self._keys = {}
+
+        self.hash = 0
+        for space in game_board.iter_spaces():
+            self.hash ^= self._space_key(space)
+        game_board.add_listener(self._bounds_changed)
+
+    def close(self):
+        """ Stop tracking changes to the board. """
+        self._game_board.remove_listener(self._bounds_changed)
+
+    def key(self, index, min_level, max_level, neighbour_lvls_sum=None):
+        """ The key of a space with the given index in the given state. """
+        state = (index, min_level, max_level, neighbour_lvls_sum)
+        key = self._keys.get(state)
+        if key is None:
+            key = self._keys[state] = self._rng.getrandbits(64)
+        return key
+
+    def reveal_key(self, index, level, neighbour_lvls_sum):
+        """ The key of a space revealed to have the given contents. """
+        return self.key(index, level, level, neighbour_lvls_sum)
+
+    def _space_key(self, space):
+        enemy_lvl = space.tile.enemy_lvl
+        return self.key(space.index, enemy_lvl.min, enemy_lvl.max,
+                        space.tile.neighbour_lvls_sum)
+
+    def _bounds_changed(self, space, old_enemy_lvl, old_neighbour_lvls_sum):
+        self.hash ^= (self.key(space.index, old_enemy_lvl.min,
+                               old_enemy_lvl.max, old_neighbour_lvls_sum) ^
+                      self._space_key(space))
+
+
+class Lookahead:
+    """ Chooses between moves that aren't known to be safe by looking at what
+        each could reveal.
+
+    Each candidate move is valued as the expected value over the ways it
+    could turn out - the level of the enemy in the space and the sum of its
+    neighbours' levels. Outcomes are weighted by the enemies left in the
+    bank, with the distribution of the sum built up from the possible levels
+    of each neighbour, and only the most likely sums for each level kept. An
+    outcome is worth nothing if the enemy would kill the player, and 1 if
+    surviving it shows up a safe move. Otherwise it's valued by looking ahead
+    another move, until the depth runs out.
+
+    Outcomes are tried out on the board itself between a checkpoint and a
+    rollback, so each costs only as much as the changes it makes, and the
+    board is left as it was.
+
+    The value of each position is remembered in a transposition table keyed
+    on a Zobrist hash. Speculative positions are only ever the current board
+    plus some reveals, and propagating reveals always gives the same result
+    whatever order they're made in, so the key is the hash of the current
+    board XORed with the keys of the reveals, which finds positions reached
+    by different orders of moves without propagating them again.
+    """
+
+    def __init__(self, game_board, depth=1,
+                 max_candidates=DEFAULT_MAX_CANDIDATES,
+                 max_sums=DEFAULT_MAX_SUMS,
+                 table_size=DEFAULT_TABLE_SIZE):
+        if depth < 1:
+            raise ValueError("Lookahead depth must be at least 1")
+
+        self._game_board = game_board
+        self._depth = depth
+        self._max_candidates = max_candidates
+        self._max_sums = max_sums
+        self._table_size = table_size
+        self._table = OrderedDict()
+        self._hasher = ZobristHasher(game_board)
+        # Hash of the board before any speculative reveals.
+        self._root_hash = None
+
+        # Counts of positions looked at, for diagnostics.
+        self.positions_evaluated = 0
+        self.table_hits = 0
+
+    def close(self):
+        """ Stop tracking changes to the board. """
+        self._hasher.close()
+
+    def choose(self, player, candidates):
+        """ Choose the best of the given candidate moves.
+
+        :param candidates: Unrevealed spaces, in order of preference for
+                           breaking ties between equally valued moves.
+        :return: The chosen space, or None if there were no candidates.
+        """
+        self._root_hash = self._hasher.hash
+        best_move = None
+        best_value = None
+        for space in candidates[:self._max_candidates]:
+            value = self._move_value(player, space, 0, self._depth)
+            log.debug("Lookahead value of %s: %.3f", space.location, value)
+            if best_value is None or value > best_value:
+                best_move = space
+                best_value = value
+        return best_move
+
+    def _remember(self, key, value):
+        self._table[key] = value
+        self._table.move_to_end(key)
+        while len(self._table) > self._table_size:
+            self._table.popitem(last=False)
+
+    def _move_value(self, player, space, reveals_key, depth):
+        """ The expected value of revealing a space, given the board after
+            reveals with the given combined key.
+        """
+        total = 0.0
+        total_weight = 0.0
+        for level, neighbour_lvls_sum, weight in self._outcomes(space):
+            outcome_player = copy.copy(player)
+            try:
+                outcome_player.battle(level)
+            except PlayerDiedError:
+                total_weight += weight
+                continue
+
+            outcome_key = reveals_key ^ self._hasher.reveal_key(
+                space.index, level, neighbour_lvls_sum)
+            try:
+                value = self._outcome_value(outcome_player, space, level,
+                                            neighbour_lvls_sum, outcome_key,
+                                            depth)
+            except ValueError:
+                # The outcome contradicts what's known, so can't happen.
+                continue
+            total += weight * value
+            total_weight += weight
+
+        return total / total_weight if total_weight else 0.0
+
+    def _outcome_value(self, player, space, level, neighbour_lvls_sum,
+                       reveals_key, depth):
+        """ The value of the position after a space is revealed with the given
+            contents, and the player has fought the enemy in it.
+
+        :raises ValueError: If the outcome is impossible.
+        """
+        table_key = (self._root_hash ^ reveals_key,
+                     player.level, player.hp, player.xp, depth)
+        if table_key in self._table:
+            self._table.move_to_end(table_key)
+            self.table_hits += 1
+            value = self._table[table_key]
+            if value is None:
+                raise ValueError("Outcome contradicts the board")
+            return value
+        self.positions_evaluated += 1
+
+        game_board = self._game_board
+        game_board.checkpoint()
+        try:
+            try:
+                game_board.set_revealed_tile(
+                    space.location,
+                    game_board.tile_bank.take(level, neighbour_lvls_sum))
+            except ValueError:
+                # Remembered as None, so it's not propagated again.
+                self._remember(table_key, None)
+                raise
+
+            if next(game_board.iter_first_unrevealed_per_bounds(player.level),
+                    None) is not None:
+                value = 1.0
+            elif depth <= 1:
+                value = STUCK_VALUE
+            else:
+                candidates = survivable_candidates(game_board, player)
+                value = max((self._move_value(player, candidate, reveals_key,
+                                              depth - 1)
+                             for candidate
+                             in candidates[:self._max_candidates]),
+                            default=STUCK_VALUE)
+        finally:
+            game_board.rollback()
+
+        self._remember(table_key, value)
+        return value
+
+    def _outcomes(self, space):
+        """ The possible contents of a space when revealed.
+
+        :return: A list of (level, neighbour levels sum, weight) tuples.
+        """
+        game_board = self._game_board
+        remaining = game_board.tile_bank.remaining_counts
+        levels = _level_weights(space.tile.enemy_lvl, remaining)
+
+        # Distribution of the sum of the neighbours' levels, treating the
+        # neighbours as independent.
+        sums = {0: 1.0}
+        for neighbour in game_board.iter_neighbours(space):
+            neighbour_levels = _level_weights(neighbour.tile.enemy_lvl,
+                                              remaining)
+            new_sums = {}
+            for partial_sum, sum_weight in sums.items():
+                for neighbour_level, level_weight in neighbour_levels.items():
+                    new_sum = partial_sum + neighbour_level
+                    new_sums[new_sum] = (new_sums.get(new_sum, 0.0) +
+                                         sum_weight * level_weight)
+            sums = new_sums
+
+        likely_sums = sorted(sums.items(), key=lambda item: -item[1])
+        likely_sums = likely_sums[:self._max_sums]
+        sums_weight = sum(weight for _, weight in likely_sums)
+        return [(level, neighbour_lvls_sum,
+                 level_weight * sum_weight / sums_weight)
+                for level, level_weight in levels.items()
+                for neighbour_lvls_sum, sum_weight in likely_sums]
+
+
+def _level_weights(enemy_lvl, remaining):
+    """ The probability of each level within the given bounds, in proportion
+        to how many enemies of that level are left.
+    """
+    if enemy_lvl.is_exact:
+        return {enemy_lvl.exact: 1.0}
+    counts = {level: remaining.get(level, 0)
+              for level in range(enemy_lvl.min, enemy_lvl.max + 1)}
+    total = sum(counts.values())
+    if not total:
+        return {}
+    return {level: count / total for level, count in counts.items() if count}
+
+
+def survivable_candidates(game_board, player):
+    """ The spaces known to hold enemies the player can survive, best first
+        by score_survivable_move then in board order.
+    """
+    return sorted(game_board.iter_unrevealed_below_level(
+                      player.highest_survivable_enemy),
+                  key=lambda space: (score_survivable_move(space),
+                                     space.index))
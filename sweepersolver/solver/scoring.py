@@ -0,0 +1,21 @@
+"""
+Scores for ranking candidate moves.
+"""
+
+
+def score_safe_move(space):
+    """ Assign a score to a safe move, where the highest score is best.
+        The best move is one where we attack the highest level enemy.
+    """
+    return space.tile.enemy_lvl.max + space.tile.enemy_lvl.min
+
+
+def score_survivable_move(space):
+    """ Assign a score to a survivable move, where the lowest score is safest.
+        The safest move is one with the lowest possible maximum level, and
+        of those with the lowest max, the one with the greatest possible
+        level range.
+    """
+    return (space.tile.enemy_lvl.max -
+            ((space.tile.enemy_lvl.max - space.tile.enemy_lvl.min) /
+             (space.tile.enemy_lvl.max + 1)))
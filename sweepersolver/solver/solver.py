@@ -2,80 +2,297 @@
 Solver for sweeper games.
 
 The main API function is 'next_move' - this returns the next location to
-reveal.
+reveal. A Solver does the same for one board over a whole game, keeping track
+of the candidate moves between calls.
 
 """
+import heapq
 import logging
 import random
 
-from ..point import Point
+from ..metrics import NULL_METRICS
+from .lookahead import Lookahead, survivable_candidates
+from .scoring import score_safe_move, score_survivable_move
 
 
 log = logging.getLogger(__name__)
 
 
-def make_move(player, game_board):
+def make_move(player, game_board, inference=(), metrics=NULL_METRICS):
     """ Make the next move.
+
+    :param inference: Optional inference stages, each with a narrow method
+                      taking the board, to run to try and find a safe move if
+                      the bounds on the board don't show one.
+    :param metrics: Metrics to report the search for a move to.
     :return: The point to reveal next.
     """
+    with metrics.timer("solver.make_move"):
+        return _make_move(player, game_board, inference, metrics)
+
+
+def _make_move(player, game_board, inference, metrics):
     log.debug("Determining move for player: %s board:\n%s", player, game_board)
 
     # Handle the case where this is the first move.
     if game_board.in_start_state():
-        log.info("Board is in initial state - return center point")
-        next_point = Point(game_board.width // 2, game_board.height // 2)
-        log.info("Determined starting move as: %s", next_point)
-        return next_point
+        return _start_move(game_board, metrics)
 
     # This isn't the first move - find a tile with an enemy of the given level
     # or lower if possible.
-    safe_move = next(game_board.iter_unrevealed_below_level(player.level),
-                     None)
-    if safe_move is not None:
-        log.info("There exists a safe move - find the best one")
-        # The best move is one where we attack the highest level enemy.
-        best_move = max(game_board.iter_unrevealed_below_level(player.level),
-                        key=score_safe_move)
+    with metrics.timer("solver.safe_search"):
+        best_move = _best_safe_move(player, game_board, metrics)
+    if best_move is None and inference:
+        log.info("No safe move - running further inference")
+        with metrics.timer("solver.inference"):
+            narrowed = _run_inference(game_board, inference, metrics)
+        if narrowed:
+            with metrics.timer("solver.safe_search"):
+                best_move = _best_safe_move(player, game_board, metrics)
+    if best_move is not None:
+        metrics.count("solver.moves.safe")
         log.info("Determined next move as: %s", best_move.location)
         return best_move.location
 
     # There are no safe moves - pick a move we at least know we can survive.
+    # The best move is one where we attack the lowest level enemy.
     survivable_level = player.highest_survivable_enemy
-    survivable_move = \
-        next(game_board.iter_unrevealed_below_level(survivable_level), None)
-    if survivable_move is not None:
-        log.info("There exists a survivable move - find the best")
-        # The best move is one where we attack the lowest level enemy.
-        best_move = \
-            min(game_board.iter_unrevealed_below_level(survivable_level),
-                key=score_survivable_move)
+    with metrics.timer("solver.survivable_search"):
+        candidates = list(
+            game_board.iter_first_unrevealed_per_bounds(survivable_level))
+        metrics.count("solver.candidate_scans", len(candidates))
+        best_move = min(candidates, key=score_survivable_move, default=None)
+    if best_move is not None:
+        metrics.count("solver.moves.survivable")
         log.info("Determined next move as: %s", best_move.location)
         return best_move.location
 
-    # There's no known move we can survive. Pick a random one from all those
-    # which are at least not certain to kill us.
+    # There's no known move we can survive.
+    return _random_move(game_board, survivable_level, random, metrics)
+
+
+def _start_move(game_board, metrics):
+    """ The first move on a board, which is the centre point. """
+    metrics.count("solver.moves.start")
+    log.info("Board is in initial state - return center point")
+    next_point = game_board.location(game_board.width // 2,
+                                     game_board.height // 2)
+    log.info("Determined starting move as: %s", next_point)
+    return next_point
+
+
+def _random_move(game_board, survivable_level, rng, metrics):
+    """ Pick a random move from all those which are at least not certain to
+        kill the player.
+    """
     log.info("Forced to pick random non-guaranteed-death move")
-    random_move = \
-        random.choice(list(space
-                           for space in game_board.iter_unrevealed_spaces()
-                           if space.tile.enemy_lvl.min <= survivable_level))
+    metrics.count("solver.moves.random")
+    with metrics.timer("solver.random"):
+        candidates = [space for space in game_board.iter_unrevealed_spaces()
+                      if space.tile.enemy_lvl.min <= survivable_level]
+        if not candidates:
+            # Every move is certain death, but one still has to be made.
+            log.info("No move can be survived")
+            candidates = list(game_board.iter_unrevealed_spaces())
+        metrics.count("solver.candidate_scans", len(candidates))
+        random_move = rng.choice(candidates)
     log.info("Determined next move as: %s", random_move.location)
     return random_move.location
 
 
-def score_safe_move(space):
-    """ Assign a score to a safe move, where the highest score is best.
+def _best_safe_move(player, game_board, metrics):
+    """ Find the best move that is certain not to harm the player, if any.
         The best move is one where we attack the highest level enemy.
     """
-    return space.tile.enemy_lvl.max + space.tile.enemy_lvl.min
+    candidates = list(game_board.iter_first_unrevealed_per_bounds(
+        player.level))
+    metrics.count("solver.candidate_scans", len(candidates))
+    return max(candidates, key=score_safe_move, default=None)
 
 
-def score_survivable_move(space):
-    """ Assign a score to a survivable move, where the lowest score is safest.
-        The safest move is one with the lowest possible maximum level, and
-        of those with the lowest max, the one with the greatest possible
-        level range.
+def _run_inference(game_board, inference, metrics):
+    """ Run each inference stage over the board.
+
+    :return: The total number of spaces the stages narrowed.
+    """
+    metrics.count("solver.inference_runs")
+    narrowed = sum(stage.narrow(game_board) for stage in inference)
+    metrics.count("solver.inference_narrowed", narrowed)
+    return narrowed
+
+
+class Solver:
+    """ Makes moves on one game board over the course of a game, keeping the
+        candidate moves up to date between moves rather than searching the
+        board for them each time.
+
+    Both move scores depend only on the bounds on the level of a space, so
+    candidates are kept in a pair of heaps for each maximum level - one with
+    the highest minimum level first for safe moves, and one with the lowest
+    first for survivable moves, each then in board order. The board tells the
+    solver whenever the bounds on a space change, and the space is pushed
+    onto the heaps for its new bounds. Entries for spaces that have since
+    been revealed or narrowed are dropped when they reach the top of a heap.
+
+    The player only affects which maximum levels are safe or survivable, so
+    when they level up the heaps looked at change but nothing is rescored.
+
+    The moves made are the same as those from make_move.
     """
-    return (space.tile.enemy_lvl.max -
-            ((space.tile.enemy_lvl.max - space.tile.enemy_lvl.min) /
-             (space.tile.enemy_lvl.max + 1)))
+
+    def __init__(self, game_board, inference=(), rng=None,
+                 lookahead_depth=0, metrics=None):
+        """
+        :param inference: Optional inference stages, as for make_move.
+        :param rng: The random.Random to pick random moves with, when there's
+                    nothing better. Defaults to the global random module.
+        :param lookahead_depth: If non-zero, when there's no safe move, choose
+                                between survivable moves by looking this many
+                                moves ahead rather than just by their bounds.
+        :param metrics: Metrics to report the search for moves to. Nothing is
+                        reported if not given.
+        """
+        self._game_board = game_board
+        self._inference = inference
+        self._rng = random if rng is None else rng
+        self._metrics = NULL_METRICS if metrics is None else metrics
+        self._lookahead = (Lookahead(game_board, lookahead_depth)
+                           if lookahead_depth else None)
+        self._safe_heaps = {}
+        self._survivable_heaps = {}
+
+        for space in game_board.iter_unrevealed_spaces():
+            self._add_candidate(space)
+        game_board.add_listener(self._bounds_changed)
+
+    def close(self):
+        """ Stop tracking changes to the board. """
+        self._game_board.remove_listener(self._bounds_changed)
+        if self._lookahead is not None:
+            self._lookahead.close()
+
+    def _add_candidate(self, space):
+        """ Push an unrevealed space onto the heaps for its current bounds. """
+        enemy_lvl = space.tile.enemy_lvl
+        safe_heap = self._safe_heaps.get(enemy_lvl.max)
+        if safe_heap is None:
+            safe_heap = self._safe_heaps[enemy_lvl.max] = []
+            self._survivable_heaps[enemy_lvl.max] = []
+        # Space indices are unique, so the spaces themselves are never
+        # compared.
+        heapq.heappush(safe_heap, (-enemy_lvl.min, space.index, space))
+        heapq.heappush(self._survivable_heaps[enemy_lvl.max],
+                       (enemy_lvl.min, space.index, space))
+
+    def _bounds_changed(self, space, old_enemy_lvl, old_neighbour_lvls_sum):
+        if not space.revealed:
+            self._add_candidate(space)
+
+    @staticmethod
+    def _first_valid(heap, max_level, min_sign):
+        """ The first space in a heap whose entry is still up to date, where
+            entries are keyed on the minimum level times the given sign.
+
+        :return: The space, or None if there isn't one, and the number of
+                 entries looked at to find it.
+        """
+        scanned = 0
+        while heap:
+            scanned += 1
+            key, _, space = heap[0]
+            enemy_lvl = space.tile.enemy_lvl
+            if (not space.revealed and
+                    enemy_lvl.max == max_level and
+                    enemy_lvl.min == key * min_sign):
+                return space, scanned
+            heapq.heappop(heap)
+        return None, scanned
+
+    def _best_move(self, heaps, level, min_sign, key):
+        """ The best move with a maximum level no greater than the given
+            level, where the best has the lowest key, then the lowest index.
+        """
+        best_move = None
+        best_key = None
+        scanned = 0
+        for max_level, heap in heaps.items():
+            if max_level > level:
+                continue
+            space, heap_scanned = self._first_valid(heap, max_level, min_sign)
+            scanned += heap_scanned
+            if space is None:
+                continue
+            space_key = (key(space), space.index)
+            if best_key is None or space_key < best_key:
+                best_move = space
+                best_key = space_key
+        self._metrics.count("solver.candidate_scans", scanned)
+        return best_move
+
+    def _best_safe_move(self, player):
+        return self._best_move(self._safe_heaps,
+                               player.level,
+                               -1,
+                               lambda space: -score_safe_move(space))
+
+    def make_move(self, player):
+        """ Make the next move.
+
+        :return: The point to reveal next.
+        """
+        with self._metrics.timer("solver.make_move"):
+            return self._make_move(player)
+
+    def _make_move(self, player):
+        game_board = self._game_board
+        metrics = self._metrics
+        log.debug("Determining move for player: %s board:\n%s",
+                  player, game_board)
+
+        if game_board.in_start_state():
+            return _start_move(game_board, metrics)
+
+        with metrics.timer("solver.safe_search"):
+            best_move = self._best_safe_move(player)
+        if best_move is None and self._inference:
+            log.info("No safe move - running further inference")
+            with metrics.timer("solver.inference"):
+                narrowed = _run_inference(game_board, self._inference,
+                                          metrics)
+            if narrowed:
+                with metrics.timer("solver.safe_search"):
+                    best_move = self._best_safe_move(player)
+        if best_move is not None:
+            metrics.count("solver.moves.safe")
+            log.info("Determined next move as: %s", best_move.location)
+            return best_move.location
+
+        if self._lookahead is not None:
+            # The board is left as it was after looking ahead, so there's no
+            # need to track the speculative changes made along the way.
+            game_board.remove_listener(self._bounds_changed)
+            try:
+                with metrics.timer("solver.lookahead"):
+                    best_move = self._lookahead.choose(
+                        player, survivable_candidates(game_board, player))
+            finally:
+                game_board.add_listener(self._bounds_changed)
+            if best_move is not None:
+                metrics.count("solver.moves.lookahead")
+                log.info("Determined next move by lookahead as: %s",
+                         best_move.location)
+                return best_move.location
+
+        survivable_level = player.highest_survivable_enemy
+        with metrics.timer("solver.survivable_search"):
+            best_move = self._best_move(self._survivable_heaps,
+                                        survivable_level,
+                                        1,
+                                        score_survivable_move)
+        if best_move is not None:
+            metrics.count("solver.moves.survivable")
+            log.info("Determined next move as: %s", best_move.location)
+            return best_move.location
+
+        return _random_move(game_board, survivable_level, self._rng,
+                            metrics)
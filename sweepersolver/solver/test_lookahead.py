@@ -0,0 +1,85 @@
+"""
+Tests for choosing moves by looking ahead.
+"""
+import unittest
+
+from ..point import Point
+from ..tiles import TileBank
+from ..board import GameBoard
+from ..player import Player
+from .lookahead import Lookahead, ZobristHasher, survivable_candidates
+from .solver import Solver
+
+# import logging
+# logging.basicConfig(level=logging.DEBUG)
+
+
+class TestZobristHasher(unittest.TestCase):
+    """ Test that the hash is kept up to date as the board changes. """
+
+    def test_hash_updated(self):
+        tile_bank = TileBank({0: 12, 1: 2, 2: 2})
+        board = GameBoard(4, 4, tile_bank)
+        hasher = ZobristHasher(board)
+        start_hash = hasher.hash
+
+        board.set_revealed_tile(Point(0, 0), tile_bank.take(0, 0))
+        board.set_revealed_tile(Point(3, 3), tile_bank.take(1, 2))
+        self.assertNotEqual(hasher.hash, start_hash)
+
+        expected = 0
+        for space in board.iter_spaces():
+            expected ^= hasher.key(space.index,
+                                   space.tile.enemy_lvl.min,
+                                   space.tile.enemy_lvl.max,
+                                   space.tile.neighbour_lvls_sum)
+        self.assertEqual(hasher.hash, expected)
+
+    def test_close(self):
+        tile_bank = TileBank({0: 16})
+        board = GameBoard(4, 4, tile_bank)
+        hasher = ZobristHasher(board)
+        start_hash = hasher.hash
+        hasher.close()
+        board.set_revealed_tile(Point(0, 0), tile_bank.take(0, 0))
+        self.assertEqual(hasher.hash, start_hash)
+
+
+class TestLookahead(unittest.TestCase):
+    """ Test looking ahead from a board with no safe moves. """
+
+    def setUp(self):
+        self.tile_bank = TileBank({0: 10, 1: 3, 2: 3})
+        self.board = GameBoard(4, 4, self.tile_bank)
+        self.board.set_revealed_tile(Point(0, 0), self.tile_bank.take(0, 2))
+        self.player = Player()
+
+    def test_no_safe_move(self):
+        self.assertIsNone(next(self.board.iter_first_unrevealed_per_bounds(
+            self.player.level), None))
+
+    def test_transpositions_found(self):
+        lookahead = Lookahead(self.board, depth=2)
+        candidates = survivable_candidates(self.board, self.player)
+        move = lookahead.choose(self.player, candidates)
+
+        self.assertIn(move, candidates)
+        self.assertGreater(lookahead.positions_evaluated, 0)
+        self.assertGreater(lookahead.table_hits, 0)
+
+    def test_board_unchanged(self):
+        before = str(self.board)
+        Lookahead(self.board, depth=2).choose(
+            self.player, survivable_candidates(self.board, self.player))
+        self.assertEqual(str(self.board), before)
+
+    def test_solver_uses_lookahead(self):
+        solver = Solver(self.board, lookahead_depth=1)
+        move = solver.make_move(self.player)
+        self.assertFalse(self.board.get_tile(move).enemy_lvl >
+                         self.player.highest_survivable_enemy)
+        solver.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,16 @@
 """
 Tests for the solver.
 """
+import random
 import unittest
+from collections import Counter
 
 from ..point import Point
 from ..tiles import TileBank
 from ..board import GameBoard
 from ..player import Player
+from ..localgame import LocalGame, GameOverError, DIFFICULTY_HUGE_EX
+from ..metrics import Metrics
 from . import solver
 
 
@@ -141,5 +145,94 @@ class TestMultistageBoardStatePropagation(unittest.TestCase):
                              1)
 
 
+class TestSolverMatchesMakeMove(unittest.TestCase):
+    """ Test that a Solver kept across a game makes the same moves as calling
+        make_move afresh each time.
+    """
+
+    def test_same_moves(self):
+        for seed in range(3):
+            random.seed(seed)
+            enemies = Counter(DIFFICULTY_HUGE_EX["enemies"])
+            local_game = LocalGame(DIFFICULTY_HUGE_EX)
+            tile_banks = [TileBank(enemies), TileBank(enemies)]
+            boards = [GameBoard(DIFFICULTY_HUGE_EX["width"],
+                                DIFFICULTY_HUGE_EX["height"],
+                                tile_bank)
+                      for tile_bank in tile_banks]
+            game_solver = solver.Solver(boards[1])
+
+            try:
+                for move in range(200):
+                    random.seed(move)
+                    expected = solver.make_move(local_game.player, boards[0])
+                    random.seed(move)
+                    actual = game_solver.make_move(local_game.player)
+                    self.assertEqual(actual, expected)
+
+                    tile = local_game.reveal(expected)
+                    for tile_bank, board in zip(tile_banks, boards):
+                        board.set_revealed_tile(
+                            expected,
+                            tile_bank.take(tile.enemy_lvl.exact,
+                                           tile.neighbour_lvls_sum))
+            except GameOverError:
+                pass
+
+    def test_close(self):
+        tile_bank = TileBank({0: 9})
+        board = GameBoard(3, 3, tile_bank)
+        game_solver = solver.Solver(board)
+        game_solver.close()
+        self.assertEqual(game_solver.make_move(Player()), Point(1, 1))
+
+
+class TestMetrics(unittest.TestCase):
+    """ Test that the board and solver report their work over a game. """
+
+    def test_game_metrics(self):
+        enemies = Counter(DIFFICULTY_HUGE_EX["enemies"])
+        local_game = LocalGame(DIFFICULTY_HUGE_EX, random.Random(0))
+        tile_bank = TileBank(enemies)
+        metrics = Metrics()
+        board = GameBoard(DIFFICULTY_HUGE_EX["width"],
+                          DIFFICULTY_HUGE_EX["height"],
+                          tile_bank,
+                          metrics)
+        game_solver = solver.Solver(board, rng=random.Random(0),
+                                    metrics=metrics)
+
+        moves = 0
+        try:
+            while not local_game.is_complete:
+                location = game_solver.make_move(local_game.player)
+                moves += 1
+                tile = local_game.reveal(location)
+                board.set_revealed_tile(
+                    location,
+                    tile_bank.take(tile.enemy_lvl.exact,
+                                   tile.neighbour_lvls_sum))
+        except GameOverError:
+            pass
+
+        stats = metrics.stats()
+        counters = stats["counters"]
+        self.assertEqual(counters["solver.moves.start"], 1)
+        self.assertEqual(sum(count for name, count in counters.items()
+                             if name.startswith("solver.moves.")),
+                         moves)
+        self.assertEqual(stats["timers"]["solver.make_move"]["count"],
+                         moves)
+        self.assertEqual(counters["board.reveals"], moves - 1 +
+                         int(local_game.is_complete))
+        self.assertEqual(counters["board.propagations"],
+                         counters["board.reveals"])
+        self.assertGreater(counters["board.bounds_tightened"], 0)
+        self.assertGreater(counters["solver.candidate_scans"], 0)
+
+        metrics.reset()
+        self.assertEqual(metrics.stats(), {"counters": {}, "timers": {}})
+
+
 if __name__ == "__main__":
     unittest.main()
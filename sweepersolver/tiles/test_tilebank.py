@@ -0,0 +1,70 @@
+"""
+Tests for the tile bank.
+"""
+import unittest
+
+from .tilebank import TileBank
+
+# import logging
+# logging.basicConfig(level=logging.DEBUG)
+
+
+class TestPlaceholders(unittest.TestCase):
+    """ Test that placeholders are issued and returned correctly. """
+
+    def setUp(self):
+        self.tile_bank = TileBank({0: 2, 1: 2})
+
+    def test_return(self):
+        placeholder = self.tile_bank.new_placeholder()
+        self.tile_bank.return_placeholder(placeholder)
+
+        self.assertRaises(ValueError,
+                          self.tile_bank.return_placeholder, placeholder)
+
+    def test_return_from_other_bank(self):
+        placeholder = TileBank({0: 1}).new_placeholder()
+
+        self.assertRaises(ValueError,
+                          self.tile_bank.return_placeholder, placeholder)
+
+    def test_return_non_placeholder(self):
+        tile = self.tile_bank.take(1, 0)
+
+        self.assertRaises(ValueError, self.tile_bank.return_placeholder, tile)
+
+
+class TestTake(unittest.TestCase):
+    """ Test that tiles are taken from the bank correctly. """
+
+    def setUp(self):
+        self.tile_bank = TileBank({0: 2, 1: 2})
+
+    def test_shared_tiles(self):
+        self.assertIs(self.tile_bank.take(1, 3), self.tile_bank.take(1, 3))
+        self.assertIsNot(self.tile_bank.take(0, 3),
+                         self.tile_bank.take(0, 2))
+
+    def test_exhausted(self):
+        self.tile_bank.take(1, 0)
+        self.tile_bank.take(1, 0)
+
+        self.assertRaises(ValueError, self.tile_bank.take, 1, 0)
+
+    def test_missing_level(self):
+        self.assertRaises(ValueError, self.tile_bank.take, 2, 0)
+
+    def test_put_back(self):
+        placeholder = self.tile_bank.new_placeholder()
+        self.tile_bank.return_placeholder(placeholder)
+        tile = self.tile_bank.take(1, 0)
+        self.tile_bank.put_back(tile, placeholder)
+
+        self.assertEqual(self.tile_bank.remaining_counts, {0: 2, 1: 2})
+        self.tile_bank.return_placeholder(placeholder)
+        self.assertRaises(ValueError, self.tile_bank.put_back,
+                          placeholder, tile)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -63,8 +63,17 @@ class Tile:
         if intersection is None:
             raise ValueError("New bounds don't intersect existing bounds")
 
-        if intersection == self.enemy_lvl:
+        # Intersections return unchanged bounds as they are.
+        if intersection is self._enemy_lvl:
             return False
         else:
             self._enemy_lvl = intersection
             return True
+
+    def restore_enemy_level(self, enemy_lvl):
+        """ Set the bounds on the enemy level back to what they were before
+            being restricted, to undo the restriction.
+        """
+        if not self.placeholder:
+            raise ValueError("Can't update bounds on non-placeholder tile")
+        self._enemy_lvl = enemy_lvl
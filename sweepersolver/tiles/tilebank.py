@@ -20,7 +20,11 @@ class TileBank:
                       for lvl, count in enemy_lvls_and_counts.items()}
         self._min_level = min(key for key in self._bank)
         self._max_level = max(key for key in self._bank)
-        self._placeholders = []
+        # Tiles don't define equality, so this is keyed on tile identity.
+        self._placeholders = set()
+        # Revealed tiles never change, so all those with the same level and
+        # neighbour levels sum are shared, keyed on those two values.
+        self._tile_pool = {}
 
     @property
     def min_level(self):
@@ -32,33 +36,59 @@ class TileBank:
         """ The read-only maximum tile level in the bank. """
         return self._max_level
 
+    @property
+    def remaining_counts(self):
+        """ A copy of the mapping of levels to the number of tiles of that
+            level left in the bank.
+        """
+        return dict(self._bank)
+
     def new_placeholder(self):
         """ Create a new placeholder tile associated with this bank. """
         new_placeholder = Tile(BoundedInt(self.min_level, self.max_level),
                                placeholder=True)
-        self._placeholders.append(new_placeholder)
+        self._placeholders.add(new_placeholder)
         return new_placeholder
 
     def return_placeholder(self, placeholder):
         """ Return a placeholder tile to the bank. """
         if not placeholder.placeholder:
             raise ValueError("Tried to return non-placeholder tile")
-        if placeholder not in self._placeholders:
+        try:
+            self._placeholders.remove(placeholder)
+        except KeyError:
             raise ValueError("Tried to return placeholder not from this bank")
 
-        self._placeholders.remove(placeholder)
-
     def take(self, level, neighbour_lvls_sum):
-        """ Take a tile from the bank's pool - one must be available. """
+        """ Take a tile from the bank's pool - one must be available.
+
+        Tiles with the same level and neighbour levels sum are the same
+        object, since revealed tiles can't be modified.
+        """
         if level not in self._bank:
             raise ValueError("Tried to take tile not present in bank")
         if self._bank[level] <= 0:
             raise ValueError("No tiles of this level left in bank")
 
-        new_tile = Tile(BoundedInt(level, level),
+        key = (level, neighbour_lvls_sum)
+        tile = self._tile_pool.get(key)
+        if tile is None:
+            tile = Tile(BoundedInt(level, level),
                         neighbour_lvls_sum=neighbour_lvls_sum,
                         placeholder=False)
+            self._tile_pool[key] = tile
 
         self._bank[level] -= 1
 
-        return new_tile
+        return tile
+
+    def put_back(self, tile, placeholder):
+        """ Undo taking a tile from the bank and returning the placeholder it
+            replaced.
+        """
+        if tile.placeholder:
+            raise ValueError("Tried to put back placeholder tile")
+        if not placeholder.placeholder:
+            raise ValueError("Tried to restore non-placeholder tile")
+        self._bank[tile.enemy_lvl.exact] += 1
+        self._placeholders.add(placeholder)
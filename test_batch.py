@@ -0,0 +1,119 @@
+"""
+Tests for running and summarising batches of games.
+"""
+import unittest
+from collections import Counter
+
+from batch import LATENCY_PERCENTILES, LatencyHistogram, play_game, summarise
+from sweepersolver import DIFFICULTY_EASY
+from sweepersolver.localgame import make_difficulty
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """ Test estimating percentiles of latencies. """
+
+    def setUp(self):
+        # Latencies on bucket bounds, so percentiles are estimated exactly.
+        self.samples = [0.001] * 50 + [0.01] * 40 + [0.1] * 10
+        self.histogram = LatencyHistogram()
+        for latency in self.samples:
+            self.histogram.add(latency)
+
+    def test_percentiles(self):
+        for percent, expected in ((1, 0.001), (50, 0.001), (51, 0.01),
+                                  (90, 0.01), (91, 0.1), (99, 0.1),
+                                  (100, 0.1)):
+            self.assertAlmostEqual(self.histogram.percentile(percent),
+                                   expected)
+        self.assertEqual(self.histogram.count, 100)
+        self.assertAlmostEqual(self.histogram.total, sum(self.samples))
+        self.assertEqual(self.histogram.max, 0.1)
+
+    def test_within_bucket(self):
+        histogram = LatencyHistogram()
+        histogram.add(0.0015)
+        histogram.add(0.5)
+        self.assertGreater(histogram.percentile(50), 0.0015)
+        self.assertLess(histogram.percentile(50), 0.0015 * 10 ** (1 / 20))
+        # The estimate is never above the largest latency.
+        self.assertEqual(histogram.percentile(100), 0.5)
+
+    def test_above_buckets(self):
+        histogram = LatencyHistogram()
+        histogram.add(1000.0)
+        self.assertEqual(histogram.percentile(50), 1000.0)
+
+    def test_merge(self):
+        merged = LatencyHistogram()
+        for start in range(3):
+            part = LatencyHistogram()
+            for latency in self.samples[start::3]:
+                part.add(latency)
+            merged.merge(part)
+
+        self.assertEqual(merged.count, self.histogram.count)
+        self.assertAlmostEqual(merged.total, self.histogram.total)
+        self.assertEqual(merged.max, self.histogram.max)
+        for percent in range(1, 101):
+            self.assertEqual(merged.percentile(percent),
+                             self.histogram.percentile(percent))
+        self.assertAlmostEqual(merged.summary()["mean"],
+                               self.histogram.summary()["mean"])
+
+    def test_empty(self):
+        histogram = LatencyHistogram()
+        for percent in LATENCY_PERCENTILES:
+            self.assertIsNone(histogram.percentile(percent))
+        self.assertEqual(set(histogram.summary().values()), {None})
+
+        histogram.merge(LatencyHistogram())
+        self.assertEqual(histogram.count, 0)
+        self.assertIsNone(histogram.percentile(50))
+
+
+class TestSummarise(unittest.TestCase):
+    """ Test summarising the results of seeded games. """
+
+    @classmethod
+    def setUpClass(cls):
+        # The solver wins easy games, but not ones crowded with enemies.
+        crowded = make_difficulty(8, 8, density=0.4)
+        cls.results = [play_game(DIFFICULTY_EASY, 0),
+                       play_game(DIFFICULTY_EASY, 1),
+                       play_game(crowded, 0),
+                       play_game(crowded, 1)]
+
+    def test_wins_and_losses(self):
+        self.assertEqual([result["won"] for result in self.results],
+                         [True, True, False, False])
+        summary = summarise("mixed", 0, self.results, 1.5)
+
+        self.assertEqual(summary["games"], 4)
+        self.assertEqual(summary["wins"], 2)
+        self.assertEqual(summary["win_rate"], 0.5)
+        self.assertEqual(summary["deaths_by_enemy_level"],
+                         {str(level): count for level, count in Counter(
+                             result["killed_by"]
+                             for result in self.results[2:]).items()})
+        moves = sorted(result["moves"] for result in self.results)
+        self.assertEqual(summary["moves_per_game"]["min"], moves[0])
+        self.assertEqual(summary["moves_per_game"]["max"], moves[-1])
+        self.assertEqual(summary["move_latency_ms"]["max"],
+                         max(result["latencies"].max
+                             for result in self.results) * 1000)
+        self.assertEqual(summary["elapsed_seconds"], 1.5)
+
+    def test_seeded(self):
+        result = play_game(DIFFICULTY_EASY, 0)
+        self.assertEqual((result["won"], result["moves"]),
+                         (self.results[0]["won"], self.results[0]["moves"]))
+
+    def test_no_games(self):
+        summary = summarise("easy", 0, [], 0.0)
+        self.assertEqual((summary["games"], summary["wins"]), (0, 0))
+        self.assertIsNone(summary["win_rate"])
+        self.assertIsNone(summary["moves_per_second"])
+
+
+if __name__ == "__main__":
+    unittest.main()
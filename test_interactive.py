@@ -0,0 +1,64 @@
+"""
+Tests for running the solver interactively.
+"""
+import queue
+import unittest
+
+from interactive import (_InputQueue, _get_initial_parameters, _main_loop,
+                         _parse_grid)
+from sweepersolver import GameBoard, Point, TileBank
+
+
+def _input_queue(*lines):
+    """ A queue of lines entered by the user, ending with the end of the
+        input as the CLIs give it.
+    """
+    from_user_q = _InputQueue()
+    for line in lines + (None,):
+        from_user_q.put(line)
+    return from_user_q
+
+
+class TestEndOfInput(unittest.TestCase):
+    """ Test that the end of the input quits wherever it comes. """
+
+    def test_initial_parameters(self):
+        to_user_q = queue.Queue()
+        self.assertIsNone(_get_initial_parameters(to_user_q,
+                                                  _input_queue("3")))
+        self.assertEqual(
+            _get_initial_parameters(to_user_q,
+                                    _input_queue("3", "2", "0: 6")),
+            (3, 2, {0: 6}))
+
+    def test_main_loop(self):
+        for lines in (("n",), ("l",), ("i", "0, 0, 0, 0"),
+                      ("b", "0/0 ? ?", "? ? ?", "? ? ?")):
+            tile_bank = TileBank({0: 8, 1: 1})
+            game_board = GameBoard(3, 3, tile_bank)
+            to_user_q = queue.Queue()
+            _main_loop(to_user_q, _input_queue(*lines), game_board,
+                       tile_bank)
+            self.assertEqual(game_board.in_start_state(), lines[0] in "nl")
+
+
+class TestParseGrid(unittest.TestCase):
+    """ Test parsing a whole board pasted as a grid. """
+
+    def test_grid(self):
+        self.assertEqual(_parse_grid(["0/0 ? ?", "", "? ? 1/2"], 3, 2),
+                         {Point(0, 0): (0, 0), Point(2, 1): (1, 2)})
+
+    def test_wrong_size(self):
+        for lines in (["? ? ? ?", "? ? ?"], ["? ?", "? ? 0/0"],
+                      ["? ? ?"], ["? ? ?", "? ? ?", "? ? ?"]):
+            with self.assertRaises(ValueError):
+                _parse_grid(lines, 3, 2)
+
+    def test_invalid_square(self):
+        with self.assertRaises(ValueError):
+            _parse_grid(["? 0 ?"], 3, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
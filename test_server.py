@@ -0,0 +1,204 @@
+"""
+Tests for serving the solver over HTTP.
+"""
+import asyncio
+import json
+import unittest
+
+from server import MAX_BODY_BYTES, MAX_HEADER_BYTES, SolverServer
+from sweepersolver.session import SessionStore
+
+
+class FakeClock:
+    """ A clock that only moves when told to. """
+
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+
+class FakeWriter:
+    """ Collects what's written to a connection. """
+
+    def __init__(self):
+        self.data = b""
+        self.closed = False
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def request(method, path, payload=None, headers=()):
+    """ The bytes of a request with the given JSON payload. """
+    body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+    head = ["%s %s HTTP/1.1" % (method, path),
+            "Content-Length: %d" % len(body)]
+    head.extend(headers)
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+def parse_responses(data):
+    """ The status, headers and JSON payload of each response written. """
+    responses = []
+    while data:
+        head, _, data = data.partition(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers["content-length"])
+        body, data = data[:length], data[length:]
+        responses.append((int(lines[0].split(" ")[1]), headers,
+                          json.loads(body.decode("utf-8")) if body else None))
+    return responses
+
+
+class TestSolverServer(unittest.TestCase):
+    """ Test responding to requests on a connection. """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.store = SessionStore(idle_timeout=10, clock=self.clock)
+        self.server = SolverServer(self.store, workers=2)
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.server.close()
+        self.loop.close()
+
+    def exchange(self, *requests):
+        """ Send requests on a connection, which is then closed.
+
+        :return: The responses, as from parse_responses.
+        """
+        writer = FakeWriter()
+
+        async def connect():
+            reader = asyncio.StreamReader(limit=MAX_HEADER_BYTES)
+            reader.feed_data(b"".join(requests))
+            reader.feed_eof()
+            await self.server.handle_connection(reader, writer)
+        self.loop.run_until_complete(connect())
+        self.assertTrue(writer.closed)
+        return parse_responses(writer.data)
+
+    def create_session(self):
+        [(status, _, payload)] = self.exchange(request(
+            "POST", "/sessions", {"width": 2, "height": 1,
+                                  "enemies": {"0": 1, "1": 1}}))
+        self.assertEqual(status, 201)
+        return payload["session"]
+
+    def test_complete(self):
+        session_id = self.create_session()
+        path = "/sessions/%s/" % session_id
+        responses = self.exchange(
+            request("POST", path + "reveal", {"tiles": [[0, 0, 0, 1]]}),
+            request("POST", path + "reveal", {"tiles": [[1, 0, 1, 0]]}),
+            request("POST", path + "move", {"level": 2}))
+        self.assertEqual([payload for _, _, payload in responses],
+                         [{"move": {"x": 1, "y": 0}, "revealed": 1},
+                          {"move": None, "complete": True, "revealed": 1},
+                          {"move": None, "complete": True}])
+
+    def test_keep_alive(self):
+        responses = self.exchange(request("OPTIONS", "/sessions"),
+                                  request("OPTIONS", "/sessions",
+                                          headers=["Connection: close"]),
+                                  request("OPTIONS", "/sessions"))
+        self.assertEqual([(status, headers["connection"])
+                          for status, headers, _ in responses],
+                         [(204, "keep-alive"), (204, "close")])
+
+    def test_bad_request(self):
+        for payload in ({"width": 2, "height": 1},
+                        {"width": True, "height": 1, "enemies": {"0": 2}},
+                        [2, 1]):
+            [(status, _, response)] = self.exchange(
+                request("POST", "/sessions", payload))
+            self.assertEqual(status, 400)
+            self.assertIn("error", response)
+
+        responses = self.exchange(b"POST /sessions\r\n\r\n",
+                                  request("OPTIONS", "/sessions"))
+        self.assertEqual([status for status, _, _ in responses], [400])
+
+        path = "/sessions/%s/" % self.create_session()
+        responses = self.exchange(
+            request("POST", path + "reveal", {"tiles": [[0, 0, 3, 1]]}),
+            b"POST " + path.encode() +
+            b"move HTTP/1.1\r\nContent-Length: 3\r\n\r\n{]}")
+        self.assertEqual([status for status, _, _ in responses], [400, 400])
+        self.assertEqual(responses[1][2],
+                         {"error": "Request body is not valid JSON"})
+
+    def test_not_found(self):
+        responses = self.exchange(request("POST", "/games"),
+                                  request("POST", "/sessions/a/b/c"),
+                                  request("POST", "/sessions/none/move"),
+                                  request("DELETE", "/sessions/none"))
+        self.assertEqual([status for status, _, _ in responses],
+                         [404, 404, 404, 404])
+
+    def test_method_not_allowed(self):
+        session_id = self.create_session()
+        responses = self.exchange(
+            request("GET", "/sessions"),
+            request("POST", "/sessions/%s" % session_id),
+            request("GET", "/sessions/%s/move" % session_id))
+        self.assertEqual([status for status, _, _ in responses],
+                         [405, 405, 405])
+
+    def test_evicted(self):
+        session_id = self.create_session()
+        self.clock.time += 11
+        self.store.evict_idle()
+        [(status, _, payload)] = self.exchange(
+            request("POST", "/sessions/%s/move" % session_id))
+        self.assertEqual(status, 404)
+        self.assertIn("evicted", payload["error"])
+
+    def test_delete(self):
+        session_id = self.create_session()
+        path = "/sessions/%s" % session_id
+        responses = self.exchange(request("DELETE", path),
+                                  request("POST", path + "/move"))
+        self.assertEqual([status for status, _, _ in responses], [200, 404])
+        self.assertEqual(responses[0][2], {})
+        self.assertNotIn(session_id, self.store)
+
+    def test_headers_too_large(self):
+        responses = self.exchange(
+            request("OPTIONS", "/sessions",
+                    headers=["X-Padding: " + "a" * MAX_HEADER_BYTES]),
+            request("OPTIONS", "/sessions"))
+        self.assertEqual([(status, headers["connection"])
+                          for status, headers, _ in responses],
+                         [(431, "close")])
+
+    def test_body_too_large(self):
+        responses = self.exchange(
+            b"POST /sessions HTTP/1.1\r\nContent-Length: %d\r\n\r\n"
+            % (MAX_BODY_BYTES + 1),
+            request("OPTIONS", "/sessions"))
+        self.assertEqual([(status, headers["connection"])
+                          for status, headers, _ in responses],
+                         [(413, "close")])
+
+    def test_invalid_content_length(self):
+        responses = self.exchange(
+            b"POST /sessions HTTP/1.1\r\nContent-Length: lots\r\n\r\n")
+        self.assertEqual([status for status, _, _ in responses], [400])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Tests for driving the solver with a stream of events.
+"""
+import io
+import json
+import os
+import unittest
+from unittest import mock
+
+from stream import StreamSolver, _respond, run_stream
+from sweepersolver.session import make_player
+
+
+class TestStreamSolver(unittest.TestCase):
+    """ Test responding to events for a game. """
+
+    def setUp(self):
+        self.solver = StreamSolver()
+        self.solver.handle({"type": "init", "width": 2, "height": 1,
+                            "enemies": {"0": 1, "1": 1}})
+
+    def test_complete(self):
+        response = self.solver.handle({"type": "reveal",
+                                       "tiles": [[0, 0, 0, 1]]})
+        self.assertEqual(response, {"move": {"x": 1, "y": 0},
+                                    "revealed": 1})
+        response = self.solver.handle({"type": "reveal",
+                                       "tiles": [[1, 0, 1, 0]]})
+        self.assertEqual(response, {"move": None, "complete": True,
+                                    "revealed": 1})
+        response = self.solver.handle({"type": "move"})
+        self.assertEqual(response, {"move": None, "complete": True})
+
+    def test_invalid_seed(self):
+        for seed in ([1], "1", True):
+            response = _respond(self.solver, json.dumps(
+                {"type": "init", "width": 2, "height": 1,
+                 "enemies": {"0": 2}, "seed": seed, "id": 7}))
+            self.assertEqual(response, {"error": "Seed must be an integer",
+                                        "id": 7})
+
+        # The game from before is still going.
+        response = self.solver.handle({"type": "reveal",
+                                       "tiles": [[0, 0, 0, 1]]})
+        self.assertEqual(response["revealed"], 1)
+
+    def test_level_carried_forward(self):
+        self.solver.handle({"type": "level", "level": 3, "hp": 5})
+        with mock.patch("stream.make_player", wraps=make_player) as player:
+            self.solver.handle({"type": "move"})
+            player.assert_called_once_with(3, 5)
+            player.reset_mock()
+            self.solver.handle({"type": "level", "level": 4})
+            player.assert_called_once_with(4, 5)
+            player.reset_mock()
+
+            # A failed event doesn't change the level.
+            response = _respond(self.solver, json.dumps(
+                {"type": "move", "level": 5, "hp": "lots"}))
+            self.assertEqual(response, {"error": "Hp must be an integer"})
+            self.solver.handle({"type": "move"})
+            player.assert_called_once_with(4, 5)
+            player.reset_mock()
+
+            # A new game starts from level 1 again.
+            self.solver.handle({"type": "init", "width": 2, "height": 1,
+                                "enemies": {"0": 2}})
+            player.assert_called_once_with(1, None)
+
+    def test_events_before_init(self):
+        solver = StreamSolver()
+        for event in ({"type": "move"}, {"type": "level", "level": 2},
+                      {"type": "reveal", "tiles": [[0, 0, 0, 1]]}):
+            response = _respond(solver, json.dumps(event))
+            self.assertEqual(response,
+                             {"error": "No game - send an init event first"})
+
+    def test_invalid_json(self):
+        # The id can't be read from a line that isn't valid JSON.
+        line = '{"type": "move", "id": 3'
+        self.assertEqual(_respond(self.solver, line),
+                         {"error": "Invalid JSON: %r" % line})
+        self.assertEqual(_respond(self.solver, '[{"id": 3}]'),
+                         {"error": "Event must be a JSON object"})
+        self.assertEqual(_respond(self.solver, '{"type": "undo", "id": 3}'),
+                         {"error": "Unknown event type: 'undo'", "id": 3})
+
+
+class TestRunStream(unittest.TestCase):
+    """ Test responding to events pipelined through stdin. """
+
+    def test_pipelined(self):
+        read_fd, write_fd = os.pipe()
+        events = [{"type": "init", "width": 2, "height": 1,
+                   "enemies": {"0": 1, "1": 1}, "id": 1},
+                  {"type": "reveal", "tiles": [[0, 0, 0, 1]], "id": 2},
+                  {"type": "move", "id": 3},
+                  {"type": "reveal", "tiles": [[5, 5, 0, 0]], "id": 4},
+                  {"type": "reveal", "tiles": [[1, 0, 1, 0]], "id": 5}]
+        lines = [json.dumps(event) for event in events]
+        lines.insert(3, "")
+        os.write(write_fd, "\n".join(lines).encode())
+        os.close(write_fd)
+        stdout = io.StringIO()
+        with os.fdopen(read_fd, 'r') as stdin:
+            run_stream(stdin, stdout)
+
+        responses = [json.loads(line)
+                     for line in stdout.getvalue().splitlines()]
+        self.assertEqual([response.get("id") for response in responses],
+                         [1, 2, 3, 4, 5])
+        self.assertEqual(responses[1]["move"], {"x": 1, "y": 0})
+        self.assertEqual(responses[2]["move"], {"x": 1, "y": 0})
+        self.assertIn("error", responses[3])
+        self.assertEqual(responses[4], {"move": None, "complete": True,
+                                        "revealed": 1, "id": 5})
+
+
+if __name__ == "__main__":
+    unittest.main()